@@ -0,0 +1,56 @@
+"""Latency of GET /api/updates at 50k rows for common filter combinations.
+
+Reports both the data path alone (query_diun_updates + orjson) and the full
+HTTP round trip through the app.
+
+Usage: python -m benchmarks.bench_api_updates [rows]
+"""
+import sys
+import time
+from datetime import datetime
+
+import orjson
+
+from benchmarks.common import temp_database, test_client
+from benchmarks.bench_indexes import populate
+from src.database import query_diun_updates
+from src.main import LISTING_FIELDS
+
+CASES = {
+    "default (newest first)": {},
+    "hostname": {"hostname": "host-042"},
+    "status": {"status": "new"},
+    "image prefix": {"image_name_prefix": "app-01"},
+    "sort=hostname": {"sort": "hostname"},
+    "created range": {"created_after": "2025-02-01T00:00:00", "created_before": "2025-02-02T00:00:00"},
+}
+
+
+def main(rows: int, repeat: int = 200) -> None:
+    with temp_database() as (engine, session_factory), test_client(session_factory) as client:
+        populate(engine, rows)
+        db = session_factory()
+        print(f"{rows} rows, 100 items per page")
+        for label, params in CASES.items():
+            kwargs = dict(params)
+            for key in ("created_after", "created_before"):
+                if key in kwargs:
+                    kwargs[key] = datetime.fromisoformat(kwargs[key])
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                page, _ = query_diun_updates(db, limit=100, **kwargs)
+                orjson.dumps({"items": [dict(zip(LISTING_FIELDS, row)) for row in page]})
+            direct = (time.perf_counter() - start) / repeat
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                client.get("/api/updates", params=params).raise_for_status()
+            http = (time.perf_counter() - start) / repeat
+
+            print(f"  {label:<24} query+encode {direct * 1000:7.3f} ms   http {http * 1000:7.3f} ms")
+        db.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,25 @@
+"""Compare N single POST /webhook calls with one POST /webhook/batch.
+
+Usage: python -m benchmarks.bench_batch_webhook [N]
+"""
+import sys
+
+from benchmarks.common import TOKEN, make_webhook, temp_database, test_client, timer
+
+
+def main(count: int) -> None:
+    payloads = [make_webhook(host=i % 50, image=i) for i in range(count)]
+    headers = {"Authorization": TOKEN}
+
+    with temp_database() as (engine, session_factory), test_client(session_factory) as client:
+        with timer(f"{count} x POST /webhook", count):
+            for payload in payloads:
+                client.post("/webhook", json=payload, headers=headers).raise_for_status()
+
+    with temp_database() as (engine, session_factory), test_client(session_factory) as client:
+        with timer(f"1 x POST /webhook/batch ({count} items)", count):
+            client.post("/webhook/batch", json=payloads, headers=headers).raise_for_status()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,97 @@
+"""Time to first byte and peak RSS of rendering the whole dashboard.
+
+"full" builds the page with TemplateResponse from every ORM row, as the
+dashboard did before pagination; "stream" is DIUN_DASHBOARD_MODE=stream.
+Each measurement runs in a fresh interpreter so peak RSS is not shared.
+
+Usage: python -m benchmarks.bench_dashboard_stream [rows ...]
+"""
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+import time
+
+from fastapi import Request
+
+from benchmarks.bench_indexes import populate
+from benchmarks.common import override_database, temp_database
+from src.database import async_get_all_diun_updates, get_read_db
+from src import main as app_module
+
+SIZES = [1_000, 10_000, 100_000]
+
+
+async def full_render(scope, receive, send):
+    async for db in app_module.app.dependency_overrides[get_read_db]():
+        updates = await async_get_all_diun_updates(db)
+    response = app_module.get_templates().TemplateResponse(Request(scope, receive), "index.html", {
+        "updates": updates,
+        "has_updates": bool(updates),
+    })
+    await response(scope, receive, send)
+
+
+async def measure(mode: str) -> dict:
+    app_module.DIUN_DASHBOARD_MODE = "stream"
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/", "raw_path": b"/", "query_string": b"", "root_path": "",
+        "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 0), "server": ("bench", 80),
+        "app": app_module.app,
+    }
+
+    async def receive():
+        await asyncio.sleep(3600)
+
+    first_byte = None
+    size = 0
+
+    async def send(message):
+        nonlocal first_byte, size
+        if message["type"] == "http.response.body" and message.get("body"):
+            if first_byte is None:
+                first_byte = time.perf_counter()
+            size += len(message["body"])
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    await (app_module.app if mode == "stream" else full_render)(scope, receive, send)
+    end = time.perf_counter()
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "ttfb_ms": (first_byte - start) * 1000,
+        "total_ms": (end - start) * 1000,
+        "bytes": size,
+        "rss_growth_mb": (rss_after - rss_before) / 1024,
+    }
+
+
+def child(mode: str, rows: int) -> None:
+    with temp_database() as (engine, session_factory):
+        populate(engine, rows)
+        override_database(app_module.app, session_factory)
+        print(json.dumps(asyncio.run(measure(mode))))
+
+
+def main(sizes: list[int]) -> None:
+    print(f"{'rows':>8} {'mode':<7} {'ttfb ms':>9} {'total ms':>9} {'MB sent':>8} {'peak RSS +MB':>13}")
+    for rows in sizes:
+        for mode in ("full", "stream"):
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_dashboard_stream", "--child", mode, str(rows)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(
+                f"{rows:>8} {mode:<7} {result['ttfb_ms']:9.1f} {result['total_ms']:9.1f} "
+                f"{result['bytes'] / 1e6:8.1f} {result['rss_growth_mb']:13.1f}"
+            )
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        child(sys.argv[2], int(sys.argv[3]))
+    else:
+        main([int(arg) for arg in sys.argv[1:]] or SIZES)
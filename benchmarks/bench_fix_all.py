@@ -0,0 +1,91 @@
+"""Webhook latency while Fix All removes a large table.
+
+"single" is Fix All as it used to be: COUNT(*) and one unbounded DELETE in a
+single writer session. "batched" is async_delete_all_diun_updates_batched,
+which hands the writer back between rowid-range batches. Webhooks are sent
+through the same writer pool every 5 ms throughout.
+
+Usage: python -m benchmarks.bench_fix_all [rows] [batch_size]
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+from sqlalchemy import delete, func, select
+
+from benchmarks.bench_indexes import populate
+from benchmarks.common import make_webhook, temp_database
+from src.database import (
+    DELETE_BATCH_SIZE, SQLITE_PRAGMAS, async_delete_all_diun_updates_batched, diun_updates_table,
+    async_upsert_diun_update, create_session_pools,
+)
+from src.models import WebhookData
+
+
+async def single_transaction(writer) -> int:
+    async with writer.session() as db:
+        count = await db.scalar(select(func.count()).select_from(diun_updates_table))
+        await db.execute(delete(diun_updates_table))
+        await db.commit()
+    return count
+
+
+async def run(engine, mode: str, rows: int, batch_size: int) -> None:
+    populate(engine, rows)
+    writer, _ = create_session_pools(engine.url.database, SQLITE_PRAGMAS)
+    latencies = []
+    done = asyncio.Event()
+
+    async def webhook(i: int, due: float):
+        update = WebhookData(**make_webhook(host=900 + i % 50, image=i % 300)).to_update_data()
+        async with writer.session() as db:
+            await async_upsert_diun_update(db, update)
+        latencies.append(time.perf_counter() - due)
+
+    async def webhooks():
+        # Each webhook is its own request, started when due, so time spent
+        # queued behind the writer is counted.
+        due = time.perf_counter()
+        pending = []
+        i = 0
+        while not done.is_set():
+            await asyncio.sleep(max(0.0, due - time.perf_counter()))
+            pending.append(asyncio.create_task(webhook(i, due)))
+            due += 0.005
+            i += 1
+        await asyncio.gather(*pending)
+
+    sender = asyncio.create_task(webhooks())
+    await asyncio.sleep(0.1)
+    start = time.perf_counter()
+    if mode == "single":
+        deleted = await single_transaction(writer)
+    else:
+        deleted = await async_delete_all_diun_updates_batched(writer, batch_size)
+    elapsed = time.perf_counter() - start
+    await asyncio.sleep(0.1)
+    done.set()
+    await sender
+
+    latencies.sort()
+    print(
+        f"  {mode:<8} deleted {deleted:>7} in {elapsed * 1000:8.1f} ms   webhook latency "
+        f"p50 {statistics.median(latencies) * 1000:7.1f} ms  "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:7.1f} ms  "
+        f"max {latencies[-1] * 1000:7.1f} ms"
+    )
+
+
+def main(rows: int, batch_size: int) -> None:
+    print(f"Fix All of {rows} rows, batch size {batch_size}")
+    for mode in ("single", "batched"):
+        with temp_database() as (engine, session_factory):
+            asyncio.run(run(engine, mode, rows, batch_size))
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 100_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else DELETE_BATCH_SIZE,
+    )
@@ -0,0 +1,84 @@
+"""Measure /health latency while webhooks are being written concurrently.
+
+"blocking" serves webhooks the way the app used to: a sync Session called
+directly from the async handler, so every commit stalls the event loop.
+"async" is the real application using the aiosqlite data layer.
+
+Usage: python -m benchmarks.bench_health_latency [seconds] [writers]
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+
+from benchmarks.common import TOKEN, make_webhook, override_database, temp_database
+from src.database import get_db, upsert_diun_update
+from src.main import app
+from src.models import WebhookData
+
+
+def blocking_app() -> FastAPI:
+    legacy = FastAPI()
+
+    @legacy.post("/webhook")
+    async def receive_webhook(payload: dict, db=Depends(get_db)):
+        upsert_diun_update(db, WebhookData(**payload).to_update_data())
+        return {"message": "Webhook received"}
+
+    @legacy.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    return legacy
+
+
+async def run(target: FastAPI, duration: float, writers: int) -> list[float]:
+    transport = httpx.ASGITransport(app=target)
+    latencies = []
+    deadline = time.perf_counter() + duration
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def write(worker: int):
+            i = 0
+            while time.perf_counter() < deadline:
+                payload = make_webhook(host=worker, image=i % 300)
+                await client.post("/webhook", json=payload, headers={"Authorization": TOKEN})
+                i += 1
+
+        async def ping():
+            # Latency is measured from when each probe was due, so time the
+            # probe spent waiting for a stalled event loop is counted too.
+            due = time.perf_counter()
+            while due < deadline:
+                await asyncio.sleep(max(0.0, due - time.perf_counter()))
+                await client.get("/health")
+                latencies.append(time.perf_counter() - due)
+                due += 0.005
+
+        await asyncio.gather(ping(), *(write(w) for w in range(writers)))
+    return latencies
+
+
+def report(label: str, latencies: list[float]) -> None:
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"{label:<10} /health n={len(latencies):5d} "
+          f"p50={quantiles[49] * 1000:7.2f} ms p99={quantiles[98] * 1000:7.2f} ms "
+          f"max={max(latencies) * 1000:7.2f} ms")
+
+
+def main(duration: float, writers: int) -> None:
+    for label, target in (("blocking", blocking_app()), ("async", app)):
+        with temp_database() as (engine, session_factory):
+            override_database(target, session_factory)
+            report(label, asyncio.run(run(target, duration, writers)))
+            target.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    main(
+        float(sys.argv[1]) if len(sys.argv) > 1 else 5.0,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 8,
+    )
@@ -0,0 +1,69 @@
+"""Image reference parsing throughput.
+
+"split" is the former split('@') / rsplit(':', 1) code, which does no
+validation and gets registry ports wrong. "cold" runs the full parser with
+its cache cleared before every round, so every reference is parsed once;
+"cached" is the same workload once the memo holds the fleet's references,
+which is the steady state of a running server.
+
+The workload is N webhooks drawn from a few hundred distinct references,
+like a fleet of hosts reporting the same images.
+
+Usage: python -m benchmarks.bench_imageref [N] [distinct]
+"""
+import random
+import sys
+import time
+
+from src.imageref import parse_image_reference
+
+REGISTRIES = ["", "docker.io/", "ghcr.io/", "registry.local:5000/", "quay.io/"]
+
+
+def legacy_split(reference: str) -> tuple[str, str]:
+    image_full = reference.split('@')[0]
+    image_parts = image_full.rsplit(':', 1)
+    return (image_parts[0], image_parts[1]) if len(image_parts) > 1 else (image_full, "latest")
+
+
+def parse(reference: str) -> tuple[str, str]:
+    parsed = parse_image_reference(reference)
+    return parsed.familiar_name, parsed.tag or "latest"
+
+
+def make_references(count: int, distinct: int) -> list[str]:
+    rng = random.Random(42)
+    pool = [
+        f"{rng.choice(REGISTRIES)}team{i % 20}/app{i}:{rng.randint(1, 9)}.{rng.randint(0, 30)}"
+        + (f"@sha256:{rng.randbytes(32).hex()}" if i % 3 == 0 else "")
+        for i in range(distinct)
+    ]
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def measure(label: str, func, references: list[str], clear: bool = False) -> None:
+    best = float("inf")
+    for _ in range(5):
+        if clear:
+            parse_image_reference.cache_clear()
+        start = time.perf_counter()
+        for reference in references:
+            func(reference)
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<7} {len(references) / best:12,.0f} refs/s   {best / len(references) * 1e9:7.0f} ns/ref")
+
+
+def main(count: int, distinct: int) -> None:
+    references = make_references(count, distinct)
+    print(f"{count} references, {len(set(references))} distinct")
+    measure("split", legacy_split, references)
+    measure("cold", parse, list(dict.fromkeys(references)), clear=True)
+    measure("cached", parse, references)
+    print(parse_image_reference.cache_info())
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 100_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 300,
+    )
@@ -0,0 +1,101 @@
+"""Listing and upsert cost at 100k rows with the old and new index sets.
+
+"before" is the single-column index layout prior to revision c3d4e5f6a7b8;
+"after" is the composite (…, created_at DESC, id DESC) layout.
+
+Usage: python -m benchmarks.bench_indexes [rows]
+"""
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from benchmarks.common import temp_database
+from src.database import DiunUpdate, Host, Image, diun_updates_table, get_diun_updates_page, upsert_diun_update
+from src.models import DiunUpdateData
+
+NEW_INDEXES = [
+    "CREATE INDEX ix_diun_updates_created_at_id ON diun_updates (created_at DESC, id DESC)",
+    "CREATE INDEX ix_diun_updates_host_id_created_at_id ON diun_updates (host_id, created_at DESC, id DESC)",
+    "CREATE INDEX ix_diun_updates_status_created_at_id ON diun_updates (status, created_at DESC, id DESC)",
+]
+OLD_INDEXES = [
+    "CREATE INDEX ix_diun_updates_id ON diun_updates (id)",
+    "CREATE INDEX ix_diun_updates_host_id ON diun_updates (host_id)",
+    "CREATE INDEX ix_diun_updates_status ON diun_updates (status)",
+]
+
+
+def use_indexes(engine, create: list[str], drop: list[str]) -> None:
+    with engine.begin() as connection:
+        for statement in drop:
+            name = statement.split()[2]
+            connection.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        for statement in create:
+            connection.execute(text(statement))
+        connection.execute(text("ANALYZE"))
+
+
+def populate(engine, rows: int) -> None:
+    base = datetime(2025, 1, 1)
+    with engine.begin() as connection:
+        connection.execute(Host.__table__.insert(), [{"id": h + 1, "hostname": f"host-{h:03d}"} for h in range(200)])
+        connection.execute(Image.__table__.insert(), [
+            {"id": i + 1, "image_name": f"app-{i:04d}"} for i in range((rows + 199) // 200)
+        ])
+        connection.execute(diun_updates_table.insert(), [
+            dict(
+                host_id=i % 200 + 1,
+                image_id=i // 200 + 1,
+                image_tag="1.0",
+                status=random.choice(["new", "update"]),
+                provider="docker",
+                digest=f"sha256:{i:064x}",
+                created_at=base + timedelta(seconds=random.randint(0, 90 * 86400)),
+            )
+            for i in range(rows)
+        ])
+
+
+def measure(label: str, fn, repeat: int = 50) -> None:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    print(f"  {label:<34} {(time.perf_counter() - start) / repeat * 1000:8.3f} ms")
+
+
+def run(engine, session_factory, rows: int) -> None:
+    db = session_factory()
+    deep_cursor = None
+    for _ in range(rows // 2 // 1000):
+        _, deep_cursor = get_diun_updates_page(db, deep_cursor, limit=1000)
+    listing = db.query(DiunUpdate).order_by(DiunUpdate.created_at.desc(), DiunUpdate.id.desc())
+
+    measure("first page (100 rows)", lambda: get_diun_updates_page(db, None, limit=100))
+    measure("page at row 50%", lambda: get_diun_updates_page(db, deep_cursor, limit=100))
+    measure("hostname-filtered page", lambda: listing.filter(DiunUpdate.hostname == "host-042").limit(100).all())
+    measure("status-filtered page", lambda: listing.filter(DiunUpdate.status == "new").limit(100).all())
+
+    counter = iter(range(10**9))
+    measure("upsert", lambda: upsert_diun_update(db, DiunUpdateData(
+        hostname=f"host-{next(counter) % 200:03d}", status="new", provider="docker",
+        image_name="bench-app", image_tag="2.0", digest="sha256:bench",
+    )), repeat=500)
+    db.close()
+
+
+def main(rows: int) -> None:
+    with temp_database() as (engine, session_factory):
+        populate(engine, rows)
+        print(f"before (single-column indexes, {rows} rows)")
+        use_indexes(engine, OLD_INDEXES, NEW_INDEXES)
+        run(engine, session_factory, rows)
+        print(f"after (composite listing indexes, {rows} rows)")
+        use_indexes(engine, NEW_INDEXES, OLD_INDEXES)
+        run(engine, session_factory, rows)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,125 @@
+"""On-disk size and sort speed of the successive diun_updates schemas.
+
+A database is migrated to a7b8c9d0e1f2 ("flat": hostnames, image names and
+hub links stored on every row) and filled with HOSTS x IMAGES rows, every
+host running every image. Copies are then upgraded to b8c9d0e1f2a3
+("normalized": hosts and images tables referenced by id) and c9d0e1f2a3b4
+("compact": binary digests, integer timestamps). Each file is VACUUMed
+before measuring, and the dbstat virtual table splits the bytes between
+tables and indexes.
+
+The timings are the best of five runs of two queries ordered by created_at:
+a sort of the whole table that bypasses the listing index, and that index
+walked to the middle of the table.
+
+Usage: python -m benchmarks.bench_schema_size [hosts] [images]
+"""
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import UTC, datetime, timedelta
+
+from alembic import command
+from alembic.config import Config
+
+FLAT = "a7b8c9d0e1f2"
+# Schemas compared against the flat one
+UPGRADES = {"normalized": "b8c9d0e1f2a3", "compact": "c9d0e1f2a3b4"}
+QUERIES = {
+    "full sort": "SELECT id, created_at FROM diun_updates NOT INDEXED ORDER BY created_at DESC, id DESC",
+    "index walk": "SELECT id FROM diun_updates ORDER BY created_at DESC, id DESC LIMIT 100 OFFSET {middle}",
+}
+REGISTRIES = ["", "ghcr.io/", "quay.io/", "registry.example.internal:5000/"]
+
+
+def alembic_config(db_path: str) -> Config:
+    config = Config("src/alembic.ini")
+    config.set_main_option("sqlalchemy.url", f"sqlite:///{db_path}")
+    return config
+
+
+def populate(db_path: str, hosts: int, images: int) -> None:
+    rng = random.Random(42)
+    hostnames = [f"docker-{rng.choice(['prod', 'stage', 'edge'])}-{i:03d}.lan.example.com" for i in range(hosts)]
+    names = [f"{rng.choice(REGISTRIES)}team-{i % 25}/service-{i:03d}" for i in range(images)]
+    links = {name: f"https://hub.docker.com/r/{name.split('/', 1)[-1]}" for name in names}
+    start = datetime(2026, 1, 1, tzinfo=UTC)
+    rows = [
+        (hostname, "update", "docker", name, f"{rng.randint(1, 9)}.{rng.randint(0, 30)}",
+         f"sha256:{rng.randbytes(32).hex()}", links[name],
+         (start - timedelta(days=rng.randint(1, 400))).isoformat(),
+         (start + timedelta(seconds=rng.randint(0, 86400 * 30))).isoformat(sep=" "))
+        for hostname in hostnames for name in names
+    ]
+    connection = sqlite3.connect(db_path)
+    with connection:
+        connection.executemany(
+            "INSERT INTO diun_updates (hostname, status, provider, image_name, image_tag, digest, hub_link, "
+            "image_created_at, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+        )
+    connection.close()
+
+
+def best_time(connection: sqlite3.Connection, sql: str) -> float:
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        connection.execute(sql).fetchall()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure(db_path: str, rows: int) -> dict[str, float]:
+    connection = sqlite3.connect(db_path)
+    connection.execute("VACUUM")
+    objects = dict(connection.execute("SELECT name, type FROM sqlite_master WHERE type IN ('table', 'index')"))
+    results = {"tables": 0, "indexes": 0}
+    for name, size in connection.execute("SELECT name, sum(pgsize) FROM dbstat GROUP BY name"):
+        results["indexes" if objects.get(name) == "index" else "tables"] += size
+    for label, sql in QUERIES.items():
+        results[label] = best_time(connection, sql.format(middle=rows // 2))
+    connection.close()
+    results["file"] = os.path.getsize(db_path)
+    return results
+
+
+def main(hosts: int, images: int) -> None:
+    workdir = tempfile.mkdtemp()
+    try:
+        flat = os.path.join(workdir, "flat.db")
+        command.upgrade(alembic_config(flat), FLAT)
+        populate(flat, hosts, images)
+        paths = {"flat": flat}
+        for name, revision in UPGRADES.items():
+            paths[name] = os.path.join(workdir, f"{name}.db")
+            shutil.copy(flat, paths[name])
+            command.upgrade(alembic_config(paths[name]), revision)
+
+        results = {name: measure(path, hosts * images) for name, path in paths.items()}
+        print(f"{hosts} hosts x {images} images = {hosts * images} rows")
+        print(f"{'':<11}" + "".join(f"{name:>21}" for name in results))
+        for key in ("file", "tables", "indexes"):
+            before = results["flat"][key]
+            print(f"{key:<11}" + "".join(
+                f"{result[key] / 1e6:9.2f} MB ({(result[key] - before) / before * 100:+5.1f}%)"
+                for result in results.values()
+            ))
+        for key in QUERIES:
+            before = results["flat"][key]
+            print(f"{key:<11}" + "".join(
+                f"{result[key] * 1e3:9.2f} ms ({(result[key] - before) / before * 100:+5.1f}%)"
+                for result in results.values()
+            ))
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 300,
+    )
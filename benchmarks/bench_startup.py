@@ -0,0 +1,92 @@
+"""Cold-start import time of src.main, checked against a budget.
+
+Each sample imports src.main in a fresh interpreter under -X importtime, as
+a restarted server does. The imports run in a scratch directory that links
+src/, static/ and templates/ and holds an already migrated database, so the
+schema fast path is taken and the real data/diun.db is never touched.
+
+The script exits with status 1 if the median import time exceeds the budget
+or if a module that should only load on demand (Alembic, Jinja2) was
+imported at startup.
+
+Usage: python -m benchmarks.bench_startup [runs] [budget_ms]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Wall-clock budget for "import src.main", excluding interpreter start-up.
+DEFAULT_BUDGET_MS = 1500
+# Loaded on demand: Alembic only for an upgrade, Jinja2 on the first page render.
+LAZY_MODULES = ("alembic", "jinja2")
+
+
+def parse_importtime(stderr: str) -> list[tuple[int, int, str]]:
+    """Return (self_us, cumulative_us, module) for every -X importtime line."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((int(self_us), int(cumulative_us), name.strip()))
+    return modules
+
+
+def sample(workdir: str) -> tuple[float, list[tuple[int, int, str]]]:
+    env = {**os.environ, "DIUN_WEBHOOK_TOKEN": os.environ.get("DIUN_WEBHOOK_TOKEN", "bench-token")}
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.main"],
+        cwd=workdir, env=env, capture_output=True, text=True, check=True,
+    )
+    return time.perf_counter() - start, parse_importtime(result.stderr)
+
+
+def main(runs: int, budget_ms: float) -> None:
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in ("src", "static", "templates"):
+            os.symlink(os.path.join(REPO, name), os.path.join(workdir, name))
+        # The first import migrates the scratch database; it is not measured.
+        sample(workdir)
+
+        walls, imports = [], []
+        for _ in range(runs):
+            wall, modules = sample(workdir)
+            walls.append(wall * 1000)
+            imports.append(next(cumulative for _, cumulative, name in modules if name == "src.main") / 1000)
+
+    # Self time per top-level package, from the last sample
+    by_package = Counter()
+    for self_us, _, name in modules:
+        by_package[name.split(".")[0]] += self_us
+    loaded = {name for _, _, name in modules}
+
+    print(f"import src.main over {runs} runs: median {statistics.median(imports):.0f} ms, "
+          f"min {min(imports):.0f} ms (process wall median {statistics.median(walls):.0f} ms)")
+    print("Heaviest packages (self time):")
+    for package, self_us in by_package.most_common(10):
+        print(f"  {package:<24} {self_us / 1000:7.1f} ms")
+
+    failures = []
+    if statistics.median(imports) > budget_ms:
+        failures.append(f"median import time {statistics.median(imports):.0f} ms exceeds budget of {budget_ms:.0f} ms")
+    eager = [module for module in LAZY_MODULES if module in loaded]
+    if eager:
+        failures.append(f"imported at startup but should load lazily: {', '.join(eager)}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        raise SystemExit(1)
+    print(f"OK: within budget of {budget_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 5,
+        float(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_BUDGET_MS,
+    )
@@ -0,0 +1,97 @@
+"""Count SQL statements and time per webhook upsert, before and after RETURNING.
+
+"before" replays the previous implementation: build the INSERT ... ON CONFLICT
+construct per call, commit, then SELECT the row back.
+
+Webhooks come from a fleet of HOSTS hosts each running IMAGES images, as a
+real Diun deployment sends them. The first round sees every host and image
+for the first time; the rounds after it are the steady state, where both are
+known and only the update row is written. The two are reported separately.
+
+Usage: python -m benchmarks.bench_upsert_statements [N]
+"""
+import sys
+from datetime import datetime, UTC
+
+from sqlalchemy import event
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from benchmarks.common import temp_database, timer
+from src.database import DiunUpdate, _commit_write, _intern_cache, diun_updates_table, upsert_diun_update
+from src.models import DiunUpdateData
+
+HOSTS = 50
+IMAGES = 20
+
+
+def legacy_upsert(db, update_data: DiunUpdateData) -> DiunUpdate:
+    # Host and image ids are resolved the current way, so only the statement handling differs
+    cache = _intern_cache(db)
+    hosts, images = cache.resolve(db, [update_data])
+    stmt = sqlite_insert(diun_updates_table).values(
+        host_id=hosts[update_data.hostname],
+        image_id=images[update_data.image_name][0],
+        status=update_data.status,
+        provider=update_data.provider,
+        image_tag=update_data.image_tag,
+        digest=update_data.digest,
+        image_created_at=update_data.image_created_at,
+        created_at=datetime.now(UTC),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['host_id', 'image_id'],
+        set_=dict(
+            status=stmt.excluded.status,
+            provider=stmt.excluded.provider,
+            image_tag=stmt.excluded.image_tag,
+            digest=stmt.excluded.digest,
+            image_created_at=stmt.excluded.image_created_at,
+            created_at=stmt.excluded.created_at,
+        )
+    )
+    db.execute(stmt)
+    # The counter bump triggers used to make, so both sides do the same writes
+    _commit_write(db, 1)
+    cache.remember(hosts, images)
+    return db.query(DiunUpdate).filter(
+        DiunUpdate.hostname == update_data.hostname,
+        DiunUpdate.image_name == update_data.image_name,
+    ).one()
+
+
+def run(label: str, upsert, count: int) -> float:
+    """Upsert count webhooks from the fleet; returns statements per known-host, known-image webhook."""
+    fleet = HOSTS * IMAGES
+    updates = [
+        DiunUpdateData(
+            hostname=f"host-{i % HOSTS:03d}", status="new", provider="docker",
+            image_name=f"app-{i // HOSTS % IMAGES:03d}", image_tag=f"1.{i // fleet}", digest=f"sha256:{i:064x}",
+        )
+        for i in range(max(count, 2 * fleet))
+    ]
+    with temp_database() as (engine, session_factory):
+        statements = []
+        event.listen(engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+        db = session_factory()
+        per_webhook = {}
+        for phase, batch in (("first sighting", updates[:fleet]), ("known host and image", updates[fleet:])):
+            statements.clear()
+            with timer(f"{label}, {phase}", len(batch)):
+                for update_data in batch:
+                    upsert(db, update_data).image_tag
+            per_webhook[phase] = len(statements) / len(batch)
+            print(f"{'':<40} {per_webhook[phase]:9.2f} statements/webhook")
+        db.close()
+    return per_webhook["known host and image"]
+
+
+def main(count: int) -> None:
+    before = run("before: execute + SELECT back", legacy_upsert, count)
+    after = run("after: cached INSERT ... RETURNING", upsert_diun_update, count)
+    # Known host and image: the upsert and the version bump, without the SELECT back
+    assert after == 2 and before == 3, (before, after)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,65 @@
+"""Per-webhook cost of turning a request body into upsert parameters.
+
+"dict" is the former path: json.loads into a dict, WebhookData(**data), then
+to_update_data() building a second model. "raw" validates the body bytes with
+model_validate_json and goes straight to an UpdateParams tuple. Both end with
+the parameter dict bound to the upsert statement.
+
+Latency is the best of several timed rounds. Memory is the tracemalloc
+high-water mark while one webhook is parsed, i.e. the transient garbage the
+path allocates per request.
+
+Usage: python -m benchmarks.bench_webhook_parsing [N]
+"""
+import json
+import sys
+import time
+import tracemalloc
+from datetime import datetime, UTC
+
+from benchmarks.common import make_webhook
+from src.database import _upsert_params
+from src.models import WebhookData
+
+
+def dict_path(body: bytes, now: datetime) -> dict:
+    return _upsert_params(WebhookData(**json.loads(body)).to_update_data(), now)
+
+
+def raw_path(body: bytes, now: datetime) -> dict:
+    return _upsert_params(WebhookData.model_validate_json(body).to_update_params(), now)
+
+
+def measure(label: str, parse, bodies: list[bytes]) -> None:
+    now = datetime.now(UTC)
+    for body in bodies[:100]:
+        parse(body, now)
+
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        for body in bodies:
+            parse(body, now)
+        best = min(best, time.perf_counter() - start)
+
+    peaks = []
+    tracemalloc.start()
+    for body in bodies:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        parse(body, now)
+        peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+
+    print(f"{label:<6} {best / len(bodies) * 1e6:8.2f} us/webhook   "
+          f"peak {sum(peaks) / len(peaks):6.0f} B/webhook (max {max(peaks)} B)")
+
+
+def main(count: int) -> None:
+    bodies = [json.dumps(make_webhook(host=i % 50, image=i % 300)).encode() for i in range(count)]
+    measure("dict", dict_path, bodies)
+    measure("raw", raw_path, bodies)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
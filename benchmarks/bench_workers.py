@@ -0,0 +1,116 @@
+"""Webhook throughput of a real uvicorn server with 1..N worker processes.
+
+For each worker count a server is started on a fresh database in a scratch
+directory (src/, static/ and templates/ linked in), and load generator
+processes post webhooks to it over HTTP for a fixed time. Every webhook
+targets its own (host, image) pair, so all of them are inserts.
+
+Workers parse and validate requests in parallel, but SQLite still takes one
+write at a time, so the gain flattens once the database is the bottleneck;
+DIUN_INGEST_MODE=queue (set in the environment) batches those writes per
+worker. Scaling also needs as many free cores as workers plus load
+generators.
+
+Usage: python -m benchmarks.bench_workers [max_workers] [seconds] [clients] [concurrency]
+"""
+import asyncio
+import multiprocessing
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.common import TOKEN, make_webhook
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workdir: str, port: int, workers: int) -> subprocess.Popen:
+    env = {**os.environ, "DIUN_WEBHOOK_TOKEN": TOKEN}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=workdir, env=env,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return server
+        except httpx.TransportError:
+            pass
+        time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("server did not start")
+
+
+async def generate(port: int, client: int, duration: float, concurrency: int) -> list[float]:
+    latencies = []
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=30) as http:
+        async def post(task: int):
+            i = 0
+            while time.perf_counter() < deadline:
+                payload = make_webhook(host=client * 1000 + task, image=i)
+                start = time.perf_counter()
+                response = await http.post("/webhook", json=payload, headers={"Authorization": TOKEN})
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+                i += 1
+
+        await asyncio.gather(*(post(task) for task in range(concurrency)))
+    return latencies
+
+
+def run_client(args: tuple) -> list[float]:
+    return asyncio.run(generate(*args))
+
+
+def measure(workers: int, duration: float, clients: int, concurrency: int) -> None:
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in ("src", "static", "templates"):
+            os.symlink(os.path.join(REPO, name), os.path.join(workdir, name))
+        port = free_port()
+        server = start_server(workdir, port, workers)
+        try:
+            with multiprocessing.Pool(clients) as pool:
+                results = pool.map(run_client, [(port, client, duration, concurrency) for client in range(clients)])
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    latencies = sorted(latency for result in results for latency in result)
+    print(f"{workers} worker(s): {len(latencies) / duration:8.0f} webhooks/s   "
+          f"p50 {statistics.median(latencies) * 1000:6.1f} ms   "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:6.1f} ms")
+
+
+def main(max_workers: int, duration: float, clients: int, concurrency: int) -> None:
+    print(f"{clients} load generator(s) x {concurrency} connections, {duration:.0f} s per run, "
+          f"{os.cpu_count()} CPU(s), ingest mode {os.environ.get('DIUN_INGEST_MODE', 'sync')}")
+    workers = 1
+    while workers <= max_workers:
+        measure(workers, duration, clients, concurrency)
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 4,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 10,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 2,
+        int(sys.argv[4]) if len(sys.argv) > 4 else 16,
+    )
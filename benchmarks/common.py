@@ -0,0 +1,109 @@
+"""Shared helpers for the benchmark scripts.
+
+Benchmarks are run from the repository root as modules, e.g.
+``python -m benchmarks.bench_batch_webhook``. Each one works against a
+throwaway SQLite file so the real ``data/diun.db`` is never touched.
+"""
+import os
+import random
+import tempfile
+import time
+from contextlib import contextmanager
+
+os.environ.setdefault("DIUN_WEBHOOK_TOKEN", "bench-token")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from src.database import Base, SQLITE_PRAGMAS, apply_sqlite_pragmas, create_session_pools
+
+TOKEN = os.environ["DIUN_WEBHOOK_TOKEN"]
+
+
+@contextmanager
+def temp_database():
+    """Yield (engine, session factory) for a fresh on-disk database."""
+    db_fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(db_fd)
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    apply_sqlite_pragmas(engine, SQLITE_PRAGMAS)
+    Base.metadata.create_all(bind=engine)
+    try:
+        yield engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    finally:
+        engine.dispose()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.unlink(db_path + suffix)
+
+
+def override_database(app, session_factory):
+    """Point the app's session dependencies at session_factory's database."""
+    from src.database import get_db, get_write_db, get_read_db, get_read_pool, get_write_pool
+
+    database = session_factory.kw["bind"].url.database
+    writer, reader = create_session_pools(database, SQLITE_PRAGMAS, poolclass=NullPool)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_write_db():
+        async with writer.session() as db:
+            yield db
+
+    async def override_get_read_db():
+        async with reader.session() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_write_db] = override_get_write_db
+    app.dependency_overrides[get_read_db] = override_get_read_db
+    app.dependency_overrides[get_read_pool] = lambda: reader
+    app.dependency_overrides[get_write_pool] = lambda: writer
+    return writer, reader
+
+
+@contextmanager
+def test_client(session_factory):
+    """Yield a TestClient whose database dependencies use session_factory's database."""
+    from fastapi.testclient import TestClient
+    from src.main import app
+
+    override_database(app, session_factory)
+    try:
+        with TestClient(app) as client:
+            yield client
+    finally:
+        app.dependency_overrides.clear()
+
+
+def make_webhook(host: int, image: int) -> dict:
+    """Build a realistic Diun webhook payload."""
+    return {
+        "diun_version": "4.28.0",
+        "hostname": f"host-{host:03d}",
+        "status": "update",
+        "provider": "docker",
+        "image": f"registry.example.com/team/app-{image:03d}:1.{random.randint(0, 99)}",
+        "hub_link": f"https://registry.example.com/team/app-{image:03d}",
+        "digest": "sha256:" + "%064x" % random.getrandbits(256),
+        "created": "2025-01-01T10:00:00Z",
+        "platform": "linux/amd64",
+    }
+
+
+@contextmanager
+def timer(label: str, count: int | None = None):
+    """Print the wall time of the enclosed block (and per-item time if count is given)."""
+    start = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - start
+    if count:
+        print(f"{label:<40} {elapsed * 1000:9.1f} ms total {elapsed / count * 1e6:9.1f} us/item")
+    else:
+        print(f"{label:<40} {elapsed * 1000:9.1f} ms")
@@ -0,0 +1,119 @@
+"""Normalize stored image names with the reference parser
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2026-10-17 00:02:00.000000
+
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7b8c9d0e1f2'
+down_revision: Union[str, Sequence[str], None] = 'f6a7b8c9d0e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# A frozen copy of src.imageref as of this revision, so later changes to the
+# parser cannot change what this migration does to an existing database.
+_PATH_COMPONENT = r"[a-z0-9]+(?:(?:[._]|__|-+)[a-z0-9]+)*"
+_DOMAIN_COMPONENT = r"(?:[a-zA-Z0-9]|[a-zA-Z0-9][a-zA-Z0-9-]*[a-zA-Z0-9])"
+_PATH_RE = re.compile(rf"{_PATH_COMPONENT}(?:/{_PATH_COMPONENT})*", re.ASCII)
+_DOMAIN_RE = re.compile(
+    rf"(?:{_DOMAIN_COMPONENT}(?:\.{_DOMAIN_COMPONENT})*|\[[0-9a-fA-F:]+\])(?::[0-9]+)?", re.ASCII
+)
+_TAG_RE = re.compile(r"[\w][\w.-]{0,127}", re.ASCII)
+_DIGEST_RE = re.compile(r"[A-Za-z][A-Za-z0-9]*(?:[-_+.][A-Za-z][A-Za-z0-9]*)*:[0-9A-Fa-f]{32,}", re.ASCII)
+
+
+def parse(reference: str) -> tuple[str, str | None] | None:
+    # Returns the familiar name and tag, or None if the reference is not valid
+    remainder, at, digest = reference.partition("@")
+    if at and not _DIGEST_RE.fullmatch(digest):
+        return None
+
+    name, tag = remainder, None
+    colon = remainder.rfind(":")
+    if colon > remainder.rfind("/"):
+        name, tag = remainder[:colon], remainder[colon + 1:]
+        if not _TAG_RE.fullmatch(tag):
+            return None
+    if not name or len(name) > 255:
+        return None
+
+    registry, slash, repository = name.partition("/")
+    if not (slash and ("." in registry or ":" in registry or registry == "localhost"
+                       or registry.lower() != registry)):
+        registry, repository = "docker.io", name
+    if not _DOMAIN_RE.fullmatch(registry) or not _PATH_RE.fullmatch(repository):
+        return None
+
+    if registry == "index.docker.io":
+        registry = "docker.io"
+    if registry != "docker.io":
+        return f"{registry}/{repository}", tag
+    namespace, _, rest = repository.partition("/")
+    return (rest if namespace == "library" and rest and "/" not in rest else repository), tag
+
+
+def normalize(image_name: str | None, image_tag: str | None) -> tuple[str, str] | None:
+    # The old split took the last ":" as the tag separator, so joining the two
+    # halves gives back the reference as it was received (minus any digest).
+    if not image_name:
+        return None
+    parsed = parse(f"{image_name}:{image_tag}" if image_tag else image_name)
+    if parsed is None:
+        return None
+    name, tag = parsed
+    return name, tag or "latest"
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+
+    # Rows that now name the same image on a host collapse into the newest one
+    rows = conn.execute(sa.text(
+        "SELECT id, hostname, image_name, image_tag FROM diun_updates ORDER BY created_at, id"
+    )).all()
+    kept: dict[tuple, tuple] = {}
+    for row in rows:
+        normalized = normalize(row.image_name, row.image_tag) or (row.image_name, row.image_tag)
+        kept[(row.hostname, normalized[0])] = (row, normalized)
+    survivors = {row.id for row, _ in kept.values()}
+    stale = [{"id": row.id} for row in rows if row.id not in survivors]
+    if stale:
+        conn.execute(sa.text("DELETE FROM diun_updates WHERE id = :id"), stale)
+
+    # Renamed rows go through a placeholder first so two of them never swap
+    # names into a transient uq_hostname_image_name conflict
+    changed = [
+        {"id": row.id, "image_name": name, "image_tag": tag}
+        for row, (name, tag) in kept.values()
+        if (name, tag) != (row.image_name, row.image_tag)
+    ]
+    if changed:
+        conn.execute(sa.text("UPDATE diun_updates SET image_name = '#' || id WHERE id = :id"), changed)
+        conn.execute(sa.text(
+            "UPDATE diun_updates SET image_name = :image_name, image_tag = :image_tag WHERE id = :id"
+        ), changed)
+
+    history = []
+    for row in conn.execute(sa.text("SELECT id, image_name, image_tag FROM diun_update_history")):
+        normalized = normalize(row.image_name, row.image_tag)
+        if normalized and normalized != (row.image_name, row.image_tag):
+            history.append({"id": row.id, "image_name": normalized[0], "image_tag": normalized[1]})
+    if history:
+        conn.execute(sa.text(
+            "UPDATE diun_update_history SET image_name = :image_name, image_tag = :image_tag WHERE id = :id"
+        ), history)
+
+
+def downgrade() -> None:
+    # The original spellings are not kept; normalized names are valid input
+    # for the older parser too.
+    pass
@@ -0,0 +1,134 @@
+"""Move hostnames and image names into hosts and images tables
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-10-17 00:03:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8c9d0e1f2a3'
+down_revision: Union[str, Sequence[str], None] = 'a7b8c9d0e1f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OPERATIONS = ("INSERT", "UPDATE", "DELETE")
+
+
+def create_version_triggers() -> None:
+    # Dropping diun_updates dropped its triggers (see d4e5f6a7b8c9)
+    for operation in OPERATIONS:
+        op.execute(f"""
+            CREATE TRIGGER diun_updates_bump_version_{operation.lower()}
+            AFTER {operation} ON diun_updates
+            BEGIN
+                UPDATE diun_meta SET data_version = data_version + 1, updated_at = datetime('now') WHERE id = 1;
+            END
+        """)
+
+
+def upgrade() -> None:
+    op.create_table('hosts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('hostname', sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('hostname')
+    )
+    op.create_table('images',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('image_name', sa.String(), nullable=False),
+        sa.Column('hub_link', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('image_name')
+    )
+    op.execute("INSERT INTO hosts (hostname) SELECT DISTINCT coalesce(hostname, '') FROM diun_updates ORDER BY 1")
+    # Each image keeps the newest link any host reported for it
+    op.execute("""
+        INSERT INTO images (image_name, hub_link)
+        SELECT name, (
+            SELECT hub_link FROM diun_updates
+            WHERE coalesce(image_name, '') = name AND hub_link IS NOT NULL
+            ORDER BY created_at DESC, id DESC LIMIT 1
+        )
+        FROM (SELECT DISTINCT coalesce(image_name, '') AS name FROM diun_updates ORDER BY 1)
+    """)
+
+    # SQLite cannot change columns in place, so the table is rebuilt
+    op.create_table('diun_updates_new',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('host_id', sa.Integer(), nullable=False),
+        sa.Column('image_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('provider', sa.String(), nullable=True),
+        sa.Column('image_tag', sa.String(), nullable=True),
+        sa.Column('digest', sa.String(), nullable=True),
+        sa.Column('image_created_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['host_id'], ['hosts.id']),
+        sa.ForeignKeyConstraint(['image_id'], ['images.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('host_id', 'image_id', name='uq_diun_updates_host_id_image_id')
+    )
+    op.execute("""
+        INSERT INTO diun_updates_new
+            (id, host_id, image_id, status, provider, image_tag, digest, image_created_at, created_at)
+        SELECT u.id, h.id, i.id, u.status, u.provider, u.image_tag, u.digest, u.image_created_at, u.created_at
+        FROM diun_updates AS u
+        JOIN hosts AS h ON h.hostname = coalesce(u.hostname, '')
+        JOIN images AS i ON i.image_name = coalesce(u.image_name, '')
+    """)
+    op.drop_table('diun_updates')
+    op.rename_table('diun_updates_new', 'diun_updates')
+
+    op.create_index('ix_diun_updates_created_at_id', 'diun_updates',
+                    [sa.text('created_at DESC'), sa.text('id DESC')])
+    op.create_index('ix_diun_updates_host_id_created_at_id', 'diun_updates',
+                    ['host_id', sa.text('created_at DESC'), sa.text('id DESC')])
+    op.create_index('ix_diun_updates_status_created_at_id', 'diun_updates',
+                    ['status', sa.text('created_at DESC'), sa.text('id DESC')])
+    op.create_index('ix_diun_updates_image_id', 'diun_updates', ['image_id'])
+    create_version_triggers()
+
+
+def downgrade() -> None:
+    op.create_table('diun_updates_old',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('hostname', sa.String(), nullable=True),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('provider', sa.String(), nullable=True),
+        sa.Column('hub_link', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('image_name', sa.String(), nullable=True),
+        sa.Column('image_tag', sa.String(), nullable=True),
+        sa.Column('digest', sa.String(), nullable=True),
+        sa.Column('image_created_at', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('hostname', 'image_name', name='uq_hostname_image_name')
+    )
+    op.execute("""
+        INSERT INTO diun_updates_old
+            (id, hostname, status, provider, hub_link, created_at, image_name, image_tag, digest, image_created_at)
+        SELECT u.id, h.hostname, u.status, u.provider, i.hub_link, u.created_at, i.image_name, u.image_tag,
+               u.digest, u.image_created_at
+        FROM diun_updates AS u
+        JOIN hosts AS h ON h.id = u.host_id
+        JOIN images AS i ON i.id = u.image_id
+    """)
+    op.drop_table('diun_updates')
+    op.rename_table('diun_updates_old', 'diun_updates')
+    op.drop_table('images')
+    op.drop_table('hosts')
+
+    op.create_index('ix_diun_updates_image_name', 'diun_updates', ['image_name'])
+    op.create_index('ix_diun_updates_created_at_id', 'diun_updates',
+                    [sa.text('created_at DESC'), sa.text('id DESC')])
+    op.create_index('ix_diun_updates_hostname_created_at_id', 'diun_updates',
+                    ['hostname', sa.text('created_at DESC'), sa.text('id DESC')])
+    op.create_index('ix_diun_updates_status_created_at_id', 'diun_updates',
+                    ['status', sa.text('created_at DESC'), sa.text('id DESC')])
+    create_version_triggers()
@@ -0,0 +1,45 @@
+"""Add composite indexes for the listing sort order and filters
+
+Revision ID: c3d4e5f6a7b8
+Revises: b2c3d4e5f6a7
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d4e5f6a7b8'
+down_revision: Union[str, Sequence[str], None] = 'b2c3d4e5f6a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Listings are ordered by (created_at DESC, id DESC); these let SQLite walk
+    # the index in order instead of scanning the table into a temp B-tree.
+    op.create_index('ix_diun_updates_created_at_id', 'diun_updates',
+                    [sa.text('created_at DESC'), sa.text('id DESC')])
+    op.create_index('ix_diun_updates_hostname_created_at_id', 'diun_updates',
+                    ['hostname', sa.text('created_at DESC'), sa.text('id DESC')])
+    op.create_index('ix_diun_updates_status_created_at_id', 'diun_updates',
+                    ['status', sa.text('created_at DESC'), sa.text('id DESC')])
+
+    # id is the rowid; hostname is the leading column of uq_hostname_image_name
+    # and of the new hostname index; status leads the new status index.
+    op.drop_index('ix_diun_updates_id', table_name='diun_updates')
+    op.drop_index('ix_diun_updates_hostname', table_name='diun_updates')
+    op.drop_index('ix_diun_updates_status', table_name='diun_updates')
+
+
+def downgrade() -> None:
+    op.create_index('ix_diun_updates_status', 'diun_updates', ['status'], unique=False)
+    op.create_index('ix_diun_updates_hostname', 'diun_updates', ['hostname'], unique=False)
+    op.create_index('ix_diun_updates_id', 'diun_updates', ['id'], unique=False)
+
+    op.drop_index('ix_diun_updates_status_created_at_id', table_name='diun_updates')
+    op.drop_index('ix_diun_updates_hostname_created_at_id', table_name='diun_updates')
+    op.drop_index('ix_diun_updates_created_at_id', table_name='diun_updates')
@@ -0,0 +1,180 @@
+"""Store digests as binary and timestamps as epoch microseconds
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-10-17 00:04:00.000000
+
+"""
+from datetime import UTC, datetime, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9d0e1f2a3b4'
+down_revision: Union[str, Sequence[str], None] = 'b8c9d0e1f2a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OPERATIONS = ("INSERT", "UPDATE", "DELETE")
+COPY_BATCH_SIZE = 5000
+TIMESTAMP_COLUMNS = ('image_created_at', 'created_at', 'fixed_at')
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+# The codec from src.digest, copied as it stood at this revision: what this
+# migration writes must not follow later edits to that module.
+TEXT = 0
+ALGORITHMS = {
+    "sha256": (1, 32),
+    "sha384": (2, 48),
+    "sha512": (3, 64),
+}
+NAMES = {code: name for name, (code, _) in ALGORITHMS.items()}
+HEX_DIGITS = frozenset("0123456789abcdef")
+
+
+def encode_digest(digest: str) -> bytes:
+    name, sep, hex_digits = digest.partition(":")
+    if sep and name in ALGORITHMS:
+        code, size = ALGORITHMS[name]
+        if len(hex_digits) == 2 * size and HEX_DIGITS.issuperset(hex_digits):
+            return bytes((code,)) + bytes.fromhex(hex_digits)
+    return bytes((TEXT,)) + digest.encode()
+
+
+def decode_digest(data: bytes) -> str:
+    code = data[0]
+    if code == TEXT:
+        return data[1:].decode()
+    return f"{NAMES[code]}:{data[1:].hex()}"
+
+
+def to_micros(value: str | None) -> int | None:
+    # DateTime stored "YYYY-MM-DD HH:MM:SS.ffffff"; older rows may use "T" or an offset
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(UTC).replace(tzinfo=None)
+    return (parsed - EPOCH) // MICROSECOND
+
+
+def from_micros(value: int | None) -> str | None:
+    if value is None:
+        return None
+    return (EPOCH + timedelta(microseconds=value)).strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def create_updates_table(name: str, digest_type, timestamp_type) -> None:
+    op.create_table(name,
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('host_id', sa.Integer(), nullable=False),
+        sa.Column('image_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('provider', sa.String(), nullable=True),
+        sa.Column('image_tag', sa.String(), nullable=True),
+        sa.Column('digest', digest_type, nullable=True),
+        sa.Column('image_created_at', timestamp_type, nullable=True),
+        sa.Column('created_at', timestamp_type, nullable=True),
+        sa.ForeignKeyConstraint(['host_id'], ['hosts.id']),
+        sa.ForeignKeyConstraint(['image_id'], ['images.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('host_id', 'image_id', name='uq_diun_updates_host_id_image_id')
+    )
+
+
+def create_history_table(name: str, digest_type, timestamp_type) -> None:
+    op.create_table(name,
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('update_id', sa.Integer(), nullable=True),
+        sa.Column('hostname', sa.String(), nullable=True),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('provider', sa.String(), nullable=True),
+        sa.Column('image_name', sa.String(), nullable=True),
+        sa.Column('image_tag', sa.String(), nullable=True),
+        sa.Column('hub_link', sa.String(), nullable=True),
+        sa.Column('digest', digest_type, nullable=True),
+        sa.Column('image_created_at', timestamp_type, nullable=True),
+        sa.Column('created_at', timestamp_type, nullable=True),
+        sa.Column('fixed_at', timestamp_type, nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def copy_rows(source: str, target: str, convert_digest, convert_timestamp) -> None:
+    conn = op.get_bind()
+    columns = [column["name"] for column in sa.inspect(conn).get_columns(source)]
+    timestamps = [name for name in TIMESTAMP_COLUMNS if name in columns]
+    insert = sa.text(
+        f"INSERT INTO {target} ({', '.join(columns)}) VALUES ({', '.join(':' + name for name in columns)})"
+    )
+    result = conn.execute(sa.text(f"SELECT {', '.join(columns)} FROM {source} ORDER BY id"))
+    while rows := result.fetchmany(COPY_BATCH_SIZE):
+        batch = []
+        for row in rows:
+            params = row._asdict()
+            if params["digest"] is not None:
+                params["digest"] = convert_digest(params["digest"])
+            for name in timestamps:
+                params[name] = convert_timestamp(params[name])
+            batch.append(params)
+        conn.execute(insert, batch)
+
+
+def replace_updates_table(name: str) -> None:
+    op.drop_table('diun_updates')
+    op.rename_table(name, 'diun_updates')
+
+    op.create_index('ix_diun_updates_created_at_id', 'diun_updates',
+                    [sa.text('created_at DESC'), sa.text('id DESC')])
+    op.create_index('ix_diun_updates_host_id_created_at_id', 'diun_updates',
+                    ['host_id', sa.text('created_at DESC'), sa.text('id DESC')])
+    op.create_index('ix_diun_updates_status_created_at_id', 'diun_updates',
+                    ['status', sa.text('created_at DESC'), sa.text('id DESC')])
+    op.create_index('ix_diun_updates_image_id', 'diun_updates', ['image_id'])
+    # Dropping diun_updates dropped its triggers (see d4e5f6a7b8c9)
+    for operation in OPERATIONS:
+        op.execute(f"""
+            CREATE TRIGGER diun_updates_bump_version_{operation.lower()}
+            AFTER {operation} ON diun_updates
+            BEGIN
+                UPDATE diun_meta SET data_version = data_version + 1, updated_at = datetime('now') WHERE id = 1;
+            END
+        """)
+
+
+def replace_history_table(name: str) -> None:
+    op.drop_table('diun_update_history')
+    op.rename_table(name, 'diun_update_history')
+
+    op.create_index('ix_diun_update_history_fixed_at_id', 'diun_update_history',
+                    [sa.text('fixed_at DESC'), sa.text('id DESC')])
+    op.create_index('ix_diun_update_history_hostname_fixed_at_id', 'diun_update_history',
+                    ['hostname', sa.text('fixed_at DESC'), sa.text('id DESC')])
+
+
+def upgrade() -> None:
+    # Values are converted in Python: SQLite's date functions round to milliseconds
+    create_updates_table('diun_updates_new', sa.LargeBinary(), sa.Integer())
+    copy_rows('diun_updates', 'diun_updates_new', encode_digest, to_micros)
+    replace_updates_table('diun_updates_new')
+
+    create_history_table('diun_update_history_new', sa.LargeBinary(), sa.Integer())
+    copy_rows('diun_update_history', 'diun_update_history_new', encode_digest, to_micros)
+    replace_history_table('diun_update_history_new')
+
+
+def downgrade() -> None:
+    create_history_table('diun_update_history_old', sa.String(), sa.DateTime())
+    copy_rows('diun_update_history', 'diun_update_history_old', decode_digest, from_micros)
+    replace_history_table('diun_update_history_old')
+
+    create_updates_table('diun_updates_old', sa.String(), sa.DateTime())
+    copy_rows('diun_updates', 'diun_updates_old', decode_digest, from_micros)
+    replace_updates_table('diun_updates_old')
@@ -0,0 +1,37 @@
+"""Bump the data version from the write instead of per-row triggers
+
+Revision ID: d0e1f2a3b4c5
+Revises: c9d0e1f2a3b4
+Create Date: 2026-10-17 00:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd0e1f2a3b4c5'
+down_revision: Union[str, Sequence[str], None] = 'c9d0e1f2a3b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OPERATIONS = ("INSERT", "UPDATE", "DELETE")
+
+
+def upgrade() -> None:
+    # Every write to diun_updates now adds its row count to diun_meta with one
+    # UPDATE ... RETURNING in its own transaction (see _commit_write)
+    for operation in OPERATIONS:
+        op.execute(f"DROP TRIGGER IF EXISTS diun_updates_bump_version_{operation.lower()}")
+
+
+def downgrade() -> None:
+    for operation in OPERATIONS:
+        op.execute(f"""
+            CREATE TRIGGER diun_updates_bump_version_{operation.lower()}
+            AFTER {operation} ON diun_updates
+            BEGIN
+                UPDATE diun_meta SET data_version = data_version + 1, updated_at = datetime('now') WHERE id = 1;
+            END
+        """)
@@ -0,0 +1,47 @@
+"""Add diun_meta data version counter maintained by triggers
+
+Revision ID: d4e5f6a7b8c9
+Revises: c3d4e5f6a7b8
+Create Date: 2026-10-16 00:01:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4e5f6a7b8c9'
+down_revision: Union[str, Sequence[str], None] = 'c3d4e5f6a7b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OPERATIONS = ("INSERT", "UPDATE", "DELETE")
+
+
+def upgrade() -> None:
+    op.create_table('diun_meta',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('data_version', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("INSERT INTO diun_meta (id, data_version, updated_at) VALUES (1, 0, datetime('now'))")
+
+    # Row-level triggers keep the counter in step with every write, whichever
+    # process or code path makes it.
+    for operation in OPERATIONS:
+        op.execute(f"""
+            CREATE TRIGGER diun_updates_bump_version_{operation.lower()}
+            AFTER {operation} ON diun_updates
+            BEGIN
+                UPDATE diun_meta SET data_version = data_version + 1, updated_at = datetime('now') WHERE id = 1;
+            END
+        """)
+
+
+def downgrade() -> None:
+    for operation in OPERATIONS:
+        op.execute(f"DROP TRIGGER IF EXISTS diun_updates_bump_version_{operation.lower()}")
+    op.drop_table('diun_meta')
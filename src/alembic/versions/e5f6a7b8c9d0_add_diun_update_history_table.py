@@ -0,0 +1,47 @@
+"""Add diun_update_history archive of fixed updates
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f6a7b8c9d0'
+down_revision: Union[str, Sequence[str], None] = 'd4e5f6a7b8c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('diun_update_history',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('update_id', sa.Integer(), nullable=True),
+        sa.Column('hostname', sa.String(), nullable=True),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('provider', sa.String(), nullable=True),
+        sa.Column('image_name', sa.String(), nullable=True),
+        sa.Column('image_tag', sa.String(), nullable=True),
+        sa.Column('hub_link', sa.String(), nullable=True),
+        sa.Column('digest', sa.String(), nullable=True),
+        sa.Column('image_created_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('fixed_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    # Time-range reads, optionally per host, walk these newest first.
+    op.create_index('ix_diun_update_history_fixed_at_id', 'diun_update_history',
+                    [sa.text('fixed_at DESC'), sa.text('id DESC')])
+    op.create_index('ix_diun_update_history_hostname_fixed_at_id', 'diun_update_history',
+                    ['hostname', sa.text('fixed_at DESC'), sa.text('id DESC')])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_diun_update_history_hostname_fixed_at_id', table_name='diun_update_history')
+    op.drop_index('ix_diun_update_history_fixed_at_id', table_name='diun_update_history')
+    op.drop_table('diun_update_history')
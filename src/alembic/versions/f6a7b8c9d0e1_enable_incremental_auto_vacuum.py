@@ -0,0 +1,36 @@
+"""Enable incremental auto_vacuum
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-10-17 00:01:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6a7b8c9d0e1'
+down_revision: Union[str, Sequence[str], None] = 'e5f6a7b8c9d0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def set_auto_vacuum(mode: str) -> None:
+    # An existing database only switches auto_vacuum mode on the next VACUUM,
+    # which rebuilds the file and cannot run inside a transaction. VACUUM keeps
+    # tables, indexes and triggers as they are.
+    with op.get_context().autocommit_block():
+        op.execute(f"PRAGMA auto_vacuum = {mode}")
+        op.execute("VACUUM")
+
+
+def upgrade() -> None:
+    # Freed pages stay in the file until the maintenance task hands them back
+    # with PRAGMA incremental_vacuum.
+    set_auto_vacuum("INCREMENTAL")
+
+
+def downgrade() -> None:
+    set_auto_vacuum("NONE")
@@ -1,45 +1,517 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, UniqueConstraint
+from sqlalchemy import create_engine, event, bindparam, delete, func, insert, select, text, tuple_, Column, ForeignKey, Integer, LargeBinary, String, DateTime, Table, TypeDecorator, UniqueConstraint, Index
 from sqlalchemy.dialects.sqlite import insert as sqlite_insert
-from sqlalchemy.orm import sessionmaker, Session, declarative_base
-from .models import DiunUpdateData
-from datetime import datetime, UTC
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import column_property, sessionmaker, Session, declarative_base
+from sqlalchemy.sql.expression import Join
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from .models import DiunUpdateData, UpdateParams
+from .digest import decode_digest, encode_digest
+from .events import broker as event_broker
+from contextlib import asynccontextmanager, closing, nullcontext
+from datetime import datetime, timedelta, UTC
+import asyncio
+import base64
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
 
-DATABASE_URL = "sqlite:///./data/diun.db"
+logger = logging.getLogger(__name__)
+
+DATABASE_PATH = "./data/diun.db"
+DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
+# Alembic head revision this code runs against. Update it with every new
+# revision; tests/test_migrations.py checks it against the revision scripts.
+SCHEMA_HEAD = "d0e1f2a3b4c5"
+DIUN_DB_READ_POOL_SIZE = int(os.environ.get("DIUN_DB_READ_POOL_SIZE", "5"))
+# Newest rows kept in the in-process dashboard cache; 0 disables it.
+DIUN_READ_CACHE_ROWS = int(os.environ.get("DIUN_READ_CACHE_ROWS", "2000"))
+
+# Named PRAGMA presets selectable with DIUN_SQLITE_PROFILE. Every setting can
+# also be overridden individually, e.g. DIUN_SQLITE_MMAP_SIZE=0.
+SQLITE_PROFILES = {
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+        "cache_size": -8192,  # negative = KiB
+        "temp_store": "DEFAULT",
+        "mmap_size": 0,
+        "wal_autocheckpoint": None,
+    },
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "cache_size": -32768,
+        "temp_store": "MEMORY",
+        "mmap_size": 64 * 1024 * 1024,
+        "wal_autocheckpoint": None,
+    },
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "busy_timeout": 10000,
+        "cache_size": -131072,
+        "temp_store": "MEMORY",
+        "mmap_size": 256 * 1024 * 1024,
+        "wal_autocheckpoint": 4000,
+    },
+}
+DEFAULT_SQLITE_PROFILE = "balanced"
+
+_PRAGMA_CHOICES = {
+    "journal_mode": {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"},
+    "synchronous": {"OFF", "NORMAL", "FULL", "EXTRA"},
+    "temp_store": {"DEFAULT", "FILE", "MEMORY"},
+}
+
+def sqlite_pragmas_from_env(environ=os.environ) -> dict:
+    """
+    Resolve the SQLite PRAGMA settings from DIUN_SQLITE_PROFILE and per-setting
+    DIUN_SQLITE_<NAME> overrides.
+
+    Returns:
+        Mapping of PRAGMA name to value; None means "leave SQLite's default"
+
+    Raises:
+        ValueError: If the profile or an override is not valid
+    """
+    profile = environ.get("DIUN_SQLITE_PROFILE", DEFAULT_SQLITE_PROFILE).lower()
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown DIUN_SQLITE_PROFILE {profile!r} (expected one of {', '.join(SQLITE_PROFILES)})")
+
+    pragmas = dict(SQLITE_PROFILES[profile])
+    for name in pragmas:
+        override = environ.get(f"DIUN_SQLITE_{name.upper()}")
+        if override is None or override == "":
+            continue
+        if name in _PRAGMA_CHOICES:
+            if override.upper() not in _PRAGMA_CHOICES[name]:
+                raise ValueError(f"Invalid DIUN_SQLITE_{name.upper()} {override!r}")
+            pragmas[name] = override.upper()
+        else:
+            try:
+                pragmas[name] = int(override)
+            except ValueError:
+                raise ValueError(f"DIUN_SQLITE_{name.upper()} must be an integer, got {override!r}")
+    return pragmas
+
+def apply_sqlite_pragmas(engine, pragmas: dict) -> None:
+    """Register a connect hook that applies pragmas to every new connection of engine."""
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            # busy_timeout first, so switching journal mode waits out other writers
+            if pragmas.get("busy_timeout") is not None:
+                cursor.execute(f"PRAGMA busy_timeout = {int(pragmas['busy_timeout'])}")
+            for name, value in pragmas.items():
+                if value is None or name == "busy_timeout":
+                    continue
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
+
+def read_sqlite_pragmas(engine, names) -> dict:
+    """Read back the effective values of the given PRAGMAs from a live connection."""
+    with engine.connect() as connection:
+        return {
+            name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+            for name in names
+        }
+
+def get_schema_revision(database_path: str) -> str | None:
+    """
+    Read the revision stamped in alembic_version without loading Alembic.
+
+    Uses a plain read-only sqlite3 connection, so a missing database file is
+    not created.
+
+    Returns:
+        The revision id, or None if the database or the table does not exist
+    """
+    try:
+        with closing(sqlite3.connect(f"file:{database_path}?mode=ro", uri=True)) as connection:
+            rows = connection.execute("SELECT version_num FROM alembic_version").fetchall()
+    except sqlite3.Error:
+        return None
+    return rows[0][0] if len(rows) == 1 else None
+
+try:
+    SQLITE_PRAGMAS = sqlite_pragmas_from_env()
+except ValueError as e:
+    logger.critical(str(e))
+    raise SystemExit(1)
 
 engine = create_engine(
     DATABASE_URL, connect_args={"check_same_thread": False}
 )
+apply_sqlite_pragmas(engine, SQLITE_PRAGMAS)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+class SessionPool:
+    """
+    Hands out AsyncSessions bound to one engine and records how long callers
+    wait before their session holds a connection.
+
+    With serialize=True only one session is handed out at a time, which is how
+    all writes are funnelled through SQLite's single writer.
+    """
+
+    def __init__(self, name: str, session_factory: async_sessionmaker, serialize: bool = False):
+        self.name = name
+        self.session_factory = session_factory
+        self.serialize = serialize
+        self._lock: asyncio.Lock | None = None
+        self._lock_loop = None
+        self.acquisitions = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _get_lock(self) -> asyncio.Lock:
+        # asyncio.Lock is bound to the loop it is first used on
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    @asynccontextmanager
+    async def session(self):
+        start = time.perf_counter()
+        async with self._get_lock() if self.serialize else nullcontext():
+            async with self.session_factory() as db:
+                await db.connection()
+                wait = time.perf_counter() - start
+                self.acquisitions += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+                yield db
+
+    def stats(self) -> dict:
+        """Return lock-wait counters for this pool."""
+        return {
+            "acquisitions": self.acquisitions,
+            "total_wait_ms": round(self.total_wait * 1000, 3),
+            "avg_wait_ms": round(self.total_wait / self.acquisitions * 1000, 3) if self.acquisitions else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+        }
+
+def create_session_pools(
+    database_path: str,
+    pragmas: dict,
+    read_pool_size: int = 5,
+    read_cache: "ReadCache | None" = None,
+    listeners: tuple = (),
+    **engine_kwargs,
+) -> tuple[SessionPool, SessionPool]:
+    """
+    Build the writer and reader SessionPools for a SQLite file.
+
+    The writer owns a single aiosqlite connection and serializes every session.
+    Readers open the file with mode=ro and query_only, so a read can never take
+    a write lock; in WAL mode they also never wait behind the writer.
+
+    When read_cache is given, sessions from both pools carry it in Session.info,
+    so dashboard reads are served from it and writes keep it current. Writes
+    through either pool also report their changes to each of listeners, and
+    share one InternCache of host and image ids.
+
+    Returns:
+        (writer, reader) pools
+    """
+    if "poolclass" not in engine_kwargs:
+        write_kwargs = dict(pool_size=1, max_overflow=0)
+        read_kwargs = dict(pool_size=read_pool_size, max_overflow=0)
+    else:
+        write_kwargs = read_kwargs = {}
+
+    write_engine = create_async_engine(f"sqlite+aiosqlite:///{database_path}", **write_kwargs, **engine_kwargs)
+    apply_sqlite_pragmas(write_engine.sync_engine, pragmas)
+
+    read_engine = create_async_engine(
+        f"sqlite+aiosqlite:///file:{database_path}?mode=ro&uri=true", **read_kwargs, **engine_kwargs
+    )
+    # A read-only connection cannot change the journal mode; the writer sets it.
+    read_pragmas = {name: value for name, value in pragmas.items() if name != "journal_mode"}
+    apply_sqlite_pragmas(read_engine.sync_engine, {**read_pragmas, "query_only": "ON"})
+
+    info = {
+        READ_CACHE_KEY: read_cache,
+        INTERN_CACHE_KEY: InternCache(),
+        CHANGE_LISTENERS_KEY: [listener for listener in (read_cache, *listeners) if listener is not None],
+    }
+    return (
+        SessionPool("writer", async_sessionmaker(write_engine, autoflush=False, info=info), serialize=True),
+        SessionPool("reader", async_sessionmaker(read_engine, autoflush=False, info=info)),
+    )
+
 Base = declarative_base()
 
+class Host(Base):
+    """Hostnames reporting updates, stored once and referenced by diun_updates.host_id."""
+    __tablename__ = "hosts"
+
+    id = Column(Integer, primary_key=True)
+    hostname = Column(String, nullable=False, unique=True)
+
+class Image(Base):
+    """Image names seen across the fleet, with the registry link shared by every host running them."""
+    __tablename__ = "images"
+
+    id = Column(Integer, primary_key=True)
+    image_name = Column(String, nullable=False, unique=True)
+    hub_link = Column(String)
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+class EpochMicros(TypeDecorator):
+    """
+    A datetime stored as integer microseconds since the Unix epoch.
+
+    Values read back are naive UTC, like DateTime's. An integer takes at most
+    8 bytes in rows and indexes where DateTime's text takes 26, and sorts
+    without comparing strings.
+    """
+    impl = Integer
+    cache_ok = True
+
+    @property
+    def python_type(self):
+        return datetime
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return (_naive_utc(value) - _EPOCH) // _MICROSECOND
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return _EPOCH + timedelta(microseconds=value)
+
+class Digest(TypeDecorator):
+    """An image digest string stored as a BLOB by digest.encode_digest."""
+    impl = LargeBinary
+    cache_ok = True
+
+    @property
+    def python_type(self):
+        return str
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else encode_digest(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else decode_digest(value)
+
+# One row per (host, image). Hosts and images are only ever added, so an id
+# stays valid once seen; see InternCache.
+diun_updates_table = Table(
+    "diun_updates",
+    Base.metadata,
+    Column("id", Integer, primary_key=True),
+    Column("host_id", Integer, ForeignKey("hosts.id"), nullable=False),
+    Column("image_id", Integer, ForeignKey("images.id"), nullable=False),
+    Column("status", String),
+    Column("provider", String),
+    Column("image_tag", String),
+    Column("digest", Digest),
+    Column("image_created_at", EpochMicros),  # When the image was created (from DIUN)
+    Column("created_at", EpochMicros, default=lambda: datetime.now(UTC)),  # When webhook was received
+    UniqueConstraint("host_id", "image_id", name="uq_diun_updates_host_id_image_id"),
+)
+
+# Composite indexes matching the listing order (created_at DESC, id DESC),
+# optionally narrowed by host or status; image_id serves fleet-wide deletes.
+Index("ix_diun_updates_created_at_id", diun_updates_table.c.created_at.desc(), diun_updates_table.c.id.desc())
+Index(
+    "ix_diun_updates_host_id_created_at_id",
+    diun_updates_table.c.host_id, diun_updates_table.c.created_at.desc(), diun_updates_table.c.id.desc(),
+)
+Index(
+    "ix_diun_updates_status_created_at_id",
+    diun_updates_table.c.status, diun_updates_table.c.created_at.desc(), diun_updates_table.c.id.desc(),
+)
+Index("ix_diun_updates_image_id", diun_updates_table.c.image_id)
+
 class DiunUpdate(Base):
-    __tablename__ = "diun_updates"
-    __table_args__ = (
-        UniqueConstraint('hostname', 'image_name', name='uq_hostname_image_name'),
-    )
+    """
+    An update as the application sees it: a diun_updates row joined with its
+    host and image, so hostname, image_name and hub_link read like columns.
+
+    Queries on this class select from the join. Rows are written with Core
+    statements on diun_updates_table (upsert_diun_update and friends), which
+    resolve names to ids first.
+    """
+    __table__ = diun_updates_table.join(Host.__table__).join(Image.__table__)
+    __mapper_args__ = {"primary_key": [diun_updates_table.c.id]}
+
+    id = diun_updates_table.c.id
+    host_id = column_property(diun_updates_table.c.host_id, Host.__table__.c.id)
+    image_id = column_property(diun_updates_table.c.image_id, Image.__table__.c.id)
 
-    id = Column(Integer, primary_key=True, index=True)
-    hostname = Column(String, index=True)
-    status = Column(String, index=True)
+class DiunUpdateHistory(Base):
+    """
+    Append-only archive of fixed updates. The delete functions move each row
+    here in the same transaction that removes it from diun_updates; the
+    history compactor trims the oldest rows to the configured age and size.
+    """
+    __tablename__ = "diun_update_history"
+
+    id = Column(Integer, primary_key=True)
+    update_id = Column(Integer)  # id the row had in diun_updates
+    hostname = Column(String)
+    status = Column(String)
     provider = Column(String)
-    image_name = Column(String, index=True)
+    image_name = Column(String)
     image_tag = Column(String)
     hub_link = Column(String)
-    digest = Column(String)
-    image_created_at = Column(DateTime)  # When the image was created (from DIUN)
-    created_at = Column(DateTime, default=lambda: datetime.now(UTC))  # When webhook was received
+    digest = Column(Digest)
+    image_created_at = Column(EpochMicros)
+    created_at = Column(EpochMicros)  # When the webhook was received
+    fixed_at = Column(EpochMicros, nullable=False)  # When the row was fixed
 
-def upsert_diun_update(db: Session, update_data: DiunUpdateData) -> DiunUpdate:
+# Listing and range indexes on fixed_at, newest first, optionally per host, so
+# any time window ("fixed last week on web-1") is an index range scan.
+Index("ix_diun_update_history_fixed_at_id", DiunUpdateHistory.fixed_at.desc(), DiunUpdateHistory.id.desc())
+Index(
+    "ix_diun_update_history_hostname_fixed_at_id",
+    DiunUpdateHistory.hostname, DiunUpdateHistory.fixed_at.desc(), DiunUpdateHistory.id.desc(),
+)
+
+class DataVersion(Base):
     """
-    Create or update a DIUN update record atomically using SQLite ON CONFLICT DO UPDATE,
-    replacing any existing entry for the same hostname and image name combination.
+    Single-row table counting the rows inserted, updated and deleted in
+    diun_updates. Every write adds its row count in its own transaction (see
+    _commit_write), so the value is consistent across connections and worker
+    processes.
+    """
+    __tablename__ = "diun_meta"
 
-    Args:
-        db: Database session
-        update_data: DiunUpdateData object with parsed image data
+    id = Column(Integer, primary_key=True)
+    data_version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime)  # When diun_updates last changed (UTC, second resolution)
+
+DATA_VERSION_DDL = [
+    "INSERT OR IGNORE INTO diun_meta (id, data_version, updated_at) VALUES (1, 0, datetime('now'))",
+]
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_data_version_row(target, connection, **kw):
+    # Mirrors revision d4e5f6a7b8c9 for databases built with create_all().
+    for statement in DATA_VERSION_DDL:
+        connection.exec_driver_sql(statement)
+
+# Session.info key for the InternCache of the session's database.
+INTERN_CACHE_KEY = "intern_cache"
+
+class InternCache:
     """
-    stmt = sqlite_insert(DiunUpdate).values(
+    Host and image ids for one database, so an ingest resolves names without
+    a query once the fleet has been seen.
+
+    Maps hostname to hosts.id and image name to (images.id, hub_link). Hosts
+    and images are never deleted, so a cached id cannot go stale; ids created
+    by other processes are picked up on the first miss. Entries are remembered
+    only after the transaction that resolved them commits.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hosts: dict[str, int] = {}
+        self.images: dict[str, tuple[int, str | None]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, db: Session, updates) -> tuple[dict[str, int], dict[str, tuple[int, str | None]]]:
+        """
+        Resolve the host and image ids for updates, adding hosts and images not seen before.
+
+        A non-null hub_link replaces the image's stored one; a missing one keeps
+        it. Names answered from memory cost nothing; the rest are resolved with
+        one INSERT ... ON CONFLICT ... RETURNING per table. The caller commits
+        and then passes the result to remember().
+
+        Returns:
+            (hostname -> host id, image name -> (image id, hub_link)) for every name in updates
+        """
+        links: dict[str, str | None] = {}
+        for update_data in updates:
+            if update_data.hub_link is not None or update_data.image_name not in links:
+                links[update_data.image_name] = update_data.hub_link
+        with self._lock:
+            hosts = {update_data.hostname: self.hosts.get(update_data.hostname) for update_data in updates}
+            images = {name: self.images.get(name) for name in links}
+        missing_hosts = [hostname for hostname, host_id in hosts.items() if host_id is None]
+        changed_images = [
+            name for name, cached in images.items()
+            if cached is None or (links[name] is not None and links[name] != cached[1])
+        ]
+        misses = len(missing_hosts) + len(changed_images)
+        self.misses += misses
+        self.hits += len(hosts) + len(images) - misses
+
+        for start in range(0, len(missing_hosts), BATCH_INSERT_CHUNK_SIZE):
+            stmt = sqlite_insert(Host).values(
+                [{"hostname": hostname} for hostname in missing_hosts[start:start + BATCH_INSERT_CHUNK_SIZE]]
+            )
+            # DO UPDATE rather than DO NOTHING, so RETURNING also reports existing hosts
+            stmt = stmt.on_conflict_do_update(index_elements=["hostname"], set_={"hostname": stmt.excluded.hostname})
+            hosts.update(db.execute(stmt.returning(Host.hostname, Host.id)).all())
+        for start in range(0, len(changed_images), BATCH_INSERT_CHUNK_SIZE):
+            stmt = sqlite_insert(Image).values([
+                {"image_name": name, "hub_link": links[name]}
+                for name in changed_images[start:start + BATCH_INSERT_CHUNK_SIZE]
+            ])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["image_name"],
+                set_={"hub_link": func.coalesce(stmt.excluded.hub_link, Image.hub_link)},
+            )
+            for name, image_id, hub_link in db.execute(stmt.returning(Image.image_name, Image.id, Image.hub_link)):
+                images[name] = (image_id, hub_link)
+        return hosts, images
+
+    def remember(self, hosts: dict[str, int], images: dict[str, tuple[int, str | None]]) -> None:
+        """Store ids returned by resolve() once their transaction has committed."""
+        with self._lock:
+            self.hosts.update(hosts)
+            self.images.update(images)
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the number of cached names."""
+        with self._lock:
+            return {"hosts": len(self.hosts), "images": len(self.images), "hits": self.hits, "misses": self.misses}
+
+def _intern_cache(db: Session) -> InternCache:
+    """The InternCache attached to db's session factory, or one for this session alone."""
+    cache = db.info.get(INTERN_CACHE_KEY)
+    if cache is None:
+        cache = db.info[INTERN_CACHE_KEY] = InternCache()
+    return cache
+
+def _on_conflict_replace(stmt):
+    """Turn an INSERT into an upsert keyed on (host_id, image_id)."""
+    return stmt.on_conflict_do_update(
+        index_elements=['host_id', 'image_id'],
+        set_=dict(
+            status=stmt.excluded.status,
+            provider=stmt.excluded.provider,
+            image_tag=stmt.excluded.image_tag,
+            digest=stmt.excluded.digest,
+            image_created_at=stmt.excluded.image_created_at,
+            created_at=stmt.excluded.created_at,
+        )
+    )
+
+def _upsert_params(update_data: DiunUpdateData | UpdateParams, now: datetime) -> dict:
+    """Map a DiunUpdateData or UpdateParams onto diun_updates column values, by name."""
+    return dict(
         hostname=update_data.hostname,
         status=update_data.status,
         provider=update_data.provider,
@@ -48,26 +520,106 @@ def upsert_diun_update(db: Session, update_data: DiunUpdateData) -> DiunUpdate:
         digest=update_data.digest,
         image_created_at=update_data.image_created_at,
         hub_link=update_data.hub_link,
-        created_at=datetime.now(UTC),
+        created_at=now,
     )
-    stmt = stmt.on_conflict_do_update(
-        index_elements=['hostname', 'image_name'],
-        set_=dict(
-            status=stmt.excluded.status,
-            provider=stmt.excluded.provider,
-            image_tag=stmt.excluded.image_tag,
-            digest=stmt.excluded.digest,
-            image_created_at=stmt.excluded.image_created_at,
-            hub_link=stmt.excluded.hub_link,
-            created_at=stmt.excluded.created_at,
-        )
+
+def _with_ids(params: dict, hosts: dict[str, int], images: dict[str, tuple[int, str | None]]) -> dict:
+    """Add the host_id and image_id for params' names, as bound by the upsert statements."""
+    params["host_id"] = hosts[params["hostname"]]
+    params["image_id"] = images[params["image_name"]][0]
+    return params
+
+def _stored_updates(rows, hosts: dict[str, int], images: dict[str, tuple[int, str | None]]) -> list[DiunUpdate]:
+    """Build detached DiunUpdates from diun_updates rows returned by an upsert and the names they were resolved from."""
+    host_names = {host_id: hostname for hostname, host_id in hosts.items()}
+    image_names = {image_id: (name, hub_link) for name, (image_id, hub_link) in images.items()}
+    updates = []
+    for row in rows:
+        image_name, hub_link = image_names[row.image_id]
+        updates.append(DiunUpdate(**row._mapping, hostname=host_names[row.host_id], image_name=image_name, hub_link=hub_link))
+    return updates
+
+# Built once and executed with bound parameters, so SQLAlchemy's compiled
+# cache is hit on every call. RETURNING hands back the stored row in the same
+# statement.
+UPSERT_STATEMENT = _on_conflict_replace(
+    sqlite_insert(diun_updates_table).values(
+        host_id=bindparam("host_id"),
+        image_id=bindparam("image_id"),
+        status=bindparam("status"),
+        provider=bindparam("provider"),
+        image_tag=bindparam("image_tag"),
+        digest=bindparam("digest"),
+        image_created_at=bindparam("image_created_at"),
+        created_at=bindparam("created_at"),
     )
-    db.execute(stmt)
-    db.commit()
-    return db.query(DiunUpdate).filter(
-        DiunUpdate.hostname == update_data.hostname,
-        DiunUpdate.image_name == update_data.image_name,
-    ).one()
+).returning(*diun_updates_table.c)
+
+def upsert_diun_update(db: Session, update_data: DiunUpdateData | UpdateParams) -> DiunUpdate:
+    """
+    Create or update a DIUN update record atomically using SQLite ON CONFLICT DO UPDATE,
+    replacing any existing entry for the same hostname and image name combination.
+
+    The host and image ids come from the InternCache, so once both are known an
+    ingest is one statement on diun_updates plus the data_version bump. The stored row is read back with
+    RETURNING and returned as a DiunUpdate outside the session.
+
+    Args:
+        db: Database session
+        update_data: DiunUpdateData or UpdateParams with parsed image data
+    """
+    cache = _intern_cache(db)
+    hosts, images = cache.resolve(db, [update_data])
+    row = db.execute(UPSERT_STATEMENT, _with_ids(_upsert_params(update_data, datetime.now(UTC)), hosts, images)).one()
+    version = _commit_write(db, 1)
+    cache.remember(hosts, images)
+    update, = _stored_updates([row], hosts, images)
+    _notify_listeners(db, "record_upsert", update, version)
+    return update
+
+# Rows per multi-row INSERT; 8 columns each keeps us well under SQLite's
+# historical limit of 999 bound parameters per statement.
+BATCH_INSERT_CHUNK_SIZE = 100
+# diun_updates columns written by an upsert
+UPSERT_COLUMNS = ("host_id", "image_id", "status", "provider", "image_tag", "digest", "image_created_at", "created_at")
+
+def upsert_diun_updates(db: Session, updates: list[DiunUpdateData | UpdateParams]) -> int:
+    """
+    Create or update many DIUN update records in a single transaction.
+
+    Rows are written with multi-row INSERT ... ON CONFLICT DO UPDATE statements
+    and committed once. Payloads repeating the same hostname and image name are
+    collapsed so the last one wins, mirroring sequential upsert_diun_update calls.
+
+    Args:
+        db: Database session
+        updates: DiunUpdateData or UpdateParams with parsed image data
+
+    Returns:
+        Number of distinct records written
+    """
+    latest: dict[tuple[str, str], DiunUpdateData | UpdateParams] = {}
+    for update_data in updates:
+        key = (update_data.hostname, update_data.image_name)
+        latest.pop(key, None)
+        latest[key] = update_data
+    if not latest:
+        return 0
+
+    cache = _intern_cache(db)
+    hosts, images = cache.resolve(db, updates)
+    now = datetime.now(UTC)
+    rows = [_with_ids(_upsert_params(update_data, now), hosts, images) for update_data in latest.values()]
+    written = []
+    for start in range(0, len(rows), BATCH_INSERT_CHUNK_SIZE):
+        stmt = sqlite_insert(diun_updates_table).values([
+            {column: row[column] for column in UPSERT_COLUMNS} for row in rows[start:start + BATCH_INSERT_CHUNK_SIZE]
+        ])
+        written.extend(db.execute(_on_conflict_replace(stmt).returning(*diun_updates_table.c)))
+    version = _commit_write(db, len(written))
+    cache.remember(hosts, images)
+    _notify_listeners(db, "record_upserts", _stored_updates(written, hosts, images), version)
+    return len(rows)
 
 def delete_diun_update(db: Session, update_id: int) -> bool:
     """
@@ -80,28 +632,232 @@ def delete_diun_update(db: Session, update_id: int) -> bool:
     Returns:
         True if the update was found and deleted, False if not found
     """
-    update = db.query(DiunUpdate).filter(DiunUpdate.id == update_id).first()
-    if not update:
-        return False
-        
-    db.delete(update)
-    db.commit()
-    return True
+    return bool(delete_diun_updates(db, ids=[update_id]))
+
+def _host_id(hostname: str):
+    """Scalar subquery for the id of hostname, a unique index lookup on hosts."""
+    return select(Host.id).where(Host.hostname == hostname).scalar_subquery()
+
+def _image_id(image_name: str):
+    """Scalar subquery for the id of image_name, a unique index lookup on images."""
+    return select(Image.id).where(Image.image_name == image_name).scalar_subquery()
+
+def _selection_filters(
+    ids: list[int] | None = None,
+    hostname: str | None = None,
+    image_name: str | None = None,
+    status: str | None = None,
+    older_than: datetime | None = None,
+) -> list:
+    """
+    WHERE clauses on diun_updates_table selecting records for a bulk delete;
+    all given criteria must match.
+
+    Raises:
+        ValueError: If no criteria are given
+    """
+    columns = diun_updates_table.c
+    filters = []
+    if ids is not None:
+        filters.append(columns.id.in_(ids))
+    if hostname is not None:
+        filters.append(columns.host_id == _host_id(hostname))
+    if image_name is not None:
+        filters.append(columns.image_id == _image_id(image_name))
+    if status is not None:
+        filters.append(columns.status == status)
+    if older_than is not None:
+        filters.append(columns.created_at < _naive_utc(older_than))
+    if not filters:
+        raise ValueError("At least one of ids, hostname, image_name, status or older_than is required")
+    return filters
+
+def _history_params(row, fixed_at: datetime) -> dict:
+    """Map a deleted diun_updates row onto ARCHIVE_STATEMENT parameters."""
+    params = row._asdict()
+    params["update_id"] = params.pop("id")
+    params["fixed_at"] = fixed_at
+    return params
+
+# Copies a deleted diun_updates row into the archive, looking its names up by id.
+ARCHIVE_STATEMENT = insert(DiunUpdateHistory.__table__).values(
+    update_id=bindparam("update_id"),
+    hostname=select(Host.hostname).where(Host.id == bindparam("host_id")).scalar_subquery(),
+    status=bindparam("status"),
+    provider=bindparam("provider"),
+    image_name=select(Image.image_name).where(Image.id == bindparam("image_id")).scalar_subquery(),
+    image_tag=bindparam("image_tag"),
+    hub_link=select(Image.hub_link).where(Image.id == bindparam("image_id")).scalar_subquery(),
+    digest=bindparam("digest"),
+    image_created_at=bindparam("image_created_at"),
+    created_at=bindparam("created_at"),
+    fixed_at=bindparam("fixed_at"),
+)
+
+def _delete_and_archive(db: Session, *filters) -> list[int]:
+    """
+    Delete the records matching filters and append them to diun_update_history.
+
+    DELETE ... RETURNING hands back the full rows, which feed one prepared
+    INSERT into the archive, executed for all of them in the same transaction.
+    The caller commits.
+
+    Returns:
+        IDs of the deleted records
+    """
+    stmt = delete(diun_updates_table).where(*filters).returning(*diun_updates_table.c)
+    rows = db.execute(stmt).all()
+    if rows:
+        fixed_at = datetime.now(UTC)
+        db.execute(ARCHIVE_STATEMENT, [_history_params(row, fixed_at) for row in rows])
+    return [row.id for row in rows]
+
+def delete_diun_updates(db: Session, **criteria) -> list[int]:
+    """
+    Delete every DIUN update record matching the criteria in a single statement.
+
+    Runs one DELETE ... RETURNING and commits, so fixing a whole host or an
+    image across the fleet is one write instead of one per row. The deleted
+    rows are archived to diun_update_history in the same transaction.
+
+    Args:
+        db: Database session
+        **criteria: ids, hostname, image_name, status and/or older_than
+            (records created before this time); all given criteria must match
+
+    Returns:
+        IDs of the deleted records
+
+    Raises:
+        ValueError: If no criteria are given
+    """
+    deleted = _delete_and_archive(db, *_selection_filters(**criteria))
+    version = _commit_write(db, len(deleted))
+    if deleted:
+        _notify_listeners(db, "record_deletes", deleted, version)
+    return deleted
+
+def count_diun_updates(db: Session, **criteria) -> int:
+    """
+    Count the records delete_diun_updates would remove, without deleting them.
+
+    Each single criterion is answered from an index alone; SQLite never reads
+    the table rows.
+
+    Raises:
+        ValueError: If no criteria are given
+    """
+    return db.scalar(select(func.count()).select_from(diun_updates_table).where(*_selection_filters(**criteria)))
+
+# Rows removed per transaction by Fix All. Each batch holds the write lock only
+# briefly, so webhooks waiting for the writer get in between batches.
+DELETE_BATCH_SIZE = 1000
 
-def delete_all_diun_updates(db: Session) -> int:
+def delete_diun_updates_batch(db: Session, after_id: int, max_id: int, batch_size: int = DELETE_BATCH_SIZE) -> list[int]:
+    """
+    Delete the next batch_size records in the rowid range (after_id, max_id] and commit.
+
+    The end of the batch is found with an index seek on the primary key, so the
+    DELETE is a bounded range scan however large the table is. The deleted
+    rows are archived to diun_update_history in the same transaction.
+
+    Returns:
+        IDs of the deleted records; fewer than batch_size means the range is exhausted
+    """
+    update_id = diun_updates_table.c.id
+    boundary = db.scalar(
+        select(update_id)
+        .where(update_id > after_id, update_id <= max_id)
+        .order_by(update_id)
+        .offset(batch_size - 1)
+        .limit(1)
+    )
+    deleted = _delete_and_archive(db, update_id > after_id, update_id <= (max_id if boundary is None else boundary))
+    version = _commit_write(db, len(deleted))
+    if deleted:
+        _notify_listeners(db, "record_deletes", deleted, version)
+    return deleted
+
+def delete_all_diun_updates(db: Session, batch_size: int = DELETE_BATCH_SIZE) -> int:
     """
     Delete all DIUN update records.
+
+    Records are removed in batches of batch_size, each in its own short
+    transaction, up to the highest id present when the call started. The count
+    comes from the deleted rows themselves rather than a COUNT(*) scan.
     
     Args:
         db: Database session
+        batch_size: Records deleted per transaction
         
     Returns:
         Number of records deleted
     """
-    count = db.query(DiunUpdate).count()
-    db.query(DiunUpdate).delete()
-    db.commit()
-    return count
+    max_id = db.scalar(select(func.max(diun_updates_table.c.id)))
+    total, after_id = 0, 0
+    while max_id is not None:
+        deleted = delete_diun_updates_batch(db, after_id, max_id, batch_size)
+        total += len(deleted)
+        if len(deleted) < batch_size:
+            break
+        after_id = max(deleted)
+    return total
+
+# Rows removed per transaction by the retention sweeper
+EXPIRE_BATCH_SIZE = 500
+
+def delete_expired_diun_updates_batch(
+    db: Session,
+    older_than: datetime,
+    hostname: str | None = None,
+    status: str | None = None,
+    exclude_hostnames: tuple[str, ...] = (),
+    exclude_statuses: tuple[str, ...] = (),
+    batch_size: int = EXPIRE_BATCH_SIZE,
+) -> list[int]:
+    """
+    Delete the oldest batch_size records received before older_than and commit.
+
+    The batch is chosen in created_at order from the listing index matching
+    the selection (created_at, hostname or status), so it is a bounded range
+    scan. Expired records are stale notifications, not fixes, and are not
+    archived to diun_update_history.
+
+    Args:
+        db: Database session
+        older_than: Only records received before this time
+        hostname: Only records from this host
+        status: Only records with this status
+        exclude_hostnames: Skip records from these hosts
+        exclude_statuses: Skip records with these statuses
+        batch_size: Maximum records deleted
+
+    Returns:
+        IDs of the deleted records; fewer than batch_size means none are left
+    """
+    columns = diun_updates_table.c
+    filters = [columns.created_at < _naive_utc(older_than)]
+    if hostname is not None:
+        filters.append(columns.host_id == _host_id(hostname))
+    if status is not None:
+        filters.append(columns.status == status)
+    if exclude_hostnames:
+        filters.append(columns.host_id.not_in(select(Host.id).where(Host.hostname.in_(exclude_hostnames))))
+    if exclude_statuses:
+        filters.append(columns.status.not_in(exclude_statuses))
+    oldest = (
+        select(columns.id)
+        .where(*filters)
+        .order_by(columns.created_at, columns.id)
+        .limit(batch_size)
+        .scalar_subquery()
+    )
+    stmt = delete(diun_updates_table).where(columns.id.in_(oldest)).returning(columns.id)
+    deleted = list(db.scalars(stmt))
+    version = _commit_write(db, len(deleted))
+    if deleted:
+        _notify_listeners(db, "record_deletes", deleted, version)
+    return deleted
 
 def get_all_diun_updates(db: Session, skip: int = 0, limit: int | None = None) -> list[DiunUpdate]:
     """
@@ -115,14 +871,785 @@ def get_all_diun_updates(db: Session, skip: int = 0, limit: int | None = None) -
     Returns:
         List of DiunUpdate records ordered by created_at descending
     """
-    query = db.query(DiunUpdate).order_by(DiunUpdate.created_at.desc()).offset(skip)
+    query = db.query(DiunUpdate).order_by(DiunUpdate.created_at.desc(), DiunUpdate.id.desc()).offset(skip)
     if limit is not None:
         query = query.limit(limit)
     return query.all()
 
+def get_listing_rows(db: Session) -> list[tuple]:
+    """
+    Get every record as a LISTING_COLUMNS row, newest first, in one query.
+
+    Plain tuples rather than DiunUpdate objects, so reading the whole table
+    for the streamed dashboard stays cheap.
+    """
+    stmt = select(*LISTING_COLUMNS).order_by(DiunUpdate.created_at.desc(), DiunUpdate.id.desc())
+    return db.execute(stmt).all()
+
+# Counts a write's changed rows in diun_meta and hands back the new version.
+BUMP_DATA_VERSION = text(
+    "UPDATE diun_meta SET data_version = data_version + :changes, updated_at = datetime('now') "
+    "WHERE id = 1 RETURNING data_version"
+)
+
+def _commit_write(db: Session, changes: int) -> int | None:
+    """
+    Add a write's changed diun_updates rows to data_version, commit, and
+    return the version it left.
+
+    The bump is the write's own UPDATE ... RETURNING, in its transaction and
+    under its write lock, so no other connection or process can have moved
+    the version in between and no extra read is needed. One statement per
+    write replaces the per-row triggers that used to keep the count.
+
+    Returns:
+        The new version, or None if nothing changed and it was left alone
+    """
+    version = db.execute(BUMP_DATA_VERSION, {"changes": changes}).scalar_one() if changes else None
+    db.commit()
+    return version
+
+def get_data_version(db: Session) -> tuple[int, datetime | None]:
+    """
+    Read the diun_updates change counter without touching diun_updates itself.
+
+    Returns:
+        Tuple of (data_version, updated_at)
+    """
+    row = db.execute(select(DataVersion.data_version, DataVersion.updated_at).where(DataVersion.id == 1)).first()
+    return (row.data_version, row.updated_at) if row else (0, None)
+
+AUTO_VACUUM_MODES = {0: "none", 1: "full", 2: "incremental"}
+
+def incremental_vacuum(db: Session, max_pages: int) -> int:
+    """
+    Return up to max_pages free pages to the filesystem, truncating the file.
+
+    Only has an effect when the database uses auto_vacuum=INCREMENTAL.
+
+    Returns:
+        Number of pages released
+    """
+    before = db.execute(text("PRAGMA freelist_count")).scalar()
+    # SQLite frees one page per step of the pragma, but the sqlite3 module
+    # steps a statement without result columns only once; so run it once per
+    # page, inside one explicit transaction rather than a commit per page.
+    # (The driver opens transactions only for DML by itself.)
+    pages = min(before, max_pages)
+    if pages:
+        db.execute(text("BEGIN IMMEDIATE"))
+        for _ in range(pages):
+            db.execute(text("PRAGMA incremental_vacuum(1)"))
+        db.commit()
+    return before - db.execute(text("PRAGMA freelist_count")).scalar()
+
+def optimize_database(db: Session) -> None:
+    """Run PRAGMA optimize, which re-runs ANALYZE on tables whose statistics have gone stale."""
+    db.execute(text("PRAGMA optimize")).fetchall()
+    db.commit()
+
+def checkpoint_wal(db: Session, mode: str = "PASSIVE", busy_timeout_ms: int | None = None) -> dict:
+    """
+    Checkpoint the write-ahead log.
+
+    PASSIVE copies what it can without waiting on readers; TRUNCATE waits for
+    them, copies everything and empties the -wal file. It holds the write lock
+    while it waits, so busy_timeout_ms can cap the wait below the
+    connection's own busy_timeout; a checkpoint that runs out of time reports
+    busy rather than raising.
+
+    Returns:
+        {"busy": bool, "log_frames": int, "checkpointed_frames": int}; frames are -1 outside WAL mode
+    """
+    if mode not in ("PASSIVE", "FULL", "RESTART", "TRUNCATE"):
+        raise ValueError(f"Invalid checkpoint mode {mode!r}")
+    if busy_timeout_ms is None:
+        busy, log_frames, checkpointed = db.execute(text(f"PRAGMA wal_checkpoint({mode})")).one()
+    else:
+        previous = db.execute(text("PRAGMA busy_timeout")).scalar()
+        db.execute(text(f"PRAGMA busy_timeout = {int(busy_timeout_ms)}"))
+        try:
+            busy, log_frames, checkpointed = db.execute(text(f"PRAGMA wal_checkpoint({mode})")).one()
+        finally:
+            db.execute(text(f"PRAGMA busy_timeout = {int(previous)}"))
+    return {"busy": bool(busy), "log_frames": log_frames, "checkpointed_frames": checkpointed}
+
+def get_storage_stats(db: Session) -> dict:
+    """
+    Report the database file's size and fragmentation.
+
+    Per-table and per-index sizes come from the dbstat virtual table, which
+    reads every page; they are None if SQLite was built without it.
+    """
+    def pragma(name):
+        return db.execute(text(f"PRAGMA {name}")).scalar()
+
+    page_size, page_count, freelist_count = pragma("page_size"), pragma("page_count"), pragma("freelist_count")
+    path = next((row.file for row in db.execute(text("PRAGMA database_list")) if row.name == "main"), "")
+    wal_path = f"{path}-wal"
+    try:
+        objects = [
+            {"name": row.name, "type": row.type, "table": row.tbl_name, "bytes": row.pgsize, "unused_bytes": row.unused}
+            for row in db.execute(text(
+                "SELECT d.name, coalesce(m.type, 'table') AS type, coalesce(m.tbl_name, d.name) AS tbl_name, "
+                "d.pgsize, d.unused FROM dbstat AS d LEFT JOIN sqlite_schema AS m ON m.name = d.name "
+                "WHERE d.aggregate = 1 ORDER BY d.pgsize DESC"
+            ))
+        ]
+    except OperationalError:
+        objects = None
+    return {
+        "page_size": page_size,
+        "page_count": page_count,
+        "freelist_count": freelist_count,
+        "file_bytes": page_size * page_count,
+        "free_bytes": page_size * freelist_count,
+        "auto_vacuum": AUTO_VACUUM_MODES.get(pragma("auto_vacuum")),
+        "journal_mode": pragma("journal_mode"),
+        "wal_bytes": os.path.getsize(wal_path) if path and os.path.exists(wal_path) else 0,
+        "objects": objects,
+    }
+
+class _CrossJoin(Join):
+    """An inner join that SQLite evaluates with its left side as the outer loop."""
+    inherit_cache = True
+
+@compiles(_CrossJoin, "sqlite")
+def _compile_cross_join(join, compiler, **kw):
+    # SQLite never reorders the operands of CROSS JOIN
+    kw["asfrom"] = True
+    return (
+        f"{compiler.process(join.left, **kw)} CROSS JOIN {compiler.process(join.right, **kw)}"
+        f" ON {compiler.process(join.onclause, **kw)}"
+    )
+
+# Keyset sort orders. Each key ends in a unique column combination and is
+# backed by an index, so every page is an index range scan.
+SORT_KEYS = {
+    "created_at": (DiunUpdate.created_at, DiunUpdate.id),
+    # Rows of a host in the order their images were first seen: the
+    # (host_id, image_id) unique index
+    "hostname": (DiunUpdate.hostname, DiunUpdate.image_id),
+    "image_name": (DiunUpdate.image_name, DiunUpdate.id),
+}
+# Sorts on a name walk the hosts or images name index and reach their rows
+# through the matching diun_updates index. Left to itself the planner scans
+# diun_updates and sorts the whole table, so the join order is fixed.
+SORT_FROM = {
+    "hostname": _CrossJoin(Host.__table__, diun_updates_table, diun_updates_table.c.host_id == Host.id)
+        .join(Image.__table__, diun_updates_table.c.image_id == Image.id),
+    "image_name": _CrossJoin(Image.__table__, diun_updates_table, diun_updates_table.c.image_id == Image.id)
+        .join(Host.__table__, diun_updates_table.c.host_id == Host.id),
+}
+DEFAULT_SORT = "-created_at"
+
+def _parse_sort(sort: str) -> tuple[str, bool]:
+    """Split "-column" into ("column", descending=True); raise ValueError if unknown."""
+    name = sort.removeprefix("-")
+    if name not in SORT_KEYS:
+        raise ValueError(f"Invalid sort {sort!r} (expected one of {', '.join(SORT_KEYS)}, optionally prefixed with '-')")
+    return name, sort.startswith("-")
+
+def encode_cursor(values: tuple, sort: str = DEFAULT_SORT) -> str:
+    """Build an opaque pagination token from the sort-key values of a page's last row."""
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps([sort, values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort: str = DEFAULT_SORT, columns: tuple | None = None) -> tuple:
+    """
+    Decode a token produced by encode_cursor for the given sort.
+
+    columns gives the key columns for a sort outside SORT_KEYS, such as the
+    history listing.
+
+    Raises:
+        ValueError: If the token is malformed or was issued for another sort
+    """
+    if columns is None:
+        columns = SORT_KEYS[_parse_sort(sort)[0]]
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, values = json.loads(raw)
+        if cursor_sort != sort or len(values) != len(columns):
+            raise ValueError("cursor does not match sort")
+        return tuple(
+            datetime.fromisoformat(value) if column.type.python_type is datetime else column.type.python_type(value)
+            for column, value in zip(columns, values)
+        )
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+def get_diun_updates_page(db: Session, cursor: str | None = None, limit: int = 100) -> tuple[list[DiunUpdate], str | None]:
+    """
+    Get one page of DIUN update records, newest first, using keyset pagination.
+
+    Pages are keyed on (created_at, id) rather than OFFSET, so fetching a deep
+    page costs the same as fetching the first one. Pages within the session's
+    ReadCache are served from memory.
+
+    Args:
+        db: Database session
+        cursor: Token from a previous page's next_cursor (None = first page)
+        limit: Maximum number of records to return
+
+    Returns:
+        Tuple of (records, next_cursor); next_cursor is None on the last page
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    if (cache := _read_cache(db)) is not None:
+        page = cache.get_page(db, cursor, limit)
+        if page is not None:
+            return page
+
+    query = db.query(DiunUpdate)
+    if cursor is not None:
+        created_at, update_id = decode_cursor(cursor)
+        query = query.filter(tuple_(DiunUpdate.created_at, DiunUpdate.id) < (created_at, update_id))
+    updates = query.order_by(DiunUpdate.created_at.desc(), DiunUpdate.id.desc()).limit(limit + 1).all()
+    if len(updates) > limit:
+        last = updates[limit - 1]
+        return updates[:limit], encode_cursor((last.created_at, last.id))
+    return updates, None
+
+# Columns returned by query_diun_updates, in order.
+LISTING_COLUMNS = (
+    DiunUpdate.id,
+    DiunUpdate.hostname,
+    DiunUpdate.status,
+    DiunUpdate.provider,
+    DiunUpdate.image_name,
+    DiunUpdate.image_tag,
+    DiunUpdate.digest,
+    DiunUpdate.hub_link,
+    DiunUpdate.image_created_at,
+    DiunUpdate.created_at,
+)
+
+# Columns returned by get_history_page, in order.
+HISTORY_COLUMNS = (
+    DiunUpdateHistory.id,
+    DiunUpdateHistory.hostname,
+    DiunUpdateHistory.status,
+    DiunUpdateHistory.provider,
+    DiunUpdateHistory.image_name,
+    DiunUpdateHistory.image_tag,
+    DiunUpdateHistory.digest,
+    DiunUpdateHistory.hub_link,
+    DiunUpdateHistory.created_at,
+    DiunUpdateHistory.fixed_at,
+)
+HISTORY_SORT = "-fixed_at"
+HISTORY_KEY = (DiunUpdateHistory.fixed_at, DiunUpdateHistory.id)
+
+def get_history_page(
+    db: Session,
+    cursor: str | None = None,
+    limit: int = 100,
+    hostname: str | None = None,
+    fixed_after: datetime | None = None,
+    fixed_before: datetime | None = None,
+) -> tuple[list[tuple], str | None]:
+    """
+    Get one page of archived updates, most recently fixed first, using keyset pagination.
+
+    Every filter combination is a range scan of one of the fixed_at indexes.
+
+    Args:
+        db: Database session
+        cursor: Token from a previous page's next_cursor (None = first page)
+        limit: Maximum number of records to return
+        hostname: Only records from this host
+        fixed_after: Only records fixed at or after this time
+        fixed_before: Only records fixed before this time
+
+    Returns:
+        Tuple of (rows, next_cursor); rows are tuples in HISTORY_COLUMNS order
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    query = select(*HISTORY_COLUMNS)
+    if hostname is not None:
+        query = query.where(DiunUpdateHistory.hostname == hostname)
+    if fixed_after is not None:
+        query = query.where(DiunUpdateHistory.fixed_at >= _naive_utc(fixed_after))
+    if fixed_before is not None:
+        query = query.where(DiunUpdateHistory.fixed_at < _naive_utc(fixed_before))
+    if cursor is not None:
+        fixed_at, history_id = decode_cursor(cursor, HISTORY_SORT, HISTORY_KEY)
+        query = query.where(tuple_(*HISTORY_KEY) < (fixed_at, history_id))
+    query = query.order_by(DiunUpdateHistory.fixed_at.desc(), DiunUpdateHistory.id.desc()).limit(limit + 1)
+
+    rows = db.execute(query).all()
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        return rows[:limit], encode_cursor((last.fixed_at, last.id), HISTORY_SORT)
+    return rows, None
+
+def history_compaction_bound(db: Session, max_age: timedelta | None = None, max_rows: int | None = None) -> int | None:
+    """
+    Highest diun_update_history id outside the age or size limit.
+
+    History is append-only, so ids follow fixed_at: everything up to the
+    returned id is older than max_age or beyond the newest max_rows rows.
+    Ids are also gapless above anything compaction removed (it only deletes
+    from the oldest end), so the size bound is the newest id minus max_rows
+    rather than a walk over max_rows index entries. Both lookups are single
+    index seeks.
+
+    Returns:
+        The id, or None if the archive is within both limits
+    """
+    bounds = []
+    if max_age is not None:
+        cutoff = _naive_utc(datetime.now(UTC) - max_age)
+        bounds.append(db.scalar(
+            select(DiunUpdateHistory.id)
+            .where(DiunUpdateHistory.fixed_at < cutoff)
+            .order_by(DiunUpdateHistory.fixed_at.desc(), DiunUpdateHistory.id.desc())
+            .limit(1)
+        ))
+    if max_rows is not None:
+        newest = db.scalar(select(func.max(DiunUpdateHistory.id)))
+        if newest is not None and newest > max_rows:
+            bounds.append(newest - max_rows)
+    return max((bound for bound in bounds if bound is not None), default=None)
+
+# Archived rows removed per transaction by the history compactor
+HISTORY_COMPACT_BATCH_SIZE = 500
+
+def delete_history_batch(db: Session, up_to_id: int, batch_size: int = HISTORY_COMPACT_BATCH_SIZE) -> int:
+    """
+    Delete the oldest batch_size archived rows with id <= up_to_id and commit.
+
+    Returns:
+        Number of rows deleted; fewer than batch_size means none are left
+    """
+    oldest = (
+        select(DiunUpdateHistory.id)
+        .where(DiunUpdateHistory.id <= up_to_id)
+        .order_by(DiunUpdateHistory.id)
+        .limit(batch_size)
+        .scalar_subquery()
+    )
+    deleted = db.execute(delete(DiunUpdateHistory).where(DiunUpdateHistory.id.in_(oldest))).rowcount
+    db.commit()
+    return deleted
+
+def _naive_utc(value: datetime) -> datetime:
+    """Convert an aware datetime to the naive UTC form stored in SQLite."""
+    return value.astimezone(UTC).replace(tzinfo=None) if value.tzinfo else value
+
+def _prefix_upper_bound(prefix: str) -> str:
+    """Smallest string greater than every string starting with prefix."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+def query_diun_updates(
+    db: Session,
+    *,
+    hostname: str | None = None,
+    image_name_prefix: str | None = None,
+    status: str | None = None,
+    provider: str | None = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    sort: str = DEFAULT_SORT,
+    cursor: str | None = None,
+    limit: int = 100,
+) -> tuple[list[tuple], str | None]:
+    """
+    Filter, sort and keyset-paginate DIUN update records as plain row tuples.
+
+    Rows come straight from a Core SELECT of LISTING_COLUMNS, so no ORM
+    objects are built. The image name prefix is matched with an index-friendly
+    range rather than LIKE.
+
+    Args:
+        db: Database session
+        hostname / status / provider: Exact-match filters
+        image_name_prefix: Only images whose name starts with this string
+        created_after / created_before: Half-open created_at range [after, before)
+        sort: One of SORT_KEYS, prefixed with "-" for descending
+        cursor: Token from a previous page's next_cursor for the same sort
+        limit: Maximum number of rows to return
+
+    Returns:
+        Tuple of (rows, next_cursor); next_cursor is None on the last page
+
+    Raises:
+        ValueError: If the sort or cursor is invalid
+    """
+    sort_name, descending = _parse_sort(sort)
+    key_columns = SORT_KEYS[sort_name]
+
+    stmt = select(*LISTING_COLUMNS, *key_columns)
+    if sort_name in SORT_FROM:
+        stmt = stmt.select_from(SORT_FROM[sort_name])
+    if hostname is not None:
+        stmt = stmt.where(DiunUpdate.hostname == hostname)
+    if image_name_prefix:
+        stmt = stmt.where(
+            DiunUpdate.image_name >= image_name_prefix,
+            DiunUpdate.image_name < _prefix_upper_bound(image_name_prefix),
+        )
+    if status is not None:
+        stmt = stmt.where(DiunUpdate.status == status)
+    if provider is not None:
+        stmt = stmt.where(DiunUpdate.provider == provider)
+    if created_after is not None:
+        stmt = stmt.where(DiunUpdate.created_at >= _naive_utc(created_after))
+    if created_before is not None:
+        stmt = stmt.where(DiunUpdate.created_at < _naive_utc(created_before))
+    if cursor is not None:
+        position = tuple_(*key_columns)
+        # A plain tuple is bound with the key columns' types
+        after = decode_cursor(cursor, sort)
+        stmt = stmt.where(position < after if descending else position > after)
+
+    stmt = stmt.order_by(*(column.desc() if descending else column.asc() for column in key_columns))
+    rows = db.execute(stmt.limit(limit + 1)).all()
+
+    width = len(LISTING_COLUMNS)
+    next_cursor = encode_cursor(tuple(rows[limit - 1][width:]), sort) if len(rows) > limit else None
+    return [tuple(row[:width]) for row in rows[:limit]], next_cursor
+
+READ_CACHE_KEY = "read_cache"
+# Session.info key for objects told about every committed change. Listeners
+# implement record_upsert(update, version), record_upserts(updates, version) and
+# record_deletes(ids, version), where version is the data_version the write
+# committed; ReadCache and events.EventBroker are the two.
+CHANGE_LISTENERS_KEY = "change_listeners"
+
+def _listing_key(update) -> tuple:
+    """Dashboard ordering key (created_at, id); rows are kept in descending order."""
+    return (update.created_at or datetime.min, update.id)
+
+class ReadCache:
+    """
+    Newest-first snapshot of diun_updates for the dashboard, labelled with the
+    diun_meta data version it reflects.
+
+    Reads compare the label with the current data version, a primary-key lookup
+    on diun_meta, and only reload on a mismatch. Because every process's writes
+    bump that counter, changes made by other workers are detected too.
+
+    Writes made through a session carrying this cache patch it in place after
+    they commit, and take the label to the data version their own
+    transaction bumped to. A patch only applies when the snapshot was current
+    just before that write, i.e. the label equals the write's version less the
+    rows it changed. If anything else wrote in between, the
+    label stays behind and the next read reloads; if a read already reloaded
+    past the write, the patch is skipped.
+
+    At most max_rows rows are held. When the table is larger, the cache holds
+    the newest max_rows and pages beyond them are read from SQLite.
+    """
+
+    def __init__(self, max_rows: int = 2000):
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._version: int | None = None
+        self._rows: list[DiunUpdate] = []
+        self._keys: list[tuple] = []
+        self._complete = False
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.patches = 0
+        self.invalidations = 0
+
+    def get_page(self, db: Session, cursor: str | None, limit: int) -> tuple[list[DiunUpdate], str | None] | None:
+        """
+        Serve one get_diun_updates_page result from memory.
+
+        Returns:
+            (records, next_cursor), or None if the page lies beyond the cached rows
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        after = decode_cursor(cursor) if cursor is not None else None
+        version, _ = get_data_version(db)
+        with self._lock:
+            current = self._version == version
+        if not current:
+            self.load(db, version)
+
+        with self._lock:
+            start = 0
+            if after is not None:
+                # First row ordered strictly after the cursor (keys are descending)
+                lo, hi = 0, len(self._keys)
+                while lo < hi:
+                    mid = (lo + hi) // 2
+                    if self._keys[mid] < after:
+                        hi = mid
+                    else:
+                        lo = mid + 1
+                start = lo
+            end = start + limit
+            if not self._complete and end >= len(self._rows):
+                self.misses += 1
+                return None
+            if current:
+                self.hits += 1
+            updates = self._rows[start:end]
+            if len(self._rows) > end:
+                return updates, encode_cursor(self._keys[end - 1])
+            return updates, None
+
+    def load(self, db: Session, version: int | None = None) -> None:
+        """Replace the snapshot with the newest max_rows rows."""
+        if version is None:
+            # Read the version first, so the rows are never older than their label
+            version, _ = get_data_version(db)
+        updates = db.scalars(
+            select(DiunUpdate)
+            .order_by(DiunUpdate.created_at.desc(), DiunUpdate.id.desc())
+            .limit(self.max_rows + 1)
+        ).all()
+        for update in updates:
+            db.expunge(update)
+        with self._lock:
+            self._complete = len(updates) <= self.max_rows
+            self._rows = list(updates[:self.max_rows])
+            self._keys = [_listing_key(update) for update in self._rows]
+            self._version = version
+            self.loads += 1
+            self.misses += 1
+
+    def record_upsert(self, update: DiunUpdate, version: int) -> None:
+        """Move a freshly written row into place after its upsert committed."""
+        self._apply_upserts([update], version)
+
+    def record_upserts(self, updates: list[DiunUpdate], version: int) -> None:
+        """Apply a committed batch upsert."""
+        self._apply_upserts(updates, version)
+
+    def _follows(self, version: int, changes: int) -> bool:
+        """True if the snapshot was current right before a write that left version."""
+        return self._version is not None and self._version == version - changes
+
+    def _apply_upserts(self, updates: list[DiunUpdate], version: int) -> None:
+        with self._lock:
+            if not self._follows(version, len(updates)):
+                return
+            written = {(update.hostname, update.image_name) for update in updates}
+            entries = [
+                (key, cached) for key, cached in zip(self._keys, self._rows)
+                if (cached.hostname, cached.image_name) not in written
+            ]
+            # hub_link belongs to the image, so other hosts' rows show the new one too
+            links = {update.image_name: update.hub_link for update in updates}
+            for _, cached in entries:
+                if cached.image_name in links and cached.hub_link != links[cached.image_name]:
+                    cached.hub_link = links[cached.image_name]
+            # Rows sorting after the cached prefix are not ours to show
+            boundary = None if self._complete or not self._keys else self._keys[-1]
+            for update in updates:
+                key = _listing_key(update)
+                if boundary is None or key > boundary:
+                    entries.append((key, update))
+            entries.sort(key=lambda entry: entry[0], reverse=True)
+            if len(entries) > self.max_rows:
+                del entries[self.max_rows:]
+                self._complete = False
+            self._keys = [key for key, _ in entries]
+            self._rows = [update for _, update in entries]
+            self._version = version
+            self.patches += 1
+
+    def record_deletes(self, update_ids: list[int], version: int) -> None:
+        """Drop rows after their delete committed."""
+        with self._lock:
+            if not self._follows(version, len(update_ids)):
+                return
+            deleted = set(update_ids)
+            entries = [(key, cached) for key, cached in zip(self._keys, self._rows) if cached.id not in deleted]
+            self._keys = [key for key, _ in entries]
+            self._rows = [cached for _, cached in entries]
+            self._version = version
+            self.patches += 1
+
+    def invalidate(self) -> None:
+        """Forget the snapshot; the next read reloads it."""
+        with self._lock:
+            self._version = None
+            self._rows, self._keys, self._complete = [], [], False
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the snapshot size."""
+        with self._lock:
+            return {
+                "max_rows": self.max_rows,
+                "rows": len(self._rows),
+                "complete": self._complete,
+                "data_version": self._version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "loads": self.loads,
+                "patches": self.patches,
+                "invalidations": self.invalidations,
+            }
+
+def _read_cache(db: Session) -> ReadCache | None:
+    """The ReadCache attached to db's session factory, if any."""
+    return db.info.get(READ_CACHE_KEY)
+
+def _notify_listeners(db: Session, method: str, *args) -> None:
+    """Report a committed change to the listeners attached to db's session factory."""
+    for listener in db.info.get(CHANGE_LISTENERS_KEY, ()):
+        getattr(listener, method)(*args)
+
+# Request handlers use aiosqlite sessions so queries run off the event loop
+# thread. The sync engine remains for migrations and start-up checks.
+read_cache = ReadCache(DIUN_READ_CACHE_ROWS) if DIUN_READ_CACHE_ROWS > 0 else None
+writer, reader = create_session_pools(
+    DATABASE_PATH, SQLITE_PRAGMAS, DIUN_DB_READ_POOL_SIZE, read_cache, listeners=(event_broker,)
+)
+
+# Async variants. Each runs the sync implementation above through
+# AsyncSession.run_sync, so the SQL lives in one place while the I/O happens
+# on aiosqlite's worker thread instead of the event loop.
+
+async def async_upsert_diun_update(db: AsyncSession, update_data: DiunUpdateData | UpdateParams) -> DiunUpdate:
+    """Async version of upsert_diun_update."""
+    return await db.run_sync(upsert_diun_update, update_data)
+
+async def async_upsert_diun_updates(db: AsyncSession, updates: list[DiunUpdateData | UpdateParams]) -> int:
+    """Async version of upsert_diun_updates."""
+    return await db.run_sync(upsert_diun_updates, updates)
+
+async def async_delete_diun_update(db: AsyncSession, update_id: int) -> bool:
+    """Async version of delete_diun_update."""
+    return await db.run_sync(delete_diun_update, update_id)
+
+async def async_delete_diun_updates(db: AsyncSession, **criteria) -> list[int]:
+    """Async version of delete_diun_updates."""
+    return await db.run_sync(lambda sync_db: delete_diun_updates(sync_db, **criteria))
+
+async def async_count_diun_updates(db: AsyncSession, **criteria) -> int:
+    """Async version of count_diun_updates."""
+    return await db.run_sync(lambda sync_db: count_diun_updates(sync_db, **criteria))
+
+async def async_delete_all_diun_updates(db: AsyncSession) -> int:
+    """Async version of delete_all_diun_updates."""
+    return await db.run_sync(delete_all_diun_updates)
+
+async def async_delete_all_diun_updates_batched(
+    pool: SessionPool,
+    batch_size: int = DELETE_BATCH_SIZE,
+    progress=None,
+) -> int:
+    """
+    Async Fix All that gives up the writer between batches.
+
+    Unlike async_delete_all_diun_updates, each batch takes its own session from
+    pool, so writers queued on a serialized pool run between batches instead of
+    waiting for the whole delete.
+
+    Args:
+        pool: Writer SessionPool
+        batch_size: Records deleted per transaction
+        progress: Optional callable receiving the running total after each batch
+
+    Returns:
+        Number of records deleted
+    """
+    async with pool.session() as db:
+        max_id = await db.scalar(select(func.max(diun_updates_table.c.id)))
+    total, after_id = 0, 0
+    while max_id is not None:
+        async with pool.session() as db:
+            deleted = await db.run_sync(delete_diun_updates_batch, after_id, max_id, batch_size)
+        total += len(deleted)
+        if progress is not None:
+            progress(total)
+        if len(deleted) < batch_size:
+            break
+        after_id = max(deleted)
+    return total
+
+async def async_delete_expired_diun_updates_batch(db: AsyncSession, older_than: datetime, **kwargs) -> list[int]:
+    """Async version of delete_expired_diun_updates_batch."""
+    return await db.run_sync(lambda sync_db: delete_expired_diun_updates_batch(sync_db, older_than, **kwargs))
+
+async def async_get_all_diun_updates(db: AsyncSession, skip: int = 0, limit: int | None = None) -> list[DiunUpdate]:
+    """Async version of get_all_diun_updates."""
+    return await db.run_sync(get_all_diun_updates, skip, limit)
+
+async def async_get_diun_updates_page(db: AsyncSession, cursor: str | None = None, limit: int = 100) -> tuple[list[DiunUpdate], str | None]:
+    """Async version of get_diun_updates_page."""
+    return await db.run_sync(get_diun_updates_page, cursor, limit)
+
+async def async_get_data_version(db: AsyncSession) -> tuple[int, datetime | None]:
+    """Async version of get_data_version."""
+    return await db.run_sync(get_data_version)
+
+async def async_incremental_vacuum(db: AsyncSession, max_pages: int) -> int:
+    """Async version of incremental_vacuum."""
+    return await db.run_sync(incremental_vacuum, max_pages)
+
+async def async_optimize_database(db: AsyncSession) -> None:
+    """Async version of optimize_database."""
+    await db.run_sync(optimize_database)
+
+async def async_checkpoint_wal(db: AsyncSession, mode: str = "PASSIVE", busy_timeout_ms: int | None = None) -> dict:
+    """Async version of checkpoint_wal."""
+    return await db.run_sync(checkpoint_wal, mode, busy_timeout_ms)
+
+async def async_get_storage_stats(db: AsyncSession) -> dict:
+    """Async version of get_storage_stats."""
+    return await db.run_sync(get_storage_stats)
+
+async def async_warm_read_cache(db: AsyncSession) -> None:
+    """Load the session's ReadCache, if it has one."""
+    if (cache := db.info.get(READ_CACHE_KEY)) is not None:
+        await db.run_sync(cache.load)
+
+async def async_query_diun_updates(db: AsyncSession, **kwargs) -> tuple[list[tuple], str | None]:
+    """Async version of query_diun_updates."""
+    return await db.run_sync(lambda sync_db: query_diun_updates(sync_db, **kwargs))
+
+async def async_get_history_page(db: AsyncSession, cursor: str | None = None, limit: int = 100, **filters) -> tuple[list[tuple], str | None]:
+    """Async version of get_history_page."""
+    return await db.run_sync(lambda sync_db: get_history_page(sync_db, cursor, limit, **filters))
+
+async def async_history_compaction_bound(db: AsyncSession, max_age: timedelta | None = None, max_rows: int | None = None) -> int | None:
+    """Async version of history_compaction_bound."""
+    return await db.run_sync(history_compaction_bound, max_age, max_rows)
+
+async def async_delete_history_batch(db: AsyncSession, up_to_id: int, batch_size: int = HISTORY_COMPACT_BATCH_SIZE) -> int:
+    """Async version of delete_history_batch."""
+    return await db.run_sync(delete_history_batch, up_to_id, batch_size)
+
+async def async_get_listing_rows(db: AsyncSession) -> list[tuple]:
+    """Async version of get_listing_rows."""
+    return await db.run_sync(get_listing_rows)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_write_db():
+    async with writer.session() as db:
+        yield db
+
+async def get_read_db():
+    async with reader.session() as db:
+        yield db
+
+def get_write_pool() -> SessionPool:
+    """The writer pool, for handlers that decide per request whether they need it."""
+    return writer
+
+def get_read_pool() -> SessionPool:
+    """The reader pool, for handlers that open sessions outliving the request scope."""
+    return reader
@@ -0,0 +1,54 @@
+"""
+Compact storage encoding for image digests.
+
+DIUN reports digests as "<algorithm>:<hex>", in practice always "sha256:"
+and 64 hex digits. As text that is 71 bytes per row; stored as a one-byte
+algorithm code followed by the raw hash it is 33. Anything that is not a
+well-formed digest of a known algorithm (lower-case hex of the right length)
+is kept verbatim behind code 0, so every string round-trips unchanged.
+"""
+from functools import lru_cache
+
+# Stored in the database: never renumber, only append.
+TEXT = 0
+ALGORITHMS = {
+    "sha256": (1, 32),
+    "sha384": (2, 48),
+    "sha512": (3, 64),
+}
+_NAMES = {code: name for name, (code, _) in ALGORITHMS.items()}
+_HEX_DIGITS = frozenset("0123456789abcdef")
+# Hex digits shown for a digest on the dashboard
+SHORT_LENGTH = 12
+
+
+def encode_digest(digest: str) -> bytes:
+    """Encode a digest string as its algorithm code and raw hash bytes."""
+    name, sep, hex_digits = digest.partition(":")
+    if sep and name in ALGORITHMS:
+        code, size = ALGORITHMS[name]
+        if len(hex_digits) == 2 * size and _HEX_DIGITS.issuperset(hex_digits):
+            return bytes((code,)) + bytes.fromhex(hex_digits)
+    return bytes((TEXT,)) + digest.encode()
+
+
+def decode_digest(data: bytes) -> str:
+    """Decode the output of encode_digest back into the original string."""
+    code = data[0]
+    if code == TEXT:
+        return data[1:].decode()
+    return f"{_NAMES[code]}:{data[1:].hex()}"
+
+
+@lru_cache(maxsize=4096)
+def short_digest(digest: str | None) -> str:
+    """
+    The part of a digest shown on the dashboard: the first hex digits after
+    the algorithm, or "" without one.
+
+    Every host running an image reports the same digest, so a dashboard of
+    thousands of rows only computes a few hundred of these.
+    """
+    if not digest or ":" not in digest:
+        return ""
+    return digest.split(":", 1)[1][:SHORT_LENGTH]
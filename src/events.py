@@ -0,0 +1,243 @@
+import asyncio
+import itertools
+import os
+import threading
+import time
+from collections import deque
+
+import orjson
+
+from .digest import short_digest
+
+# Events kept for Last-Event-ID resumption
+DIUN_EVENTS_BUFFER = int(os.environ.get("DIUN_EVENTS_BUFFER", "1000"))
+# Seconds between keep-alive comments on an idle stream
+DIUN_EVENTS_KEEPALIVE = float(os.environ.get("DIUN_EVENTS_KEEPALIVE", "15"))
+
+# Fields sent for a row; the same columns as database.LISTING_COLUMNS.
+EVENT_FIELDS = (
+    "id", "hostname", "status", "provider", "image_name", "image_tag",
+    "digest", "hub_link", "image_created_at", "created_at",
+)
+
+
+def format_event(event_id: str, event_type: str, data: bytes) -> bytes:
+    """Encode one Server-Sent Event."""
+    return b"id: %s\nevent: %s\ndata: %s\n\n" % (event_id.encode(), event_type.encode(), data)
+
+
+class EventBroker:
+    """
+    Fans committed diun_updates changes out to Server-Sent Event clients.
+
+    The broker is a change listener on the session pools: upserts and deletes
+    call its record_* methods after they commit, and each becomes an "upsert"
+    or "delete" event in a bounded ring buffer. Clients reconnecting
+    with Last-Event-ID are replayed what they missed; if that has already left
+    the buffer, or the id comes from an earlier process, they get a "reset"
+    event and should reload.
+
+    Writes made by other processes (other uvicorn workers, scripts) never
+    reach the listener methods. check_version() detects them from the
+    diun_meta data version and broadcasts a "reset" as well.
+
+    Idle clients cost one suspended coroutine each: every publish wakes them
+    through a single shared asyncio.Event. Publishing is thread-safe.
+    """
+
+    def __init__(self, buffer_size: int = 1000, keepalive: float = 15.0):
+        self.buffer_size = buffer_size
+        self.keepalive = keepalive
+        # Event ids are "<epoch>-<seq>" so ids from a previous process are recognised
+        self.epoch = format(time.time_ns(), "x")
+        self._buffer: deque[tuple[int, bytes]] = deque(maxlen=buffer_size)
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup = asyncio.Event()
+        self._closed = False
+        # diun_meta data_version the published events account for, taken from
+        # the version each local write read in its own transaction.
+        self._version: int | None = None
+        # A version the label was behind at the previous check
+        self._behind: int | None = None
+        self.published = 0
+        self.clients = 0
+        self.resets = 0
+        self.foreign_changes = 0
+
+    @property
+    def last_event_id(self) -> str:
+        """Id of the newest event; a client holding it has seen everything so far."""
+        return f"{self.epoch}-{self._seq}"
+
+    def publish(self, event_type: str, payload: dict) -> None:
+        """Append an event to the buffer and wake every connected client."""
+        data = orjson.dumps(payload)
+        with self._lock:
+            self._seq += 1
+            self._buffer.append((self._seq, format_event(f"{self.epoch}-{self._seq}", event_type, data)))
+            self.published += 1
+        self._wake()
+
+    def record_upsert(self, update, version: int) -> None:
+        self.record_upserts([update], version)
+
+    def record_upserts(self, rows, version: int) -> None:
+        self._advance(version, len(rows))
+        for row in rows:
+            data = {field: getattr(row, field) for field in EVENT_FIELDS}
+            # Sent ready to display, like the server-rendered rows
+            data["short_digest"] = short_digest(row.digest)
+            self.publish("upsert", data)
+
+    def record_deletes(self, update_ids: list[int], version: int) -> None:
+        self._advance(version, len(update_ids))
+        self.publish("delete", {"ids": update_ids})
+
+    def check_version(self, version: int) -> bool:
+        """
+        Compare the current diun_meta data version with the changes published here.
+
+        A label behind the version may just be a local commit whose listener
+        has not run yet, so another process is only assumed to have written
+        when the label is still behind a version seen at the previous check.
+        Clients then get a "reset" event, since this process cannot describe
+        those changes.
+
+        Returns:
+            True if a reset was broadcast
+        """
+        with self._lock:
+            if self._version is None or self._version >= version:
+                if self._version is None:
+                    self._version = version
+                self._behind = None
+                return False
+            if self._behind is None or self._version >= self._behind:
+                self._behind = version
+                return False
+            self._version = version
+            self._behind = None
+            self.foreign_changes += 1
+        self.publish("reset", {})
+        return True
+
+    def can_resume(self, last_event_id: str | None) -> bool:
+        """True if a client holding last_event_id can be replayed what it missed."""
+        with self._lock:
+            return self._resume_after(last_event_id) is not None
+
+    def _advance(self, version: int, changes: int) -> None:
+        # Only a label that accounted for everything before this write moves
+        # to its version; one left behind by another process stays behind
+        # for check_version to notice.
+        with self._lock:
+            if self._version is not None and self._version == version - changes:
+                self._version = version
+
+    def close(self) -> None:
+        """End every open stream, e.g. at shutdown."""
+        self._closed = True
+        self._wake()
+
+    def _wake(self) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._notify()
+        else:
+            loop.call_soon_threadsafe(self._notify)
+
+    def _notify(self) -> None:
+        wakeup, self._wakeup = self._wakeup, asyncio.Event()
+        wakeup.set()
+
+    def _resume_after(self, last_event_id: str | None) -> int | None:
+        """Sequence number to resume after, or None if the client must reset."""
+        if not last_event_id:
+            return self._seq
+        epoch, _, seq = last_event_id.partition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        seq = int(seq)
+        oldest = self._buffer[0][0] if self._buffer else self._seq + 1
+        if seq > self._seq or seq < oldest - 1:
+            return None
+        return seq
+
+    def _since(self, seq: int) -> list[tuple[int, bytes]] | None:
+        """Buffered events after seq, or None if some have been dropped."""
+        with self._lock:
+            if seq >= self._seq:
+                return []
+            if seq < self._buffer[0][0] - 1:
+                return None
+            return list(itertools.islice(self._buffer, len(self._buffer) - (self._seq - seq), None))
+
+    def _reset(self) -> bytes:
+        self.resets += 1
+        return format_event(self.last_event_id, "reset", b"{}")
+
+    async def stream(self, last_event_id: str | None = None):
+        """Yield encoded events for one client until the broker is closed."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # asyncio.Event binds to the loop it is first awaited on
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+        self.clients += 1
+        try:
+            with self._lock:
+                position = self._resume_after(last_event_id)
+            yield b"retry: 3000\n\n"
+            if position is None:
+                position = self._seq
+                yield self._reset()
+
+            while True:
+                # Take the wakeup before checking for events, so a publish in
+                # between still wakes this client.
+                wakeup = self._wakeup
+                events = self._since(position)
+                if events is None:
+                    # Fell behind the ring buffer
+                    position = self._seq
+                    yield self._reset()
+                    continue
+                for seq, encoded in events:
+                    yield encoded
+                    position = seq
+                if events:
+                    continue
+                if self._closed:
+                    return
+                try:
+                    await asyncio.wait_for(wakeup.wait(), self.keepalive)
+                except TimeoutError:
+                    yield b": keepalive\n\n"
+        finally:
+            self.clients -= 1
+
+    def stats(self) -> dict:
+        """Return buffer and client counters."""
+        return {
+            "clients": self.clients,
+            "published": self.published,
+            "buffered": len(self._buffer),
+            "buffer_size": self.buffer_size,
+            "resets": self.resets,
+            "foreign_changes": self.foreign_changes,
+        }
+
+
+broker = EventBroker(DIUN_EVENTS_BUFFER, DIUN_EVENTS_KEEPALIVE)
+
+
+def get_event_broker() -> EventBroker:
+    return broker
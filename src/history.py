@@ -0,0 +1,90 @@
+import asyncio
+import logging
+import time
+from datetime import timedelta
+
+from .database import HISTORY_COMPACT_BATCH_SIZE, async_delete_history_batch, async_history_compaction_bound
+from .jobs import PeriodicJob
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryCompactor(PeriodicJob):
+    """
+    Background job keeping diun_update_history within an age and size limit.
+
+    Every interval seconds, starting right away, it finds the newest archived
+    row outside either limit and deletes everything up to it, oldest first,
+    batch_size rows per transaction. Every batch opens its own session from
+    session_factory, so a long compaction lets webhooks and fixes in between
+    batches instead of holding the writer for the whole archive.
+
+    A limit of None (or 0) is not enforced.
+    """
+    task_name = "diun-history-compactor"
+    failure_message = "History compaction failed"
+
+    def __init__(
+        self,
+        session_factory,
+        max_age_days: float | None = 365,
+        max_rows: int | None = 100_000,
+        batch_size: int = HISTORY_COMPACT_BATCH_SIZE,
+        interval: float = 3600.0,
+    ):
+        super().__init__(interval)
+        self.session_factory = session_factory
+        self.max_age = timedelta(days=max_age_days) if max_age_days else None
+        self.max_rows = max_rows or None
+        self.batch_size = batch_size
+
+        self.runs = 0
+        self.rows_deleted = 0
+        self.last_run_deleted = 0
+        self.last_run_duration = 0.0
+        self.last_run_at: float | None = None
+
+    async def run_once(self) -> int:
+        """
+        Compact the archive down to its limits.
+
+        Returns:
+            Number of archived rows deleted
+        """
+        start = time.monotonic()
+        async with self.session_factory() as db:
+            bound = await async_history_compaction_bound(db, self.max_age, self.max_rows)
+
+        deleted = 0
+        while bound is not None:
+            async with self.session_factory() as db:
+                batch = await async_delete_history_batch(db, bound, self.batch_size)
+            deleted += batch
+            if batch < self.batch_size:
+                break
+            # Let other tasks run between batches
+            await asyncio.sleep(0)
+
+        self.runs += 1
+        self.rows_deleted += deleted
+        self.last_run_deleted = deleted
+        self.last_run_duration = time.monotonic() - start
+        self.last_run_at = time.time()
+        if deleted:
+            logger.info(f"History compaction removed {deleted} rows in {self.last_run_duration * 1000:.1f} ms")
+        return deleted
+
+    def stats(self) -> dict:
+        """Return limits and run counters."""
+        return {
+            "max_age_days": self.max_age.days if self.max_age else None,
+            "max_rows": self.max_rows,
+            "batch_size": self.batch_size,
+            "interval": self.interval,
+            "runs": self.runs,
+            "run_errors": self.run_errors,
+            "rows_deleted": self.rows_deleted,
+            "last_run_deleted": self.last_run_deleted,
+            "last_run_duration_ms": round(self.last_run_duration * 1000, 3),
+            "last_run_at": self.last_run_at,
+        }
@@ -0,0 +1,106 @@
+"""
+Docker / OCI image reference parsing.
+
+Follows the grammar of github.com/distribution/reference:
+
+    reference  := name [ ":" tag ] [ "@" digest ]
+    name       := [ domain "/" ] path-component [ "/" path-component ]*
+    domain     := host [ ":" port ]
+
+The first component of a name is only a registry if it looks like a host:
+it contains "." or ":", is "localhost", or has upper-case letters (which a
+repository path cannot). Names are normalized the way the Docker CLI does it,
+so "nginx", "library/nginx", "docker.io/nginx" and
+"index.docker.io/library/nginx" all name the repository
+"docker.io/library/nginx".
+"""
+import functools
+import re
+from typing import NamedTuple
+
+DEFAULT_REGISTRY = "docker.io"
+LEGACY_DEFAULT_REGISTRY = "index.docker.io"
+OFFICIAL_NAMESPACE = "library"
+# Distinct references remembered by parse_image_reference. A fleet reports
+# the same few hundred images over and over, so this covers it many times.
+REFERENCE_CACHE_SIZE = 4096
+NAME_MAX_LENGTH = 255
+
+_PATH_COMPONENT = r"[a-z0-9]+(?:(?:[._]|__|-+)[a-z0-9]+)*"
+_DOMAIN_COMPONENT = r"(?:[a-zA-Z0-9]|[a-zA-Z0-9][a-zA-Z0-9-]*[a-zA-Z0-9])"
+_DOMAIN = rf"(?:{_DOMAIN_COMPONENT}(?:\.{_DOMAIN_COMPONENT})*|\[[0-9a-fA-F:]+\])(?::[0-9]+)?"
+_TAG = r"[\w][\w.-]{0,127}"
+_DIGEST = r"[A-Za-z][A-Za-z0-9]*(?:[-_+.][A-Za-z][A-Za-z0-9]*)*:[0-9A-Fa-f]{32,}"
+
+# ASCII only: without it \w would also accept letters and digits from any script
+_PATH_RE = re.compile(rf"{_PATH_COMPONENT}(?:/{_PATH_COMPONENT})*", re.ASCII)
+_DOMAIN_RE = re.compile(_DOMAIN, re.ASCII)
+_TAG_RE = re.compile(_TAG, re.ASCII)
+_DIGEST_RE = re.compile(_DIGEST, re.ASCII)
+
+
+class ImageReference(NamedTuple):
+    """A parsed, normalized image reference."""
+    registry: str           # e.g. "docker.io", "ghcr.io", "registry.local:5000"
+    repository: str         # path within the registry, e.g. "library/nginx"
+    tag: str | None = None
+    digest: str | None = None
+
+    @property
+    def name(self) -> str:
+        """Fully qualified repository name, e.g. "docker.io/library/nginx"."""
+        return f"{self.registry}/{self.repository}"
+
+    @property
+    def familiar_name(self) -> str:
+        """The short form the Docker CLI shows, e.g. "nginx" or "ghcr.io/org/app"."""
+        if self.registry != DEFAULT_REGISTRY:
+            return self.name
+        namespace, _, rest = self.repository.partition("/")
+        return rest if namespace == OFFICIAL_NAMESPACE and "/" not in rest else self.repository
+
+    def __str__(self) -> str:
+        return self.name + (f":{self.tag}" if self.tag else "") + (f"@{self.digest}" if self.digest else "")
+
+
+def _split_domain(name: str) -> tuple[str, str]:
+    first, slash, rest = name.partition("/")
+    if slash and ("." in first or ":" in first or first == "localhost" or first.lower() != first):
+        return first, rest
+    return DEFAULT_REGISTRY, name
+
+
+@functools.lru_cache(maxsize=REFERENCE_CACHE_SIZE)
+def parse_image_reference(reference: str) -> ImageReference:
+    """
+    Parse and normalize an image reference such as "nginx:1.27",
+    "registry.local:5000/team/app@sha256:..." or "ghcr.io/org/app:v1@sha256:...".
+
+    Results are memoized in a bounded LRU cache (parse_image_reference.cache_info()).
+
+    Raises:
+        ValueError: If the reference is not valid
+    """
+    remainder, at, digest = reference.partition("@")
+    if at and not _DIGEST_RE.fullmatch(digest):
+        raise ValueError(f"Invalid digest in image reference {reference!r}")
+
+    # A ":" after the last "/" starts the tag; one before it belongs to a registry port
+    name, tag = remainder, None
+    colon = remainder.rfind(":")
+    if colon > remainder.rfind("/"):
+        name, tag = remainder[:colon], remainder[colon + 1:]
+        if not _TAG_RE.fullmatch(tag):
+            raise ValueError(f"Invalid tag in image reference {reference!r}")
+
+    if not name or len(name) > NAME_MAX_LENGTH:
+        raise ValueError(f"Invalid image name in reference {reference!r}")
+    registry, repository = _split_domain(name)
+    if not _DOMAIN_RE.fullmatch(registry) or not _PATH_RE.fullmatch(repository):
+        raise ValueError(f"Invalid image name in reference {reference!r}")
+
+    if registry == LEGACY_DEFAULT_REGISTRY:
+        registry = DEFAULT_REGISTRY
+    if registry == DEFAULT_REGISTRY and "/" not in repository:
+        repository = f"{OFFICIAL_NAMESPACE}/{repository}"
+    return ImageReference(registry, repository, tag, digest or None)
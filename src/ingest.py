@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import time
+
+from .database import async_upsert_diun_updates
+from .models import DiunUpdateData, UpdateParams
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class IngestQueue:
+    """
+    Bounded write-behind queue for webhook payloads.
+
+    Webhook handlers submit parsed updates and return immediately; a single
+    background writer task drains the queue, collapses repeated
+    (hostname, image_name) keys so only the latest payload survives, and
+    writes each batch in one transaction via upsert_diun_updates.
+
+    session_factory returns an async context manager yielding the AsyncSession
+    each batch is written with; the webhooks themselves never open one.
+
+    A batch is flushed as soon as it reaches max_batch_size distinct keys,
+    or once its oldest payload has waited max_latency seconds. A flush that
+    fails (the database locked by a backup, say) is retried up to
+    max_retries times, waiting retry_delay seconds and doubling the wait each
+    time; only then is the batch dropped and logged. The queue keeps filling
+    while the writer waits, so webhooks get 503 rather than losing data.
+    """
+
+    def __init__(
+        self,
+        session_factory,
+        max_size: int = 10000,
+        max_batch_size: int = 500,
+        max_latency: float = 0.5,
+        max_retries: int = 5,
+        retry_delay: float = 0.1,
+    ):
+        self.session_factory = session_factory
+        self.max_size = max_size
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self._task: asyncio.Task | None = None
+
+        self.submitted = 0
+        self.rejected = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.flush_errors = 0
+        self.rows_dropped = 0
+        self.rows_flushed = 0
+        self.last_flush_size = 0
+        self.last_flush_latency = 0.0
+        self.max_flush_latency = 0.0
+
+    def submit(self, update_data: DiunUpdateData | UpdateParams) -> bool:
+        """
+        Enqueue an update for the background writer.
+
+        Returns:
+            True if the update was queued, False if the queue is full
+        """
+        try:
+            self._queue.put_nowait((time.monotonic(), update_data))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return False
+        self.submitted += 1
+        return True
+
+    async def start(self) -> None:
+        """Start the background writer task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="diun-ingest-writer")
+
+    async def stop(self) -> None:
+        """Flush everything still queued and stop the writer task."""
+        if self._task is None:
+            return
+        await self._queue.put((time.monotonic(), _STOP))
+        await self._task
+        self._task = None
+
+    def stats(self) -> dict:
+        """Return queue depth and flush counters."""
+        return {
+            "queue_depth": self._queue.qsize(),
+            "max_size": self.max_size,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "coalesced": self.coalesced,
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+            "rows_dropped": self.rows_dropped,
+            "rows_flushed": self.rows_flushed,
+            "last_flush_size": self.last_flush_size,
+            "last_flush_latency_ms": round(self.last_flush_latency * 1000, 3),
+            "max_flush_latency_ms": round(self.max_flush_latency * 1000, 3),
+        }
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            enqueued_at, item = await self._queue.get()
+            if item is _STOP:
+                break
+
+            oldest = enqueued_at
+            pending = {(item.hostname, item.image_name): item}
+            deadline = loop.time() + self.max_latency
+            while len(pending) < self.max_batch_size:
+                try:
+                    enqueued_at, item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        enqueued_at, item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except TimeoutError:
+                        break
+                if item is _STOP:
+                    stopping = True
+                    break
+                key = (item.hostname, item.image_name)
+                if key in pending:
+                    self.coalesced += 1
+                    del pending[key]
+                pending[key] = item
+
+            await self._flush(list(pending.values()), oldest)
+
+    async def _flush(self, updates: list[DiunUpdateData | UpdateParams], oldest: float) -> None:
+        delay = self.retry_delay
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self.session_factory() as db:
+                    await async_upsert_diun_updates(db, updates)
+                break
+            except Exception:
+                self.flush_errors += 1
+                if attempt == self.max_retries:
+                    self.rows_dropped += len(updates)
+                    logger.exception(f"Dropped {len(updates)} queued updates after {attempt + 1} failed flushes")
+                    return
+                logger.warning(f"Failed to flush {len(updates)} queued updates, retrying in {delay:.1f} s",
+                               exc_info=True)
+                await asyncio.sleep(delay)
+                delay *= 2
+
+        latency = time.monotonic() - oldest
+        self.flushes += 1
+        self.rows_flushed += len(updates)
+        self.last_flush_size = len(updates)
+        self.last_flush_latency = latency
+        self.max_flush_latency = max(self.max_flush_latency, latency)
+        logger.info(f"Flushed {len(updates)} queued updates in {latency * 1000:.1f} ms")
@@ -0,0 +1,55 @@
+import abc
+import asyncio
+import logging
+
+
+class PeriodicJob(abc.ABC):
+    """
+    Background job that calls run_once() every interval seconds in an
+    asyncio task.
+
+    Subclasses implement run_once() and name their task and failure message.
+    A failed run is logged and counted in run_errors, and the next one still
+    happens on schedule. With first_run_delayed the first run waits one
+    interval instead of starting right away. stop() cancels the task, so a
+    run is abandoned at its next await.
+    """
+    task_name = "diun-periodic-job"
+    failure_message = "Periodic job failed"
+    first_run_delayed = False
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.run_errors = 0
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """Start the periodic task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=self.task_name)
+
+    async def stop(self) -> None:
+        """Stop the periodic task."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    @abc.abstractmethod
+    async def run_once(self):
+        """Do one run of the job."""
+
+    async def _run(self) -> None:
+        if self.first_run_delayed:
+            await asyncio.sleep(self.interval)
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                self.run_errors += 1
+                logging.getLogger(type(self).__module__).exception(self.failure_message)
+            await asyncio.sleep(self.interval)
@@ -1,13 +1,36 @@
-from fastapi import FastAPI, Depends, HTTPException, Request, Header
+from fastapi import FastAPI, Depends, HTTPException, Request, Header, Query
 from fastapi.staticfiles import StaticFiles
-from sqlalchemy.orm import Session
-from .database import SessionLocal, engine, get_db, upsert_diun_update, delete_diun_update, delete_all_diun_updates, get_all_diun_updates
-from .models import WebhookData
-from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from .database import (
+    engine, writer, reader, read_cache, SQLITE_PRAGMAS, read_sqlite_pragmas, get_write_db, get_read_db,
+    DATABASE_PATH, SCHEMA_HEAD, get_schema_revision,
+    get_read_pool, get_write_pool, SessionPool, async_get_listing_rows,
+    async_delete_diun_updates, async_count_diun_updates,
+    async_upsert_diun_update, async_upsert_diun_updates, async_delete_diun_update,
+    async_delete_all_diun_updates_batched, async_get_diun_updates_page, async_query_diun_updates,
+    async_get_data_version, async_warm_read_cache, async_get_history_page, LISTING_COLUMNS, DEFAULT_SORT,
+    async_get_storage_stats, HISTORY_COMPACT_BATCH_SIZE, EXPIRE_BATCH_SIZE,
+)
+from .models import WebhookData, BulkDeleteRequest
+from .digest import short_digest
+from pydantic import ValidationError
+from .ingest import IngestQueue
+from .history import HistoryCompactor
+from .retention import RetentionSweeper, parse_retention_policy
+from .maintenance import DatabaseMaintenance
+from .events import EventBroker, broker as event_broker, get_event_broker
+from .workers import ChangeWatcher, LeaderLock, file_lock
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta, UTC
+from email.utils import format_datetime, parsedate_to_datetime
+from urllib.parse import urlencode
+import asyncio
+import functools
+import json
+import orjson
 import os
-from alembic.config import Config
-from alembic import command
+import time
 import logging
 
 # Configure application logging without interfering with uvicorn
@@ -19,6 +42,58 @@ if not DIUN_WEBHOOK_TOKEN:
     logger.critical("DIUN_WEBHOOK_TOKEN environment variable is not set")
     raise SystemExit(1)
 
+# "sync" writes each webhook before responding; "queue" acknowledges with 202
+# and leaves the write to a background IngestQueue.
+DIUN_INGEST_MODE = os.environ.get("DIUN_INGEST_MODE", "sync").lower()
+DIUN_INGEST_QUEUE_SIZE = int(os.environ.get("DIUN_INGEST_QUEUE_SIZE", "10000"))
+DIUN_INGEST_BATCH_SIZE = int(os.environ.get("DIUN_INGEST_BATCH_SIZE", "500"))
+DIUN_INGEST_MAX_LATENCY_MS = int(os.environ.get("DIUN_INGEST_MAX_LATENCY_MS", "500"))
+# Rows removed per transaction by Fix All
+DIUN_DELETE_BATCH_SIZE = int(os.environ.get("DIUN_DELETE_BATCH_SIZE", "1000"))
+# Limits on the fixed-update history; 0 disables a limit
+DIUN_HISTORY_MAX_AGE_DAYS = float(os.environ.get("DIUN_HISTORY_MAX_AGE_DAYS", "365"))
+DIUN_HISTORY_MAX_ROWS = int(os.environ.get("DIUN_HISTORY_MAX_ROWS", "100000"))
+DIUN_HISTORY_COMPACT_INTERVAL = float(os.environ.get("DIUN_HISTORY_COMPACT_INTERVAL", "3600"))
+DIUN_HISTORY_COMPACT_BATCH_SIZE = int(os.environ.get("DIUN_HISTORY_COMPACT_BATCH_SIZE", str(HISTORY_COMPACT_BATCH_SIZE)))
+# Maximum age of notifications, e.g. "90d,status:unchanged=7d,hostname:old-nas=1d";
+# empty keeps them until fixed
+DIUN_RETENTION = os.environ.get("DIUN_RETENTION", "")
+DIUN_RETENTION_INTERVAL = float(os.environ.get("DIUN_RETENTION_INTERVAL", "3600"))
+DIUN_RETENTION_BATCH_SIZE = int(os.environ.get("DIUN_RETENTION_BATCH_SIZE", str(EXPIRE_BATCH_SIZE)))
+# Seconds between SQLite maintenance passes (0 disables them); vacuum, optimize
+# and truncating checkpoints only run once writes have paused for
+# DIUN_MAINTENANCE_IDLE_SECONDS.
+DIUN_MAINTENANCE_INTERVAL = float(os.environ.get("DIUN_MAINTENANCE_INTERVAL", "300"))
+DIUN_MAINTENANCE_IDLE_SECONDS = float(os.environ.get("DIUN_MAINTENANCE_IDLE_SECONDS", "60"))
+DIUN_VACUUM_PAGES = int(os.environ.get("DIUN_VACUUM_PAGES", "1000"))
+# Seconds between checks for writes made by other processes, which reset open
+# dashboards (0 disables them)
+DIUN_EVENTS_POLL_INTERVAL = float(os.environ.get("DIUN_EVENTS_POLL_INTERVAL", "2"))
+# With several workers, the one holding this lock runs the periodic jobs; the
+# others retry every LEADER_RETRY_INTERVAL seconds in case it exits.
+JOBS_LOCK_PATH = f"{DATABASE_PATH}.jobs.lock"
+LEADER_RETRY_INTERVAL = 30.0
+# Compiled templates are stored here so a restart does not recompile them;
+# empty disables the cache.
+DIUN_TEMPLATE_CACHE_DIR = os.environ.get("DIUN_TEMPLATE_CACHE_DIR", "data/template-cache")
+# Rows per dashboard / API page
+DIUN_PAGE_SIZE = int(os.environ.get("DIUN_PAGE_SIZE", "100"))
+MAX_PAGE_SIZE = 1000
+# "paged" renders one page of the dashboard per request; "stream" sends every
+# row in one response, rendered while it is read.
+DIUN_DASHBOARD_MODE = os.environ.get("DIUN_DASHBOARD_MODE", "paged").lower()
+if DIUN_DASHBOARD_MODE not in ("paged", "stream"):
+    logger.critical(f"Invalid DIUN_DASHBOARD_MODE: {DIUN_DASHBOARD_MODE!r} (expected 'paged' or 'stream')")
+    raise SystemExit(1)
+if DIUN_INGEST_MODE not in ("sync", "queue"):
+    logger.critical(f"Invalid DIUN_INGEST_MODE: {DIUN_INGEST_MODE!r} (expected 'sync' or 'queue')")
+    raise SystemExit(1)
+try:
+    RETENTION_POLICY = parse_retention_policy(DIUN_RETENTION)
+except ValueError as e:
+    logger.critical(f"Invalid DIUN_RETENTION: {e}")
+    raise SystemExit(1)
+
 def verify_webhook_token(authorization: str = Header(None)):
     """Verify webhook authorization token"""
     if authorization != DIUN_WEBHOOK_TOKEN:
@@ -27,77 +102,569 @@ def verify_webhook_token(authorization: str = Header(None)):
     return authorization
 
 
-# Function to run Alembic migrations
-def run_migrations():
+def run_migrations(database_path: str = DATABASE_PATH) -> bool:
+    """
+    Bring the database schema up to SCHEMA_HEAD.
+
+    On the usual restart the schema is already current: that is answered by
+    reading alembic_version directly, and Alembic, its config and revision
+    scripts are only loaded when an upgrade is actually needed.
+
+    Returns:
+        True if Alembic ran, False if the schema was already at head
+    """
     # Ensure the database directory exists
-    db_file_path = os.path.abspath("data/diun.db")
-    db_directory = os.path.dirname(db_file_path)
-    if not os.path.exists(db_directory):
-        os.makedirs(db_directory)
+    os.makedirs(os.path.dirname(os.path.abspath(database_path)), exist_ok=True)
+
+    if get_schema_revision(database_path) == SCHEMA_HEAD:
+        return False
 
-    alembic_cfg = Config("src/alembic.ini")
-    command.upgrade(alembic_cfg, "head")
+    # Every uvicorn worker gets here on a fresh deployment: one upgrades while
+    # the others wait, then find the schema current.
+    with file_lock(f"{database_path}.migrate.lock"):
+        if get_schema_revision(database_path) == SCHEMA_HEAD:
+            return False
+        from alembic.config import Config
+        from alembic import command
+        alembic_cfg = Config("src/alembic.ini")
+        alembic_cfg.set_main_option("sqlalchemy.url", f"sqlite:///{database_path}")
+        command.upgrade(alembic_cfg, "head")
+    return True
 
 # Run migrations on startup
 logger.info("Starting application...")
+startup_began = time.perf_counter()
 try:
-    run_migrations()
+    migrated = run_migrations()
 except Exception as e:
     logger.critical(f"Migration failed, cannot start: {e}")
     raise SystemExit(1)
-logger.info("Migrations completed.")
+if migrated:
+    logger.info(f"Migrations completed in {(time.perf_counter() - startup_began) * 1000:.1f} ms.")
+else:
+    logger.info(f"Schema already at {SCHEMA_HEAD}, Alembic skipped ({(time.perf_counter() - startup_began) * 1000:.1f} ms).")
 logger.info("Starting FastAPI application")
 
-app = FastAPI()
+async def start_periodic_jobs(app: FastAPI) -> None:
+    """Start history compaction, retention and maintenance; only one worker runs them."""
+    if DIUN_HISTORY_MAX_AGE_DAYS or DIUN_HISTORY_MAX_ROWS:
+        app.state.history_compactor = HistoryCompactor(
+            writer.session,
+            max_age_days=DIUN_HISTORY_MAX_AGE_DAYS,
+            max_rows=DIUN_HISTORY_MAX_ROWS,
+            batch_size=DIUN_HISTORY_COMPACT_BATCH_SIZE,
+            interval=DIUN_HISTORY_COMPACT_INTERVAL,
+        )
+        await app.state.history_compactor.start()
+    if any(RETENTION_POLICY.values()):
+        app.state.retention_sweeper = RetentionSweeper(
+            writer.session,
+            RETENTION_POLICY,
+            batch_size=DIUN_RETENTION_BATCH_SIZE,
+            interval=DIUN_RETENTION_INTERVAL,
+        )
+        await app.state.retention_sweeper.start()
+        logger.info(f"Retention sweeper enabled ({DIUN_RETENTION})")
+    if DIUN_MAINTENANCE_INTERVAL > 0:
+        app.state.maintenance = DatabaseMaintenance(
+            writer.session,
+            reader.session,
+            interval=DIUN_MAINTENANCE_INTERVAL,
+            idle_after=DIUN_MAINTENANCE_IDLE_SECONDS,
+            vacuum_pages=DIUN_VACUUM_PAGES,
+        )
+        await app.state.maintenance.start()
+
+async def stop_periodic_jobs(app: FastAPI) -> None:
+    """Stop whichever periodic jobs this worker runs."""
+    if app.state.maintenance is not None:
+        await app.state.maintenance.stop()
+    if app.state.retention_sweeper is not None:
+        await app.state.retention_sweeper.stop()
+    if app.state.history_compactor is not None:
+        await app.state.history_compactor.stop()
+
+async def await_leadership(app: FastAPI) -> None:
+    """Take over the periodic jobs once the worker running them exits."""
+    while not app.state.jobs_leader.acquire():
+        await asyncio.sleep(LEADER_RETRY_INTERVAL)
+    logger.info("Taking over the periodic jobs")
+    await start_periodic_jobs(app)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    effective = read_sqlite_pragmas(engine, SQLITE_PRAGMAS)
+    logger.info("SQLite settings: " + ", ".join(f"{name}={value}" for name, value in effective.items()))
+
+    if read_cache is not None:
+        async with reader.session() as db:
+            await async_warm_read_cache(db)
+        logger.info(f"Dashboard cache warmed ({read_cache.stats()['rows']} rows)")
+
+    app.state.ingest_queue = None
+    app.state.fix_all = None
+    app.state.history_compactor = None
+    app.state.retention_sweeper = None
+    app.state.maintenance = None
+    if DIUN_INGEST_MODE == "queue":
+        app.state.ingest_queue = IngestQueue(
+            writer.session,
+            max_size=DIUN_INGEST_QUEUE_SIZE,
+            max_batch_size=DIUN_INGEST_BATCH_SIZE,
+            max_latency=DIUN_INGEST_MAX_LATENCY_MS / 1000,
+        )
+        await app.state.ingest_queue.start()
+        logger.info(f"Queued ingestion enabled (queue size {DIUN_INGEST_QUEUE_SIZE})")
+    app.state.change_watcher = None
+    if DIUN_EVENTS_POLL_INTERVAL > 0:
+        app.state.change_watcher = ChangeWatcher(reader.session, event_broker, interval=DIUN_EVENTS_POLL_INTERVAL)
+        await app.state.change_watcher.start()
+    app.state.jobs_leader = LeaderLock(JOBS_LOCK_PATH)
+    app.state.leader_election = None
+    if app.state.jobs_leader.acquire():
+        await start_periodic_jobs(app)
+    else:
+        logger.info("Periodic jobs run in another worker; standing by")
+        app.state.leader_election = asyncio.create_task(await_leadership(app), name="diun-leader-election")
+    logger.info(
+        f"Startup completed in {(time.perf_counter() - startup_began) * 1000:.1f} ms "
+        f"({'with migrations' if migrated else 'schema fast path'})"
+    )
+    yield
+    # End open /events streams so the server does not wait on them
+    event_broker.close()
+    if app.state.leader_election is not None:
+        app.state.leader_election.cancel()
+        try:
+            await app.state.leader_election
+        except asyncio.CancelledError:
+            pass
+    await stop_periodic_jobs(app)
+    app.state.jobs_leader.release()
+    if app.state.change_watcher is not None:
+        await app.state.change_watcher.stop()
+    if app.state.ingest_queue is not None:
+        logger.info("Draining ingestion queue...")
+        await app.state.ingest_queue.stop()
+
+app = FastAPI(lifespan=lifespan)
 
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-templates = Jinja2Templates(directory="templates")
+# Jinja2 is imported on the first page render instead of at startup: webhooks,
+# which must be accepted as soon as a restarted server is up, never need it.
+@functools.cache
+def template_environment(enable_async: bool = False) -> "jinja2.Environment":
+    """
+    Environment for templates/, with compiled templates cached on disk.
+
+    The async environment is used for streaming renders; its generate_async()
+    can consume rows from an async iterator as the template reaches them.
+    """
+    from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+    bytecode_cache = None
+    if DIUN_TEMPLATE_CACHE_DIR:
+        # Sync and async environments compile the same source differently
+        cache_dir = os.path.join(DIUN_TEMPLATE_CACHE_DIR, "async" if enable_async else "sync")
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(cache_dir)
+        except OSError as e:
+            logger.warning(f"Template cache disabled: {e}")
+    environment = Environment(
+        loader=FileSystemLoader("templates"),
+        autoescape=True,
+        enable_async=enable_async,
+        bytecode_cache=bytecode_cache,
+    )
+    environment.filters["short_digest"] = short_digest
+    return environment
+
+@functools.cache
+def get_templates() -> "fastapi.templating.Jinja2Templates":
+    """TemplateResponse factory for the HTML pages."""
+    from fastapi.templating import Jinja2Templates
+    return Jinja2Templates(env=template_environment())
+
+# Jinja yields many tiny strings; send them in chunks of about this many characters.
+STREAM_CHUNK_SIZE = 16 * 1024
+
+def get_ingest_queue(request: Request) -> IngestQueue | None:
+    """Return the write-behind queue when queued ingestion is enabled."""
+    return getattr(request.app.state, "ingest_queue", None)
 
 @app.post("/webhook")
 async def receive_webhook(
     request: Request,
-    db: Session = Depends(get_db),
-    token: str = Depends(verify_webhook_token)
+    write_pool: SessionPool = Depends(get_write_pool),
+    token: str = Depends(verify_webhook_token),
+    ingest_queue: IngestQueue | None = Depends(get_ingest_queue)
 ):
-    logger.info("Received webhook request")
-
-    data = await request.json()
-    logger.info(f"Processing webhook data for image: {data.get('image', 'unknown')}")
-    
-    # Validate webhook data using Pydantic model
+    # Validated straight from the body: no intermediate dict, no second model
     try:
-        webhook_data = WebhookData(**data)
-    except ValueError as e:
+        update_params = WebhookData.model_validate_json(await request.body()).to_update_params()
+    except ValidationError as e:
         logger.warning(f"Invalid webhook data: {e}")
         raise HTTPException(status_code=400, detail=f"Invalid webhook data: {e}")
-    
-    # Parse and convert to database format
-    update_data: DiunUpdateData = webhook_data.to_update_data()
-    
-    # Process the validated and parsed data
-    update = upsert_diun_update(db, update_data)
-    logger.info(f"Successfully processed update for {update.image_name}:{update.image_tag}")
+
+    if ingest_queue is not None:
+        if not ingest_queue.submit(update_params):
+            logger.warning("Ingestion queue is full, rejecting webhook")
+            raise HTTPException(status_code=503, detail="Ingestion queue is full")
+        return JSONResponse(status_code=202, content={"message": "Webhook accepted"})
+
+    # The writer is only taken once the body is valid, and never in queue mode
+    async with write_pool.session() as db:
+        await async_upsert_diun_update(db, update_params)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Stored update for {update_params.hostname}: {update_params.image_name}:{update_params.image_tag}")
     return {"message": "Webhook received"}
 
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+@app.post("/webhook/batch")
+async def receive_webhook_batch(
+    request: Request,
+    write_pool: SessionPool = Depends(get_write_pool),
+    token: str = Depends(verify_webhook_token)
+):
+    """Accept many webhook payloads as a JSON array or NDJSON and store them in one transaction."""
+    body = await request.body()
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+
+    if content_type in NDJSON_CONTENT_TYPES:
+        # Lines are validated as they are, like single webhooks
+        items = [line for line in body.splitlines() if line.strip()]
+    else:
+        try:
+            items = json.loads(body)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON body: {e}")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of webhook payloads")
+
+    logger.info(f"Received webhook batch with {len(items)} items")
+
+    results = []
+    accepted = []
+    for index, item in enumerate(items):
+        try:
+            if isinstance(item, bytes):
+                webhook_data = WebhookData.model_validate_json(item)
+            elif isinstance(item, dict):
+                webhook_data = WebhookData.model_validate(item)
+            else:
+                raise ValueError("payload must be a JSON object")
+            accepted.append(webhook_data.to_update_params())
+            results.append({"index": index, "status": "accepted"})
+        except ValueError as e:
+            results.append({"index": index, "status": "rejected", "error": str(e)})
+
+    async with write_pool.session() as db:
+        await async_upsert_diun_updates(db, accepted)
+    logger.info(f"Processed webhook batch: {len(accepted)} accepted, {len(items) - len(accepted)} rejected")
+    return {
+        "accepted": len(accepted),
+        "rejected": len(items) - len(accepted),
+        "results": results,
+    }
+
 @app.delete("/updates/{update_id}")
-async def delete_update(update_id: int, db: Session = Depends(get_db)):
-    deleted = delete_diun_update(db, update_id)
+async def delete_update(update_id: int, db: AsyncSession = Depends(get_write_db)):
+    deleted = await async_delete_diun_update(db, update_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Update not found")
     return {"message": "Update marked as fixed"}
 
+@app.post("/updates/bulk-delete")
+async def bulk_delete_updates(
+    selection: BulkDeleteRequest,
+    read_pool: SessionPool = Depends(get_read_pool),
+    write_pool: SessionPool = Depends(get_write_pool)
+):
+    """Fix every update matching ids and/or filters in one statement, or just count them."""
+    if selection.dry_run:
+        # Counting never needs the writer
+        async with read_pool.session() as db:
+            matched = await async_count_diun_updates(db, **selection.criteria())
+        return {"dry_run": True, "matched": matched}
+
+    async with write_pool.session() as db:
+        deleted_ids = await async_delete_diun_updates(db, **selection.criteria())
+    logger.info(f"Bulk delete removed {len(deleted_ids)} entries")
+    return {"deleted": len(deleted_ids), "ids": deleted_ids}
+
 @app.delete("/updates")
-async def delete_all_updates(db: Session = Depends(get_db)):
-    deleted_count = delete_all_diun_updates(db)
+async def delete_all_updates(request: Request, write_pool: SessionPool = Depends(get_write_pool)):
+    progress = request.app.state.fix_all = {"running": True, "deleted": 0, "started_at": datetime.now(UTC)}
+
+    def report(deleted: int) -> None:
+        if deleted // DIUN_DELETE_BATCH_SIZE % 10 == 0:
+            logger.info(f"Fix All: {deleted} entries removed so far")
+        progress["deleted"] = deleted
+
+    try:
+        deleted_count = await async_delete_all_diun_updates_batched(write_pool, DIUN_DELETE_BATCH_SIZE, report)
+    finally:
+        progress["running"] = False
     return {"message": f"All updates fixed ({deleted_count} entries removed)"}
 
+def cache_headers(version: int, updated_at: datetime | None) -> dict:
+    """Validators for listings derived from the diun_updates data version."""
+    headers = {"ETag": f'"{version}"', "Cache-Control": "no-cache"}
+    if updated_at is not None:
+        headers["Last-Modified"] = format_datetime(updated_at.replace(tzinfo=UTC), usegmt=True)
+    return headers
+
+def is_not_modified(request: Request, version: int, updated_at: datetime | None) -> bool:
+    """
+    Evaluate If-None-Match or, only without one, If-Modified-Since.
+
+    The ETag is the data version and changes with every write. Last-Modified
+    has one-second resolution, so while the newest write is less than a
+    second old another one could still land with the same timestamp; until
+    then If-Modified-Since never answers 304.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or f'"{version}"' in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and updated_at is not None:
+        updated_at = updated_at.replace(tzinfo=UTC)
+        if datetime.now(UTC) - updated_at < timedelta(seconds=1):
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=UTC)
+        return updated_at <= since
+    return False
+
+LISTING_FIELDS = tuple(column.key for column in LISTING_COLUMNS)
+
+@app.get("/api/updates")
+async def list_updates(
+    request: Request,
+    hostname: str | None = None,
+    image_name_prefix: str | None = None,
+    status: str | None = None,
+    provider: str | None = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    sort: str = DEFAULT_SORT,
+    cursor: str | None = None,
+    limit: int = Query(DIUN_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """List updates with filters, sorting and cursor pagination, serialized straight from row tuples."""
+    version, updated_at = await async_get_data_version(db)
+    headers = cache_headers(version, updated_at)
+    if is_not_modified(request, version, updated_at):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        rows, next_cursor = await async_query_diun_updates(
+            db,
+            hostname=hostname,
+            image_name_prefix=image_name_prefix,
+            status=status,
+            provider=provider,
+            created_after=created_after,
+            created_before=created_before,
+            sort=sort,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    content = orjson.dumps({
+        "items": [dict(zip(LISTING_FIELDS, row)) for row in rows],
+        "next_cursor": next_cursor,
+    })
+    return Response(content=content, media_type="application/json", headers=headers)
+
+@app.get("/events")
+async def events(
+    request: Request,
+    data_version: int | None = None,
+    broker: EventBroker = Depends(get_event_broker),
+    read_pool: SessionPool = Depends(get_read_pool)
+):
+    """Server-Sent Events stream of upsert and delete deltas for the dashboard."""
+    # EventSource sends Last-Event-ID when reconnecting; the first connection
+    # passes the id the page was rendered at as a query parameter instead.
+    last_event_id = request.headers.get("last-event-id") or request.query_params.get("last_event_id")
+    if data_version is not None and not broker.can_resume(last_event_id):
+        # The page was rendered by another worker. If nothing has been written
+        # since, there is nothing to replay: start from now instead of a reset.
+        current_event_id = broker.last_event_id
+        async with read_pool.session() as db:
+            version, _ = await async_get_data_version(db)
+        if version == data_version:
+            last_event_id = current_event_id
+    return StreamingResponse(
+        broker.stream(last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/debug/events")
+async def event_stats(broker: EventBroker = Depends(get_event_broker)):
+    return broker.stats()
+
+@app.get("/debug/fix-all")
+async def fix_all_progress(request: Request):
+    return request.app.state.fix_all or {"running": False}
+
+@app.get("/debug/history")
+async def history_stats(request: Request):
+    compactor = request.app.state.history_compactor
+    if compactor is None:
+        return {"enabled": False}
+    return {"enabled": True, **compactor.stats()}
+
+@app.get("/debug/retention")
+async def retention_stats(request: Request):
+    sweeper = request.app.state.retention_sweeper
+    if sweeper is None:
+        return {"enabled": False}
+    return {"enabled": True, **sweeper.stats()}
+
+@app.get("/debug/storage")
+async def storage_stats(request: Request, db: AsyncSession = Depends(get_read_db)):
+    maintenance = request.app.state.maintenance
+    return {
+        **await async_get_storage_stats(db),
+        "maintenance": maintenance.stats() if maintenance is not None else None,
+    }
+
+@app.get("/debug/ingest")
+async def ingest_stats(ingest_queue: IngestQueue | None = Depends(get_ingest_queue)):
+    if ingest_queue is None:
+        return {"mode": "sync"}
+    return {"mode": "queue", **ingest_queue.stats()}
+
+@app.get("/debug/workers")
+async def worker_stats(request: Request):
+    watcher = request.app.state.change_watcher
+    return {
+        "pid": os.getpid(),
+        "jobs_leader": request.app.state.jobs_leader.held,
+        "change_watcher": watcher.stats() if watcher is not None else None,
+    }
+
+@app.get("/debug/db")
+async def db_stats():
+    return {"writer": writer.stats(), "reader": reader.stats()}
+
+@app.get("/debug/cache")
+async def cache_stats():
+    if read_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **read_cache.stats()}
+
 @app.get("/health")
 async def health():
     return {"status": "ok"}
 
+def parse_date_param(name: str, value: str | None) -> date | None:
+    """Parse an optional YYYY-MM-DD query parameter; empty form fields count as absent."""
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}: {value!r} (expected YYYY-MM-DD)")
+
+@app.get("/history", response_class=HTMLResponse)
+async def read_history(
+    request: Request,
+    hostname: str | None = None,
+    fixed_from: str | None = None,
+    fixed_until: str | None = None,
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Page through fixed updates, most recent first, optionally for one host and a range of days (UTC)."""
+    hostname = hostname or None
+    start_day = parse_date_param("fixed_from", fixed_from)
+    end_day = parse_date_param("fixed_until", fixed_until)
+    try:
+        entries, next_cursor = await async_get_history_page(
+            db,
+            cursor,
+            DIUN_PAGE_SIZE,
+            hostname=hostname,
+            fixed_after=datetime.combine(start_day, datetime.min.time(), UTC) if start_day else None,
+            # fixed_until is inclusive
+            fixed_before=datetime.combine(end_day + timedelta(days=1), datetime.min.time(), UTC) if end_day else None,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    filters = {"hostname": hostname, "fixed_from": start_day, "fixed_until": end_day}
+    return get_templates().TemplateResponse(request, "history.html", {
+        "entries": entries,
+        "hostname": hostname,
+        "fixed_from": start_day,
+        "fixed_until": end_day,
+        "filter_query": urlencode({name: value for name, value in filters.items() if value is not None}),
+        "cursor": cursor,
+        "next_cursor": next_cursor,
+    })
+
+async def render_dashboard_stream(rows: list[tuple], last_event_id: str, data_version: int):
+    """Render index.html for every row, yielding HTML while it is being rendered."""
+    template = template_environment(enable_async=True).get_template("index.html")
+    buffer, size = [], 0
+    async for chunk in template.generate_async(
+        updates=rows, has_updates=bool(rows),
+        last_event_id=last_event_id, data_version=data_version,
+    ):
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= STREAM_CHUNK_SIZE:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
 @app.get("/", response_class=HTMLResponse)
-async def read_root(request: Request, db: Session = Depends(get_db)):
-    updates = get_all_diun_updates(db)
-    return templates.TemplateResponse(request, "index.html", {"updates": updates})
\ No newline at end of file
+async def read_root(
+    request: Request,
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
+    broker: EventBroker = Depends(get_event_broker)
+):
+    version, updated_at = await async_get_data_version(db)
+    headers = cache_headers(version, updated_at)
+    if is_not_modified(request, version, updated_at):
+        return Response(status_code=304, headers=headers)
+
+    # Taken before reading rows, so the page's live updates resume from here
+    last_event_id = broker.last_event_id
+
+    if DIUN_DASHBOARD_MODE == "stream" and cursor is None:
+        rows = await async_get_listing_rows(db)
+        # Hand the reader connection and its snapshot back before a slow client
+        # reads the response; the dependency would only close it afterwards.
+        await db.close()
+        return StreamingResponse(render_dashboard_stream(rows, last_event_id, version), media_type="text/html", headers=headers)
+
+    try:
+        updates, next_cursor = await async_get_diun_updates_page(db, cursor, DIUN_PAGE_SIZE)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return get_templates().TemplateResponse(request, "index.html", {
+        "updates": updates,
+        "has_updates": bool(updates),
+        "last_event_id": last_event_id,
+        "data_version": version,
+        "cursor": cursor,
+        "next_cursor": next_cursor,
+    }, headers=headers)
\ No newline at end of file
@@ -0,0 +1,122 @@
+import logging
+import time
+from datetime import datetime, UTC
+
+from .database import (
+    async_checkpoint_wal, async_get_data_version, async_incremental_vacuum, async_optimize_database,
+)
+from .jobs import PeriodicJob
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseMaintenance(PeriodicJob):
+    """
+    Periodic SQLite upkeep.
+
+    Every interval seconds a PASSIVE WAL checkpoint copies what it can back
+    into the database without waiting on readers. When diun_updates has not
+    changed for idle_after seconds (judged from the diun_meta counter, so
+    writes from other processes count), the pass also releases up to
+    vacuum_pages free pages with incremental_vacuum, runs PRAGMA optimize and
+    finishes with a TRUNCATE checkpoint that empties the -wal file. That
+    checkpoint holds the write lock while it waits for readers, so it gives
+    up after checkpoint_timeout seconds and settles for a PASSIVE one.
+
+    The first pass waits one interval, leaving startup to the webhooks. The
+    idleness check reads through read_session_factory and never waits for
+    the writer. Vacuum, optimize and checkpoint each take their own session
+    from session_factory, so a webhook arriving mid-pass waits for one step
+    rather than the whole pass.
+    """
+    task_name = "diun-db-maintenance"
+    failure_message = "Database maintenance failed"
+    first_run_delayed = True
+
+    def __init__(
+        self,
+        session_factory,
+        read_session_factory,
+        interval: float = 300.0,
+        idle_after: float = 60.0,
+        vacuum_pages: int = 1000,
+        checkpoint_timeout: float = 1.0,
+    ):
+        super().__init__(interval)
+        self.session_factory = session_factory
+        self.read_session_factory = read_session_factory
+        self.idle_after = idle_after
+        self.vacuum_pages = vacuum_pages
+        self.checkpoint_timeout = checkpoint_timeout
+
+        self.runs = 0
+        self.idle_runs = 0
+        self.pages_vacuumed = 0
+        self.optimizes = 0
+        self.truncate_fallbacks = 0
+        self.last_checkpoint: dict | None = None
+        self.last_run_duration = 0.0
+        self.last_run_at: float | None = None
+
+    async def is_idle(self) -> bool:
+        """True if diun_updates has not been written to for idle_after seconds."""
+        async with self.read_session_factory() as db:
+            _, updated_at = await async_get_data_version(db)
+        if updated_at is None:
+            return True
+        return (datetime.now(UTC).replace(tzinfo=None) - updated_at).total_seconds() >= self.idle_after
+
+    async def run_once(self, force: bool = False) -> dict:
+        """
+        Run one maintenance pass.
+
+        Args:
+            force: Run the idle-only steps even if the database is busy
+
+        Returns:
+            What was done: {"idle", "pages_vacuumed", "optimized", "checkpoint"}
+        """
+        start = time.monotonic()
+        idle = force or await self.is_idle()
+        result = {"idle": idle, "pages_vacuumed": 0, "optimized": False}
+        if idle:
+            async with self.session_factory() as db:
+                result["pages_vacuumed"] = await async_incremental_vacuum(db, self.vacuum_pages)
+            async with self.session_factory() as db:
+                await async_optimize_database(db)
+            result["optimized"] = True
+        async with self.session_factory() as db:
+            mode = "TRUNCATE" if idle else "PASSIVE"
+            result["checkpoint"] = await async_checkpoint_wal(db, mode, int(self.checkpoint_timeout * 1000))
+            if mode == "TRUNCATE" and result["checkpoint"]["busy"]:
+                # A reader kept the WAL in use: copy what can be copied without waiting
+                self.truncate_fallbacks += 1
+                result["checkpoint"] = await async_checkpoint_wal(db, "PASSIVE")
+
+        self.runs += 1
+        self.idle_runs += idle
+        self.pages_vacuumed += result["pages_vacuumed"]
+        self.optimizes += result["optimized"]
+        self.last_checkpoint = result["checkpoint"]
+        self.last_run_duration = time.monotonic() - start
+        self.last_run_at = time.time()
+        if result["pages_vacuumed"]:
+            logger.info(f"Maintenance released {result['pages_vacuumed']} free pages")
+        return result
+
+    def stats(self) -> dict:
+        """Return settings and pass counters."""
+        return {
+            "interval": self.interval,
+            "idle_after": self.idle_after,
+            "vacuum_pages": self.vacuum_pages,
+            "runs": self.runs,
+            "idle_runs": self.idle_runs,
+            "run_errors": self.run_errors,
+            "pages_vacuumed": self.pages_vacuumed,
+            "optimizes": self.optimizes,
+            "truncate_fallbacks": self.truncate_fallbacks,
+            "last_checkpoint": self.last_checkpoint,
+            "last_run_duration_ms": round(self.last_run_duration * 1000, 3),
+            "last_run_at": self.last_run_at,
+        }
@@ -1,7 +1,9 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import NamedTuple, Optional
 from datetime import datetime
 
+from .imageref import parse_image_reference
+
 class WebhookData(BaseModel):
     """API input validation model"""
     hostname: str = Field(min_length=1)  # Required - server hostname
@@ -17,30 +19,52 @@ class WebhookData(BaseModel):
     platform: Optional[str] = None
     metadata: Optional[dict] = None
 
-    def to_update_data(self) -> "DiunUpdateData":
-        """Parse webhook payload into a DiunUpdateData ready for the database."""
-        # Strip digest suffix (e.g. "image:tag@sha256:abc..." -> "image:tag")
-        image_full = self.image.split('@')[0]
-        image_parts = image_full.rsplit(':', 1)
-        image_name = image_parts[0] if len(image_parts) > 1 else image_full
-        image_tag = image_parts[1] if len(image_parts) > 1 else "latest"
+    def to_update_params(self) -> "UpdateParams":
+        """
+        Parse webhook payload into the values written to diun_updates.
+
+        This is the webhook hot path: the payload has already been validated,
+        so the parsed values go into a plain tuple rather than a second model.
+        """
+        # Registry, "library/" and tag defaults are normalized, so "nginx" and
+        # "docker.io/library/nginx:latest" are the same image; any digest is dropped.
+        try:
+            reference = parse_image_reference(self.image)
+        except ValueError:
+            # Not a valid reference: store it split on the last ":" as received
+            image_full = self.image.split('@')[0]
+            image_parts = image_full.rsplit(':', 1)
+            image_name = image_parts[0] if len(image_parts) > 1 else image_full
+            image_tag = image_parts[1] if len(image_parts) > 1 else "latest"
+        else:
+            image_name = reference.familiar_name
+            image_tag = reference.tag or "latest"
 
         try:
             image_created_at = datetime.fromisoformat(self.created.replace('Z', '+00:00')).replace(tzinfo=None)
         except (ValueError, AttributeError):
             image_created_at = None
 
-        return DiunUpdateData(
-            hostname=self.hostname,
-            status=self.status,
-            provider=self.provider,
-            image_name=image_name,
-            image_tag=image_tag,
-            digest=self.digest,
-            image_created_at=image_created_at,
-            hub_link=self.hub_link,
+        return UpdateParams(
+            self.hostname, self.status, self.provider, image_name, image_tag,
+            self.digest, image_created_at, self.hub_link,
         )
 
+    def to_update_data(self) -> "DiunUpdateData":
+        """Parse webhook payload into a DiunUpdateData ready for the database."""
+        return DiunUpdateData(**self.to_update_params()._asdict())
+
+class UpdateParams(NamedTuple):
+    """Parsed webhook values with the fields of DiunUpdateData, without re-validation"""
+    hostname: str
+    status: str
+    provider: str
+    image_name: str
+    image_tag: str
+    digest: str
+    image_created_at: Optional[datetime] = None
+    hub_link: Optional[str] = None
+
 class DiunUpdateData(BaseModel):
     """Database operation model with parsed image data"""
     hostname: str       # Required - server hostname
@@ -50,4 +74,23 @@ class DiunUpdateData(BaseModel):
     image_tag: str      # Required - parsed tag (defaults to "latest")
     digest: str         # Required - SHA256 digest
     image_created_at: Optional[datetime] = None  # When the image was created
-    hub_link: Optional[str] = None  # Optional - link to registry
\ No newline at end of file
+    hub_link: Optional[str] = None  # Optional - link to registry
+
+class BulkDeleteRequest(BaseModel):
+    """Selection for bulk "fix"; all given criteria must match"""
+    ids: Optional[list[int]] = Field(None, min_length=1, max_length=1000)  # Explicit record IDs
+    hostname: Optional[str] = None
+    image_name: Optional[str] = None
+    status: Optional[str] = None
+    older_than: Optional[datetime] = None  # Only records received before this time
+    dry_run: bool = False  # Only count the matching records
+
+    @model_validator(mode="after")
+    def require_criteria(self) -> "BulkDeleteRequest":
+        if not self.criteria():
+            raise ValueError("At least one of ids, hostname, image_name, status or older_than is required")
+        return self
+
+    def criteria(self) -> dict:
+        """The selection as keyword arguments for delete_diun_updates."""
+        return self.model_dump(exclude={"dry_run"}, exclude_none=True)
@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import re
+import time
+from collections import deque
+from datetime import datetime, timedelta, UTC
+
+from .database import EXPIRE_BATCH_SIZE, async_delete_expired_diun_updates_batch
+from .jobs import PeriodicJob
+
+logger = logging.getLogger(__name__)
+
+_AGE = re.compile(r"(\d+(?:\.\d+)?)([dh]?)")
+
+
+def parse_age(value: str) -> timedelta:
+    """Parse "30d", "12h" or a bare number of days."""
+    match = _AGE.fullmatch(value.strip().lower())
+    if match is None:
+        raise ValueError(f"Invalid retention age {value!r} (expected e.g. 30d or 12h)")
+    amount, unit = float(match.group(1)), match.group(2)
+    return timedelta(hours=amount) if unit == "h" else timedelta(days=amount)
+
+
+def parse_retention_policy(spec: str) -> dict:
+    """
+    Parse a DIUN_RETENTION specification.
+
+    The spec is a comma-separated list of entries. "90d" sets the default
+    maximum age, "status:unchanged=7d" sets it for one status and
+    "hostname:old-nas=1d" for one host. A hostname rule takes precedence over
+    a status rule, which takes precedence over the default.
+
+    Returns:
+        {"default": timedelta | None, "status": {status: timedelta}, "hostname": {hostname: timedelta}}
+
+    Raises:
+        ValueError: If an entry is malformed
+    """
+    policy = {"default": None, "status": {}, "hostname": {}}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        selector, _, age = entry.rpartition("=")
+        if not selector:
+            policy["default"] = parse_age(age)
+            continue
+        kind, _, name = selector.partition(":")
+        if kind not in ("status", "hostname") or not name:
+            raise ValueError(f"Invalid retention rule {entry!r} (expected status:<name>=<age> or hostname:<name>=<age>)")
+        policy[kind][name] = parse_age(age)
+    return policy
+
+
+def retention_selections(policy: dict, now: datetime) -> list[tuple[str, dict]]:
+    """
+    Split a policy into disjoint selections for delete_expired_diun_updates_batch.
+
+    Each record falls under exactly one rule: its host's, else its status's,
+    else the default.
+
+    Returns:
+        List of (rule label, keyword arguments) pairs
+    """
+    hostnames = tuple(policy["hostname"])
+    statuses = tuple(policy["status"])
+    selections = [
+        (f"hostname:{hostname}", {"older_than": now - age, "hostname": hostname})
+        for hostname, age in policy["hostname"].items()
+    ]
+    selections += [
+        (f"status:{status}", {"older_than": now - age, "status": status, "exclude_hostnames": hostnames})
+        for status, age in policy["status"].items()
+    ]
+    if policy["default"] is not None:
+        selections.append(("default", {
+            "older_than": now - policy["default"],
+            "exclude_hostnames": hostnames,
+            "exclude_statuses": statuses,
+        }))
+    return selections
+
+
+class RetentionSweeper(PeriodicJob):
+    """
+    Background job deleting notifications older than the retention policy allows.
+
+    Every interval seconds, starting right away, each rule's expired records
+    are deleted oldest first, batch_size per transaction. A session from
+    session_factory lasts one batch and the task yields after it, so a sweep
+    through months of stale rows never keeps webhooks or fixes waiting for
+    more than a batch.
+    """
+    task_name = "diun-retention-sweeper"
+    failure_message = "Retention sweep failed"
+
+    def __init__(
+        self,
+        session_factory,
+        policy: dict,
+        batch_size: int = EXPIRE_BATCH_SIZE,
+        interval: float = 3600.0,
+        history_size: int = 10,
+    ):
+        super().__init__(interval)
+        self.session_factory = session_factory
+        self.policy = policy
+        self.batch_size = batch_size
+
+        self.runs = 0
+        self.rows_pruned = 0
+        # Most recent runs, newest last
+        self.recent_runs: deque[dict] = deque(maxlen=history_size)
+
+    async def run_once(self) -> int:
+        """
+        Delete every record outside the retention policy.
+
+        Returns:
+            Number of records deleted
+        """
+        started_at = datetime.now(UTC)
+        start = time.monotonic()
+        pruned, batches = {}, 0
+        for rule, selection in retention_selections(self.policy, started_at):
+            pruned[rule] = 0
+            while True:
+                async with self.session_factory() as db:
+                    deleted = await async_delete_expired_diun_updates_batch(
+                        db, batch_size=self.batch_size, **selection
+                    )
+                batches += 1
+                pruned[rule] += len(deleted)
+                if len(deleted) < self.batch_size:
+                    break
+                # Let other tasks run between batches
+                await asyncio.sleep(0)
+
+        total = sum(pruned.values())
+        duration = time.monotonic() - start
+        self.runs += 1
+        self.rows_pruned += total
+        self.recent_runs.append({
+            "started_at": started_at.isoformat(),
+            "pruned": total,
+            "pruned_by_rule": pruned,
+            "batches": batches,
+            "duration_ms": round(duration * 1000, 3),
+        })
+        if total:
+            logger.info(f"Retention sweep removed {total} stale entries in {duration * 1000:.1f} ms")
+        return total
+
+    def stats(self) -> dict:
+        """Return the policy and per-run counters."""
+        return {
+            "policy": {
+                "default_days": self.policy["default"] / timedelta(days=1) if self.policy["default"] else None,
+                "status_days": {name: age / timedelta(days=1) for name, age in self.policy["status"].items()},
+                "hostname_days": {name: age / timedelta(days=1) for name, age in self.policy["hostname"].items()},
+            },
+            "batch_size": self.batch_size,
+            "interval": self.interval,
+            "runs": self.runs,
+            "run_errors": self.run_errors,
+            "rows_pruned": self.rows_pruned,
+            "recent_runs": list(self.recent_runs),
+        }
@@ -0,0 +1,114 @@
+"""
+Coordination between uvicorn worker processes sharing one database.
+
+"uvicorn --workers N" imports the application once per worker. Migrations are
+serialized with file_lock so exactly one worker upgrades the schema while the
+others wait and then find it current; LeaderLock picks the worker that runs
+the periodic jobs. Both use flock(2) on files next to the database, which the
+kernel releases when a process exits, so a crashed worker never leaves a
+stale lock behind.
+
+Each worker keeps its own dashboard cache and event broker. The cache checks
+the diun_meta data version on every read; ChangeWatcher polls it for the
+broker, so dashboards connected to one worker learn about writes another
+worker handled.
+"""
+import fcntl
+from contextlib import contextmanager
+
+from .database import async_get_data_version
+from .jobs import PeriodicJob
+
+
+@contextmanager
+def file_lock(path: str):
+    """Hold an exclusive lock on path (created if missing), waiting for other processes."""
+    with open(path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class LeaderLock:
+    """
+    Exclusive lock on path that at most one process holds at a time.
+
+    acquire() never waits: the worker that gets the lock keeps it until
+    release() or until it exits, and the others can retry to take over.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    @property
+    def held(self) -> bool:
+        return self._file is not None
+
+    def acquire(self) -> bool:
+        """Take the lock if no other process holds it; True if this process holds it now."""
+        if self._file is not None:
+            return True
+        lock_file = open(self.path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+        self._file = lock_file
+        return True
+
+    def release(self) -> None:
+        """Give up the lock if held."""
+        if self._file is None:
+            return
+        fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
+
+
+class ChangeWatcher(PeriodicJob):
+    """
+    Background job passing the diun_meta data version to an EventBroker.
+
+    Every interval seconds the version is read with a session from
+    session_factory and handed to broker.check_version(), which resets
+    connected dashboards once it sees changes that were not made in this
+    process. The first check only records the version. A check is one
+    SELECT, so it should not queue behind the writer.
+    """
+    task_name = "diun-change-watcher"
+    failure_message = "Data version check failed"
+
+    def __init__(self, session_factory, broker, interval: float = 2.0):
+        super().__init__(interval)
+        self.session_factory = session_factory
+        self.broker = broker
+
+        self.checks = 0
+        self.resets = 0
+
+    async def run_once(self) -> bool:
+        """
+        Check the data version once.
+
+        Returns:
+            True if the broker broadcast a reset
+        """
+        async with self.session_factory() as db:
+            version, _ = await async_get_data_version(db)
+        self.checks += 1
+        reset = self.broker.check_version(version)
+        self.resets += reset
+        return reset
+
+    def stats(self) -> dict:
+        """Return the poll interval and counters."""
+        return {
+            "interval": self.interval,
+            "checks": self.checks,
+            "check_errors": self.run_errors,
+            "resets": self.resets,
+        }
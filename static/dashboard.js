@@ -1,9 +1,61 @@
+const tbody = document.getElementById('updates');
+const fixAllBtn = document.getElementById('fix-all-btn');
+
+function cell(text) {
+    const td = document.createElement('td');
+    td.textContent = text ?? '';
+    return td;
+}
+
+function buildRow(update) {
+    const tr = document.createElement('tr');
+    tr.dataset.id = update.id;
+
+    const link = document.createElement('a');
+    link.href = update.hub_link ?? '';
+    link.target = '_blank';
+    link.textContent = update.hub_link ?? '';
+    const linkCell = cell('');
+    linkCell.appendChild(link);
+
+    const button = document.createElement('button');
+    button.dataset.fixId = update.id;
+    button.textContent = 'Fix';
+    const actionCell = cell('');
+    actionCell.appendChild(button);
+
+    tr.append(
+        cell(update.hostname),
+        cell(update.image_name),
+        cell(update.image_tag),
+        cell(update.short_digest),
+        cell(update.status),
+        cell(update.provider),
+        linkCell,
+        cell(update.created_at ? update.created_at.replace('T', ' ') : ''),
+        actionCell,
+    );
+    return tr;
+}
+
+function removeRow(id) {
+    const row = tbody.querySelector(`tr[data-id="${id}"]`);
+    if (row) {
+        row.remove();
+    }
+    updateFixAllButton();
+}
+
+function updateFixAllButton() {
+    fixAllBtn.hidden = tbody.rows.length === 0;
+}
+
 async function markAsFixed(id) {
     const response = await fetch(`/updates/${id}`, {
         method: 'DELETE',
     });
     if (response.ok) {
-        location.reload();
+        removeRow(id);
     } else {
         alert('Failed to mark as fixed.');
     }
@@ -14,23 +66,60 @@ async function fixAll() {
         return;
     }
 
+    // Fix All removes what existed when it started; rows arriving meanwhile stay
+    const shown = [...tbody.rows];
     const response = await fetch('/updates', {
         method: 'DELETE',
     });
     if (response.ok) {
-        location.reload();
+        shown.forEach(row => row.remove());
+        updateFixAllButton();
     } else {
         alert('Failed to fix all entries.');
     }
 }
 
+function subscribe() {
+    // Start from the event the page was rendered at. EventSource reconnects
+    // by itself and resends the last event id, so missed deltas are
+    // replayed; "reset" means they could not be. The data version lets a
+    // worker other than the one that rendered the page pick up from here.
+    const lastEventId = encodeURIComponent(tbody.dataset.lastEventId);
+    const dataVersion = encodeURIComponent(tbody.dataset.dataVersion);
+    const events = new EventSource(`/events?last_event_id=${lastEventId}&data_version=${dataVersion}`);
+
+    events.addEventListener('upsert', (event) => {
+        const update = JSON.parse(event.data);
+        const existing = tbody.querySelector(`tr[data-id="${update.id}"]`);
+        if (existing) {
+            existing.remove();
+        }
+        // Later pages only lose rows; new ones belong on the first page
+        if (!('paged' in tbody.dataset)) {
+            tbody.prepend(buildRow(update));
+        }
+        updateFixAllButton();
+    });
+
+    events.addEventListener('delete', (event) => {
+        JSON.parse(event.data).ids.forEach(removeRow);
+    });
+
+    events.addEventListener('reset', () => {
+        events.close();
+        location.reload();
+    });
+}
+
 document.addEventListener('DOMContentLoaded', () => {
-    document.querySelectorAll('[data-fix-id]').forEach(button => {
-        button.addEventListener('click', () => markAsFixed(button.dataset.fixId));
+    tbody.addEventListener('click', (event) => {
+        const button = event.target.closest('[data-fix-id]');
+        if (button) {
+            markAsFixed(button.dataset.fixId);
+        }
     });
 
-    const fixAllBtn = document.getElementById('fix-all-btn');
-    if (fixAllBtn) {
-        fixAllBtn.addEventListener('click', fixAll);
-    }
+    fixAllBtn.addEventListener('click', fixAll);
+
+    subscribe();
 });
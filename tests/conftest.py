@@ -4,9 +4,12 @@ import os
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 from src.main import app
-from src.database import Base, get_db
+from src.models import DiunUpdateData
+from src.events import EventBroker, get_event_broker
+from src.database import Base, SQLITE_PRAGMAS, ReadCache, create_session_pools, get_db, get_write_db, get_read_db, get_read_pool, get_write_pool
 
 
 @pytest.fixture
@@ -28,11 +31,32 @@ def test_db():
     yield TestSessionLocal, test_engine
     
     # Cleanup
-    os.unlink(db_path)
+    test_engine.dispose()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.unlink(db_path + suffix)
 
 
 @pytest.fixture
-def test_client(test_db):
+def test_event_broker():
+    """Create an EventBroker for the test database's changes."""
+    return EventBroker(buffer_size=100, keepalive=0.1)
+
+
+@pytest.fixture
+def test_session_pools(test_db, test_event_broker):
+    """Create writer and reader SessionPools for the test database."""
+    TestSessionLocal, test_engine = test_db
+    # NullPool: TestClient and async tests run on their own event loops, so
+    # aiosqlite connections must not outlive them in a pool.
+    return create_session_pools(
+        test_engine.url.database, SQLITE_PRAGMAS,
+        read_cache=ReadCache(), listeners=(test_event_broker,), poolclass=NullPool,
+    )
+
+
+@pytest.fixture
+def test_client(test_db, test_session_pools, test_event_broker):
     """Create a test client with test database."""
     TestSessionLocal, test_engine = test_db
     
@@ -43,7 +67,22 @@ def test_client(test_db):
         finally:
             db.close()
     
+    test_writer, test_reader = test_session_pools
+
+    async def override_get_write_db():
+        async with test_writer.session() as db:
+            yield db
+
+    async def override_get_read_db():
+        async with test_reader.session() as db:
+            yield db
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_write_db] = override_get_write_db
+    app.dependency_overrides[get_read_db] = override_get_read_db
+    app.dependency_overrides[get_read_pool] = lambda: test_reader
+    app.dependency_overrides[get_write_pool] = lambda: test_writer
+    app.dependency_overrides[get_event_broker] = lambda: test_event_broker
     
     with TestClient(app) as client:
         yield client
@@ -52,6 +91,22 @@ def test_client(test_db):
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def make_update():
+    """Factory for DiunUpdateData records; keyword arguments override the defaults."""
+    def make(hostname="server1", image_name="nginx", image_tag="latest", **fields):
+        return DiunUpdateData(**{
+            "hostname": hostname,
+            "status": "new",
+            "provider": "docker",
+            "image_name": image_name,
+            "image_tag": image_tag,
+            "digest": "sha256:abcd1234",
+            **fields,
+        })
+    return make
+
+
 @pytest.fixture
 def sample_diun_webhook():
     """Sample DIUN webhook payload for testing."""
@@ -0,0 +1,160 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from sqlalchemy import event, update
+
+from src.database import diun_updates_table, query_diun_updates, upsert_diun_update
+from src.models import UpdateParams
+
+
+@pytest.fixture
+def fleet_db(test_db):
+    """Insert 3 hosts x 4 images with distinct created_at values."""
+    TestSessionLocal, test_engine = test_db
+    db = TestSessionLocal()
+    base = datetime(2025, 1, 1, 12, 0, 0)
+    images = ["nginx", "postgres", "registry:5000/team/api", "redis"]
+    for h in range(3):
+        for i, image in enumerate(images):
+            stored = upsert_diun_update(db, UpdateParams(
+                hostname=f"server{h}",
+                status="new" if i % 2 == 0 else "update",
+                provider="docker" if h < 2 else "kubernetes",
+                image_name=image,
+                image_tag="latest",
+                digest=f"sha256:{h}{i}",
+            ))
+            db.execute(update(diun_updates_table).where(diun_updates_table.c.id == stored.id)
+                       .values(created_at=base + timedelta(minutes=h * 10 + i)))
+    db.commit()
+    yield db
+    db.close()
+
+
+class TestQueryDiunUpdates:
+    """Test filtering, sorting and pagination in query_diun_updates."""
+
+    def test_default_sort_newest_first(self, fleet_db):
+        """Test that rows default to created_at descending."""
+        rows, cursor = query_diun_updates(fleet_db, limit=100)
+
+        created = [row[-1] for row in rows]
+        assert len(rows) == 12
+        assert created == sorted(created, reverse=True)
+        assert cursor is None
+
+    @pytest.mark.parametrize("filters,expected", [
+        ({"hostname": "server1"}, 4),
+        ({"status": "new"}, 6),
+        ({"provider": "kubernetes"}, 4),
+        ({"image_name_prefix": "post"}, 3),
+        ({"image_name_prefix": "registry:5000/"}, 3),
+        ({"hostname": "server0", "status": "update"}, 2),
+        ({"created_after": datetime(2025, 1, 1, 12, 10)}, 8),
+        ({"created_before": datetime(2025, 1, 1, 12, 10)}, 4),
+        ({"hostname": "nope"}, 0),
+    ])
+    def test_filters(self, fleet_db, filters, expected):
+        """Test each server-side filter."""
+        rows, cursor = query_diun_updates(fleet_db, limit=100, **filters)
+
+        assert len(rows) == expected
+
+    @pytest.mark.parametrize("sort", ["created_at", "-created_at", "hostname", "-hostname", "image_name", "-image_name"])
+    def test_sorted_pagination_visits_every_row(self, fleet_db, sort):
+        """Test that paging through any sort order yields every row once, in order."""
+        seen = []
+        cursor = None
+        while True:
+            rows, cursor = query_diun_updates(fleet_db, sort=sort, cursor=cursor, limit=5)
+            seen.extend(rows)
+            if cursor is None:
+                break
+
+        assert len({row[0] for row in seen}) == 12
+        column = {"created_at": 9, "hostname": 1, "image_name": 4}[sort.lstrip("-")]
+        values = [row[column] for row in seen]
+        assert values == sorted(values, reverse=sort.startswith("-"))
+
+    @pytest.mark.parametrize("sort", ["created_at", "-created_at", "hostname", "-hostname", "image_name", "-image_name"])
+    def test_pages_walk_an_index(self, fleet_db, sort):
+        """Test that no sort, first page or later, scans or sorts the whole table."""
+        plans = []
+
+        @event.listens_for(fleet_db.get_bind(), "before_cursor_execute", retval=True)
+        def explain(conn, cursor, statement, parameters, context, executemany):
+            plans.extend(row[-1] for row in cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters))
+            return statement, parameters
+
+        rows, cursor = query_diun_updates(fleet_db, sort=sort, limit=5)
+        query_diun_updates(fleet_db, sort=sort, cursor=cursor, limit=5)
+        event.remove(fleet_db.get_bind(), "before_cursor_execute", explain)
+
+        assert plans
+        assert not [plan for plan in plans if "TEMP B-TREE" in plan or plan == "SCAN diun_updates"], plans
+
+    def test_invalid_sort(self, fleet_db):
+        """Test that sorting on an unindexed column is rejected."""
+        with pytest.raises(ValueError, match="Invalid sort"):
+            query_diun_updates(fleet_db, sort="digest")
+
+    def test_cursor_from_other_sort(self, fleet_db):
+        """Test that a cursor cannot be reused with a different sort."""
+        rows, cursor = query_diun_updates(fleet_db, sort="hostname", limit=2)
+
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            query_diun_updates(fleet_db, sort="-created_at", cursor=cursor)
+
+
+class TestApiUpdatesEndpoint:
+    """Test the GET /api/updates endpoint."""
+
+    def test_returns_items(self, test_client, fleet_db):
+        """Test the JSON shape of listed items."""
+        response = test_client.get("/api/updates", params={"hostname": "server2", "image_name_prefix": "nginx"})
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["next_cursor"] is None
+        assert body["items"] == [{
+            "id": body["items"][0]["id"],
+            "hostname": "server2",
+            "status": "new",
+            "provider": "kubernetes",
+            "image_name": "nginx",
+            "image_tag": "latest",
+            "digest": "sha256:20",
+            "hub_link": None,
+            "image_created_at": None,
+            "created_at": "2025-01-01T12:20:00",
+        }]
+
+    def test_filters_and_sort(self, test_client, fleet_db):
+        """Test combining filters with an explicit sort."""
+        response = test_client.get("/api/updates", params={"status": "new", "sort": "hostname"})
+
+        items = response.json()["items"]
+        assert [i["hostname"] for i in items] == sorted(i["hostname"] for i in items)
+        assert {i["status"] for i in items} == {"new"}
+
+    def test_created_range_accepts_timezones(self, test_client, fleet_db):
+        """Test that aware timestamps are compared in UTC."""
+        response = test_client.get("/api/updates", params={"created_after": "2025-01-01T13:10:00+01:00"})
+
+        assert len(response.json()["items"]) == 8
+
+    def test_pagination(self, test_client, fleet_db):
+        """Test following next_cursor through the API."""
+        first = test_client.get("/api/updates", params={"limit": 10, "sort": "image_name"}).json()
+        second = test_client.get("/api/updates", params={"limit": 10, "sort": "image_name", "cursor": first["next_cursor"]}).json()
+
+        assert len(first["items"]) == 10
+        assert len(second["items"]) == 2
+        assert second["next_cursor"] is None
+
+    def test_invalid_sort(self, test_client, fleet_db):
+        """Test that invalid sorts are client errors."""
+        response = test_client.get("/api/updates", params={"sort": "digest"})
+
+        assert response.status_code == 400
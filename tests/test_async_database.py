@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from src.database import (
+    DiunUpdate,
+    async_upsert_diun_update,
+    async_upsert_diun_updates,
+    async_delete_diun_update,
+    async_delete_all_diun_updates,
+    async_delete_all_diun_updates_batched,
+    async_get_all_diun_updates,
+)
+
+
+@pytest.fixture
+async def async_db(test_session_pools):
+    """Create a writer AsyncSession bound to the test database."""
+    test_writer, test_reader = test_session_pools
+    async with test_writer.session() as db:
+        yield db
+
+
+class TestAsyncDatabase:
+    """Test the async data layer functions."""
+
+    async def test_upsert_and_get(self, async_db, make_update):
+        """Test that async upserts are visible to async reads."""
+        result = await async_upsert_diun_update(async_db, make_update())
+
+        assert result.id is not None
+        assert result.image_tag == "latest"
+
+        updates = await async_get_all_diun_updates(async_db)
+        assert [u.id for u in updates] == [result.id]
+
+    async def test_upsert_replaces(self, async_db, make_update):
+        """Test that async upserts replace rows for the same hostname and image."""
+        first = await async_upsert_diun_update(async_db, make_update(image_tag="1.0"))
+        second = await async_upsert_diun_update(async_db, make_update(image_tag="2.0"))
+
+        assert second.id == first.id
+        assert second.image_tag == "2.0"
+        assert len(await async_get_all_diun_updates(async_db)) == 1
+
+    async def test_batch_upsert(self, async_db, make_update):
+        """Test the async batch upsert."""
+        count = await async_upsert_diun_updates(async_db, [make_update(hostname=f"server{i}") for i in range(3)])
+
+        assert count == 3
+        assert len(await async_get_all_diun_updates(async_db)) == 3
+
+    async def test_delete(self, async_db, make_update):
+        """Test deleting a single row asynchronously."""
+        result = await async_upsert_diun_update(async_db, make_update())
+
+        assert await async_delete_diun_update(async_db, result.id) is True
+        assert await async_delete_diun_update(async_db, result.id) is False
+        assert await async_get_all_diun_updates(async_db) == []
+
+    async def test_delete_all(self, async_db, test_db, make_update):
+        """Test deleting every row asynchronously."""
+        await async_upsert_diun_updates(async_db, [make_update(hostname=f"server{i}") for i in range(4)])
+
+        assert await async_delete_all_diun_updates(async_db) == 4
+
+        TestSessionLocal, test_engine = test_db
+        db = TestSessionLocal()
+        assert db.query(DiunUpdate).count() == 0
+        db.close()
+
+    async def test_batched_delete_all_lets_writers_in(self, test_session_pools, make_update):
+        """Test that a webhook queued during Fix All is written between batches."""
+        test_writer, test_reader = test_session_pools
+        async with test_writer.session() as db:
+            await async_upsert_diun_updates(db, [make_update(hostname=f"server{i}") for i in range(6)])
+
+        order = []
+
+        def progress(deleted):
+            order.append(("batch", deleted))
+
+        async def webhook():
+            async with test_writer.session() as db:
+                await async_upsert_diun_update(db, make_update(hostname="late"))
+            order.append(("webhook", None))
+
+        fix_all = asyncio.create_task(async_delete_all_diun_updates_batched(test_writer, 2, progress))
+        await asyncio.sleep(0)
+        late = asyncio.create_task(webhook())
+        deleted = await fix_all
+        await late
+
+        assert deleted == 6
+        assert order.index(("webhook", None)) < order.index(("batch", 6))
+        async with test_reader.session() as db:
+            assert [u.hostname for u in await async_get_all_diun_updates(db)] == ["late"]
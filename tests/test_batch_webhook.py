@@ -0,0 +1,185 @@
+import json
+
+from src.database import DiunUpdate, upsert_diun_updates
+from src.models import DiunUpdateData
+
+
+def make_webhook(hostname="server1", image="nginx:alpine", digest="sha256:abc123"):
+    return {
+        "hostname": hostname,
+        "status": "new",
+        "provider": "docker",
+        "image": image,
+        "digest": digest,
+        "created": "2025-01-01T10:00:00Z",
+    }
+
+
+class TestUpsertDiunUpdates:
+    """Test the upsert_diun_updates batch database function."""
+
+    def test_inserts_all_rows(self, test_db):
+        """Test that every distinct payload becomes a row."""
+        TestSessionLocal, test_engine = test_db
+        db = TestSessionLocal()
+
+        updates = [
+            DiunUpdateData(
+                hostname=f"server{i}",
+                status="new",
+                provider="docker",
+                image_name="nginx",
+                image_tag="alpine",
+                digest=f"sha256:{i}",
+            )
+            for i in range(250)
+        ]
+
+        assert upsert_diun_updates(db, updates) == 250
+        assert db.query(DiunUpdate).count() == 250
+
+        db.close()
+
+    def test_duplicate_keys_last_wins(self, test_db):
+        """Test that repeated hostname/image pairs in one batch collapse to the last payload."""
+        TestSessionLocal, test_engine = test_db
+        db = TestSessionLocal()
+
+        updates = [
+            DiunUpdateData(hostname="server1", status="new", provider="docker",
+                           image_name="nginx", image_tag="1.0", digest="sha256:first"),
+            DiunUpdateData(hostname="server1", status="new", provider="docker",
+                           image_name="nginx", image_tag="2.0", digest="sha256:second"),
+        ]
+
+        assert upsert_diun_updates(db, updates) == 1
+        records = db.query(DiunUpdate).all()
+        assert len(records) == 1
+        assert records[0].image_tag == "2.0"
+        assert records[0].digest == "sha256:second"
+
+        db.close()
+
+    def test_replaces_existing_rows(self, test_db):
+        """Test that batch upserts replace rows already in the table."""
+        TestSessionLocal, test_engine = test_db
+        db = TestSessionLocal()
+
+        old = DiunUpdateData(hostname="server1", status="new", provider="docker",
+                             image_name="nginx", image_tag="1.0", digest="sha256:old")
+        new = DiunUpdateData(hostname="server1", status="new", provider="docker",
+                             image_name="nginx", image_tag="2.0", digest="sha256:new")
+        upsert_diun_updates(db, [old])
+        upsert_diun_updates(db, [new])
+
+        records = db.query(DiunUpdate).all()
+        assert len(records) == 1
+        assert records[0].digest == "sha256:new"
+
+        db.close()
+
+    def test_empty_batch(self, test_db):
+        """Test that an empty batch is a no-op."""
+        TestSessionLocal, test_engine = test_db
+        db = TestSessionLocal()
+
+        assert upsert_diun_updates(db, []) == 0
+        assert db.query(DiunUpdate).count() == 0
+
+        db.close()
+
+
+class TestBatchWebhookEndpoint:
+    """Test the /webhook/batch endpoint."""
+
+    def test_json_array(self, test_client, test_db, set_webhook_token):
+        """Test that a JSON array of payloads is stored."""
+        TestSessionLocal, test_engine = test_db
+        db = TestSessionLocal()
+
+        payloads = [make_webhook(hostname=f"server{i}") for i in range(3)]
+        response = test_client.post(
+            "/webhook/batch",
+            json=payloads,
+            headers={"Authorization": "test-webhook-token"}
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["accepted"] == 3
+        assert body["rejected"] == 0
+        assert [r["status"] for r in body["results"]] == ["accepted"] * 3
+        assert db.query(DiunUpdate).count() == 3
+
+        db.close()
+
+    def test_ndjson(self, test_client, test_db, set_webhook_token):
+        """Test that NDJSON bodies are accepted line by line."""
+        TestSessionLocal, test_engine = test_db
+        db = TestSessionLocal()
+
+        body = "\n".join(json.dumps(make_webhook(hostname=f"server{i}")) for i in range(2)) + "\n"
+        response = test_client.post(
+            "/webhook/batch",
+            content=body,
+            headers={"Authorization": "test-webhook-token", "Content-Type": "application/x-ndjson"}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["accepted"] == 2
+        assert db.query(DiunUpdate).count() == 2
+
+        db.close()
+
+    def test_reports_rejected_items(self, test_client, test_db, set_webhook_token):
+        """Test that invalid items are rejected individually while valid ones are stored."""
+        TestSessionLocal, test_engine = test_db
+        db = TestSessionLocal()
+
+        payloads = [make_webhook(), {"hostname": "broken"}, "not-an-object"]
+        response = test_client.post(
+            "/webhook/batch",
+            json=payloads,
+            headers={"Authorization": "test-webhook-token"}
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["accepted"] == 1
+        assert body["rejected"] == 2
+        assert body["results"][0] == {"index": 0, "status": "accepted"}
+        assert body["results"][1]["status"] == "rejected"
+        assert body["results"][2]["status"] == "rejected"
+        assert db.query(DiunUpdate).count() == 1
+
+        db.close()
+
+    def test_ndjson_invalid_line(self, test_client, set_webhook_token):
+        """Test that a malformed NDJSON line is rejected without failing the batch."""
+        body = json.dumps(make_webhook()) + "\n{not json\n"
+        response = test_client.post(
+            "/webhook/batch",
+            content=body,
+            headers={"Authorization": "test-webhook-token", "Content-Type": "application/x-ndjson"}
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["accepted"] == 1
+        assert body["results"][1]["status"] == "rejected"
+
+    def test_non_array_body(self, test_client, set_webhook_token):
+        """Test that a JSON body that is not an array is rejected."""
+        response = test_client.post(
+            "/webhook/batch",
+            json=make_webhook(),
+            headers={"Authorization": "test-webhook-token"}
+        )
+
+        assert response.status_code == 400
+
+    def test_unauthorized(self, test_client, set_webhook_token):
+        """Test that the batch endpoint requires the webhook token."""
+        response = test_client.post("/webhook/batch", json=[make_webhook()])
+
+        assert response.status_code == 401
@@ -0,0 +1,169 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, select, update
+
+from src.database import (
+    DiunUpdate, count_diun_updates, delete_diun_update, delete_diun_updates, diun_updates_table, upsert_diun_update,
+)
+from src.models import DiunUpdateData
+
+FLEET = [
+    ("web-1", "nginx", "new"),
+    ("web-1", "redis", "update"),
+    ("web-2", "nginx", "new"),
+    ("db-1", "postgres", "update"),
+]
+
+
+@pytest.fixture
+def fleet(test_db):
+    """Four records across three hosts; returns a session and name -> id."""
+    TestSessionLocal, test_engine = test_db
+    db = TestSessionLocal()
+    ids = {}
+    for hostname, image_name, status in FLEET:
+        update = upsert_diun_update(db, DiunUpdateData(
+            hostname=hostname, status=status, provider="docker",
+            image_name=image_name, image_tag="latest", digest="sha256:abcd",
+        ))
+        ids[f"{hostname}/{image_name}"] = update.id
+    yield db, ids
+    db.close()
+
+
+def remaining(db) -> set[str]:
+    return {f"{u.hostname}/{u.image_name}" for u in db.scalars(select(DiunUpdate))}
+
+
+class TestBulkDeleteFunctions:
+    """Test delete_diun_updates and count_diun_updates."""
+
+    def test_delete_by_ids(self, fleet):
+        """Test deleting an explicit id list, ignoring ids that do not exist."""
+        db, ids = fleet
+
+        deleted = delete_diun_updates(db, ids=[ids["web-1/nginx"], ids["db-1/postgres"], 999])
+
+        assert sorted(deleted) == sorted([ids["web-1/nginx"], ids["db-1/postgres"]])
+        assert remaining(db) == {"web-1/redis", "web-2/nginx"}
+
+    def test_delete_by_hostname(self, fleet):
+        """Test fixing every image on one server."""
+        db, ids = fleet
+
+        assert len(delete_diun_updates(db, hostname="web-1")) == 2
+        assert remaining(db) == {"web-2/nginx", "db-1/postgres"}
+
+    def test_delete_by_image_across_fleet(self, fleet):
+        """Test fixing one image on every server."""
+        db, ids = fleet
+
+        assert len(delete_diun_updates(db, image_name="nginx")) == 2
+        assert remaining(db) == {"web-1/redis", "db-1/postgres"}
+
+    def test_criteria_combine(self, fleet):
+        """Test that all given criteria must match."""
+        db, ids = fleet
+
+        assert delete_diun_updates(db, hostname="web-1", status="update") == [ids["web-1/redis"]]
+
+    def test_older_than(self, fleet):
+        """Test selecting records received before a point in time."""
+        db, ids = fleet
+        db.execute(update(diun_updates_table).where(diun_updates_table.c.id == ids["db-1/postgres"]).values(created_at=datetime(2020, 1, 1)))
+        db.commit()
+
+        assert count_diun_updates(db, older_than=datetime(2021, 1, 1)) == 1
+        assert count_diun_updates(db, older_than=datetime.now() + timedelta(days=1)) == 4
+
+    def test_requires_criteria(self, fleet):
+        """Test that an empty selection never deletes everything."""
+        db, ids = fleet
+
+        with pytest.raises(ValueError):
+            delete_diun_updates(db)
+        assert len(remaining(db)) == 4
+
+    def test_single_statement(self, test_db, fleet):
+        """Test that single and bulk deletes are one DELETE ... RETURNING each, plus the archive insert and version bump."""
+        TestSessionLocal, test_engine = test_db
+        db, ids = fleet
+        statements = []
+        event.listen(test_engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+
+        assert delete_diun_update(db, ids["web-2/nginx"])
+        assert not delete_diun_update(db, ids["web-2/nginx"])
+        delete_diun_updates(db, hostname="web-1")
+
+        deletes = [s for s in statements if s.startswith("DELETE")]
+        versions = [s for s in statements if s.startswith("UPDATE diun_meta")]
+        assert len(deletes) == 3
+        assert all("RETURNING" in s for s in deletes)
+        # Nothing is archived, and the version is left alone, when nothing was deleted
+        assert len(versions) == 2
+        assert [s.split(" (")[0] for s in statements if s not in deletes + versions] == ["INSERT INTO diun_update_history"] * 2
+
+    @pytest.mark.parametrize("criteria", [
+        {"hostname": "web-1"},
+        {"image_name": "nginx"},
+        {"status": "new"},
+        {"older_than": datetime(2030, 1, 1)},
+    ])
+    def test_count_is_index_only(self, fleet, criteria):
+        """Test that dry-run counts are answered from a covering index."""
+        db, ids = fleet
+        plans = []
+
+        @event.listens_for(db.get_bind(), "before_cursor_execute", retval=True)
+        def explain(conn, cursor, statement, parameters, context, executemany):
+            plans.extend(row[-1] for row in cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters))
+            return statement, parameters
+
+        count_diun_updates(db, **criteria)
+        event.remove(db.get_bind(), "before_cursor_execute", explain)
+
+        assert any("COVERING INDEX" in plan for plan in plans), plans
+
+
+class TestBulkDeleteEndpoint:
+    """Test POST /updates/bulk-delete."""
+
+    def add(self, test_client, webhook_token, hostname, image):
+        response = test_client.post("/webhook", headers={"Authorization": webhook_token}, json={
+            "hostname": hostname, "status": "new", "provider": "docker",
+            "image": image, "digest": "sha256:abcd", "created": "2025-01-01T00:00:00Z",
+        })
+        assert response.status_code == 200
+
+    def test_dry_run_then_delete(self, test_client, set_webhook_token):
+        """Test previewing and then applying a hostname-wide fix."""
+        for hostname, image in [("web-1", "nginx:1"), ("web-1", "redis:7"), ("web-2", "nginx:1")]:
+            self.add(test_client, set_webhook_token, hostname, image)
+
+        preview = test_client.post("/updates/bulk-delete", json={"hostname": "web-1", "dry_run": True})
+        assert preview.status_code == 200
+        assert preview.json() == {"dry_run": True, "matched": 2}
+
+        response = test_client.post("/updates/bulk-delete", json={"hostname": "web-1"})
+        assert response.status_code == 200
+        assert response.json()["deleted"] == 2
+        assert len(response.json()["ids"]) == 2
+
+        listing = test_client.get("/api/updates").json()["items"]
+        assert [item["hostname"] for item in listing] == ["web-2"]
+
+    def test_by_ids(self, test_client, set_webhook_token):
+        """Test fixing an explicit list of entries."""
+        self.add(test_client, set_webhook_token, "web-1", "nginx:1")
+        ids = [item["id"] for item in test_client.get("/api/updates").json()["items"]]
+
+        response = test_client.post("/updates/bulk-delete", json={"ids": ids})
+
+        assert response.json() == {"deleted": 1, "ids": ids}
+
+    def test_empty_selection_rejected(self, test_client):
+        """Test that a selection without criteria is a validation error."""
+        assert test_client.post("/updates/bulk-delete", json={}).status_code == 422
+        assert test_client.post("/updates/bulk-delete", json={"dry_run": True}).status_code == 422
@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta, UTC
+from email.utils import format_datetime
+
+import pytest
+from sqlalchemy import event, text
+
+from src.database import (
+    get_data_version, upsert_diun_update, upsert_diun_updates,
+    delete_diun_update, delete_all_diun_updates,
+)
+
+
+class TestDataVersion:
+    """Test that every change to diun_updates bumps the data version."""
+
+    def test_mutations_bump_version(self, test_db, make_update):
+        """Test upserts and deletes each advance the counter."""
+        TestSessionLocal, test_engine = test_db
+        db = TestSessionLocal()
+        versions = [get_data_version(db)[0]]
+
+        update = upsert_diun_update(db, make_update())
+        versions.append(get_data_version(db)[0])
+        upsert_diun_update(db, make_update(image_tag="1.27"))
+        versions.append(get_data_version(db)[0])
+        upsert_diun_updates(db, [make_update(hostname="server2")])
+        versions.append(get_data_version(db)[0])
+        delete_diun_update(db, update.id)
+        versions.append(get_data_version(db)[0])
+        delete_all_diun_updates(db)
+        versions.append(get_data_version(db)[0])
+
+        assert versions == sorted(set(versions))
+        assert get_data_version(db)[1] is not None
+
+        db.close()
+
+    def test_version_counts_rows(self, test_db, make_update):
+        """Test that a write adds the number of rows it changed, in one bump."""
+        TestSessionLocal, test_engine = test_db
+        db = TestSessionLocal()
+        before = get_data_version(db)[0]
+
+        upsert_diun_updates(db, [make_update(hostname=f"server{i}") for i in range(3)])
+        assert get_data_version(db)[0] == before + 3
+        delete_all_diun_updates(db)
+        assert get_data_version(db)[0] == before + 6
+
+        db.close()
+
+    def test_missing_delete_keeps_version(self, test_db):
+        """Test that deleting a nonexistent row does not change the version."""
+        TestSessionLocal, test_engine = test_db
+        db = TestSessionLocal()
+        before = get_data_version(db)[0]
+
+        delete_diun_update(db, 999)
+
+        assert get_data_version(db)[0] == before
+        db.close()
+
+    def test_reading_version_skips_updates_table(self, test_db):
+        """Test that reading the version does not query diun_updates."""
+        TestSessionLocal, test_engine = test_db
+        db = TestSessionLocal()
+        statements = []
+        event.listen(test_engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+
+        get_data_version(db)
+
+        assert statements and not any("diun_updates" in statement for statement in statements)
+        db.close()
+
+
+@pytest.mark.parametrize("path", ["/", "/api/updates"])
+class TestConditionalResponses:
+    """Test ETag and Last-Modified handling on listings."""
+
+    def test_etag_round_trip(self, test_client, set_webhook_token, sample_diun_webhook, path):
+        """Test that a matching If-None-Match answers 304 until the data changes."""
+        first = test_client.get(path)
+        etag = first.headers["etag"]
+        assert first.status_code == 200
+        assert "last-modified" in first.headers
+
+        cached = test_client.get(path, headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert cached.headers["etag"] == etag
+
+        test_client.post("/webhook", json=sample_diun_webhook, headers={"Authorization": "test-webhook-token"})
+
+        fresh = test_client.get(path, headers={"If-None-Match": etag})
+        assert fresh.status_code == 200
+        assert fresh.headers["etag"] != etag
+
+    def test_weak_and_wildcard_etags(self, test_client, path):
+        """Test that weak validators and * match."""
+        etag = test_client.get(path).headers["etag"]
+
+        assert test_client.get(path, headers={"If-None-Match": f'"nope", W/{etag}'}).status_code == 304
+        assert test_client.get(path, headers={"If-None-Match": "*"}).status_code == 304
+
+    def test_if_modified_since(self, test_client, test_db, path):
+        """Test If-Modified-Since against the last change time."""
+        TestSessionLocal, test_engine = test_db
+        db = TestSessionLocal()
+        db.execute(text("UPDATE diun_meta SET updated_at = :then WHERE id = 1"),
+                   {"then": datetime.now(UTC).replace(tzinfo=None) - timedelta(minutes=1)})
+        db.commit()
+        db.close()
+        future = format_datetime(datetime.now(UTC) + timedelta(hours=1), usegmt=True)
+        past = format_datetime(datetime.now(UTC) - timedelta(days=1), usegmt=True)
+
+        assert test_client.get(path, headers={"If-Modified-Since": future}).status_code == 304
+        assert test_client.get(path, headers={"If-Modified-Since": past}).status_code == 200
+        assert test_client.get(path, headers={"If-Modified-Since": "garbage"}).status_code == 200
+
+    def test_etag_overrides_if_modified_since(self, test_client, path):
+        """Test that a stale If-None-Match is not rescued by a matching If-Modified-Since."""
+        future = format_datetime(datetime.now(UTC) + timedelta(hours=1), usegmt=True)
+
+        response = test_client.get(path, headers={"If-None-Match": '"stale"', "If-Modified-Since": future})
+
+        assert response.status_code == 200
+
+    def test_if_modified_since_after_recent_write(self, test_client, test_db, path, make_update):
+        """Test that If-Modified-Since is ignored while the newest write is under a second old."""
+        TestSessionLocal, test_engine = test_db
+        db = TestSessionLocal()
+        upsert_diun_update(db, make_update())
+        db.execute(text("UPDATE diun_meta SET updated_at = :now WHERE id = 1"),
+                   {"now": datetime.now(UTC).replace(tzinfo=None)})
+        db.commit()
+        db.close()
+        future = format_datetime(datetime.now(UTC) + timedelta(hours=1), usegmt=True)
+
+        assert test_client.get(path, headers={"If-Modified-Since": future}).status_code == 200
@@ -1,7 +1,9 @@
 import pytest
 from fastapi.testclient import TestClient
 
-from src.database import DiunUpdate
+from src import main
+from src.database import DiunUpdate, upsert_diun_update
+from src.models import DiunUpdateData
 
 
 class TestDashboardEndpoints:
@@ -252,4 +254,101 @@ class TestDashboardEndpoints:
         response = test_client.delete("/updates/invalid-id")
         
         # FastAPI should return 422 for invalid path parameter type
-        assert response.status_code == 422
\ No newline at end of file
+        assert response.status_code == 422
+
+class TestStreamingDashboard:
+    """Test the dashboard in DIUN_DASHBOARD_MODE=stream."""
+
+    @pytest.fixture(autouse=True)
+    def stream_mode(self, monkeypatch):
+        monkeypatch.setattr("src.main.DIUN_DASHBOARD_MODE", "stream")
+
+    def test_streams_every_row_without_pagination(self, test_client, test_db, monkeypatch):
+        """Test that all rows are rendered newest first in a single response."""
+        TestSessionLocal, test_engine = test_db
+        monkeypatch.setattr("src.main.DIUN_PAGE_SIZE", 2)
+        for i in range(5):
+            upsert_diun_update(TestSessionLocal(), DiunUpdateData(
+                hostname=f"stream-host-{i}", status="new", provider="docker",
+                image_name="nginx", image_tag="latest", digest="sha256:abcdef0123456789",
+            ))
+
+        response = test_client.get("/")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/html")
+        assert "ETag" in response.headers
+        content = response.text
+        positions = [content.index(f"stream-host-{i}") for i in reversed(range(5))]
+        assert positions == sorted(positions)
+        assert "abcdef012345" in content
+        assert 'id="fix-all-btn" class="fix-all-button">' in content
+        assert "Next page" not in content
+        assert content.rstrip().endswith("</html>")
+
+    def test_empty_table(self, test_client):
+        """Test that an empty table streams a page with the Fix All button hidden."""
+        response = test_client.get("/")
+
+        assert response.status_code == 200
+        assert "</tbody>" in response.text
+        assert 'id="fix-all-btn" class="fix-all-button" hidden' in response.text
+
+    def test_reader_released_before_streaming(self, test_client, test_session_pools, monkeypatch):
+        """Test that the reader session has ended by the time the page is rendered."""
+        test_writer, test_reader = test_session_pools
+        sessions, open_while_rendering = [], []
+        session_factory = test_reader.session_factory
+        render = main.render_dashboard_stream
+
+        def tracked_session():
+            sessions.append(session_factory())
+            return sessions[-1]
+
+        async def tracked_render(*args):
+            open_while_rendering.extend(session.in_transaction() for session in sessions)
+            async for chunk in render(*args):
+                yield chunk
+
+        monkeypatch.setattr(test_reader, "session_factory", tracked_session)
+        monkeypatch.setattr(main, "render_dashboard_stream", tracked_render)
+
+        assert test_client.get("/").status_code == 200
+        assert open_while_rendering == [False]
+
+    def test_escapes_values(self, test_client, test_db):
+        """Test that the streaming environment autoescapes like the paged one."""
+        TestSessionLocal, test_engine = test_db
+        upsert_diun_update(TestSessionLocal(), DiunUpdateData(
+            hostname="<script>alert(1)</script>", status="new", provider="docker",
+            image_name="nginx", image_tag="latest", digest="sha256:abcd",
+        ))
+
+        response = test_client.get("/")
+
+        assert "<script>alert(1)</script>" not in response.text
+        assert "&lt;script&gt;" in response.text
+
+
+class TestFixAll:
+    """Test DELETE /updates and its progress report."""
+
+    def test_reports_progress(self, test_client, test_db, monkeypatch):
+        """Test that Fix All deletes in batches and records how far it got."""
+        TestSessionLocal, test_engine = test_db
+        monkeypatch.setattr("src.main.DIUN_DELETE_BATCH_SIZE", 2)
+        db = TestSessionLocal()
+        for i in range(5):
+            upsert_diun_update(db, DiunUpdateData(
+                hostname=f"host-{i}", status="new", provider="docker",
+                image_name="nginx", image_tag="latest", digest="sha256:abcd",
+            ))
+        db.close()
+
+        assert test_client.get("/debug/fix-all").json() == {"running": False}
+        response = test_client.delete("/updates")
+
+        assert response.json() == {"message": "All updates fixed (5 entries removed)"}
+        progress = test_client.get("/debug/fix-all").json()
+        assert progress["running"] is False
+        assert progress["deleted"] == 5
@@ -1,8 +1,9 @@
 import pytest
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import event, text
 from sqlalchemy.orm import Session
 
-from src.database import upsert_diun_update, delete_diun_update, delete_all_diun_updates, DiunUpdate
+from src.database import upsert_diun_update, upsert_diun_updates, delete_diun_update, delete_all_diun_updates, DiunUpdate, Host, Image, _intern_cache
 from src.models import DiunUpdateData
 
 
@@ -234,6 +235,134 @@ class TestUpsertDiunUpdate:
         
         db.close()
 
+    def test_upsert_is_single_statement(self, test_db):
+        """Test that an upsert of a known host and image is one statement that reads the row back via RETURNING, plus the version bump."""
+        TestSessionLocal, test_engine = test_db
+        db = TestSessionLocal()
+        statements = []
+        event.listen(test_engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+
+        update_data = DiunUpdateData(
+            hostname="server1",
+            status="new",
+            provider="docker",
+            image_name="nginx",
+            image_tag="alpine",
+            digest="sha256:abcd1234"
+        )
+        first = upsert_diun_update(db, update_data)
+        # The first sight of a host and an image adds their rows
+        assert [statement.split(" SET")[0].split(" (")[0] for statement in statements] == [
+            "INSERT INTO hosts", "INSERT INTO images", "INSERT INTO diun_updates", "UPDATE diun_meta",
+        ]
+        statements.clear()
+        second = upsert_diun_update(db, update_data.model_copy(update={"image_tag": "latest"}))
+
+        # One statement on diun_updates, then the version bump that replaced its triggers
+        assert len(statements) == 2
+        assert statements[0].startswith("INSERT INTO diun_updates") and "RETURNING" in statements[0]
+        assert statements[1].startswith("UPDATE diun_meta")
+        assert second.id == first.id
+        assert second.image_tag == "latest"
+
+        db.close()
+
+
+class TestInternCache:
+    """Test how upserts resolve hosts and images to ids."""
+
+    @staticmethod
+    def make_update(hostname, image_name="nginx", hub_link=None):
+        return DiunUpdateData(hostname=hostname, status="new", provider="docker", image_name=image_name,
+                              image_tag="latest", digest="sha256:abcd1234", hub_link=hub_link)
+
+    def test_hosts_and_images_stored_once(self, test_db):
+        """Test that rows sharing a host or image reference one hosts or images row."""
+        TestSessionLocal, test_engine = test_db
+        db = TestSessionLocal()
+
+        upsert_diun_updates(db, [self.make_update(f"server{i}", image) for i in range(3) for image in ("nginx", "redis")])
+        upsert_diun_update(db, self.make_update("server0", "postgres"))
+
+        assert db.query(Host).count() == 3
+        assert db.query(Image).count() == 3
+        assert {(u.hostname, u.image_name) for u in db.query(DiunUpdate)} == {
+            *((f"server{i}", image) for i in range(3) for image in ("nginx", "redis")), ("server0", "postgres"),
+        }
+        db.close()
+
+    def test_hub_link_is_per_image(self, test_db):
+        """Test that the newest link reported for an image shows on every host, and a missing one keeps it."""
+        TestSessionLocal, test_engine = test_db
+        db = TestSessionLocal()
+
+        upsert_diun_update(db, self.make_update("server1", hub_link="https://old"))
+        assert upsert_diun_update(db, self.make_update("server2")).hub_link == "https://old"
+        upsert_diun_update(db, self.make_update("server3", hub_link="https://new"))
+
+        assert {u.hub_link for u in db.query(DiunUpdate)} == {"https://new"}
+        db.close()
+
+    def test_ids_from_other_processes(self, test_db):
+        """Test that a host and image added through another cache resolve to the same ids."""
+        TestSessionLocal, test_engine = test_db
+        first, second = TestSessionLocal(), TestSessionLocal()
+
+        upsert_diun_update(first, self.make_update("server1"))
+        upsert_diun_update(second, self.make_update("server1", "redis"))
+        upsert_diun_update(second, self.make_update("server1"))
+
+        assert first.query(Host).count() == 1
+        assert first.query(DiunUpdate).count() == 2
+        assert _intern_cache(second).stats() == {"hosts": 1, "images": 2, "hits": 1, "misses": 3}
+        first.close()
+        second.close()
+
+
+class TestCompactColumns:
+    """Test the binary digest and integer timestamp columns."""
+
+    SHA256 = "sha256:216e3ae7de4ca8b553eb11ef7abda00651e79e537e85c46108284e5e91673e01"
+
+    def test_stored_compactly(self, test_db):
+        """Test that digests are stored as 33-byte BLOBs and timestamps as epoch microseconds."""
+        TestSessionLocal, test_engine = test_db
+        db = TestSessionLocal()
+
+        upsert_diun_update(db, DiunUpdateData(
+            hostname="server1", status="new", provider="docker", image_name="nginx", image_tag="latest",
+            digest=self.SHA256, image_created_at=datetime(2026, 1, 2, 3, 4, 5, 678901),
+        ))
+        row = db.execute(text(
+            "SELECT typeof(digest), length(digest), image_created_at, typeof(created_at) FROM diun_updates"
+        )).one()
+
+        assert tuple(row) == ("blob", 33, 1767323045678901, "integer")
+        db.close()
+
+    def test_python_values_unchanged(self, test_db):
+        """Test that reads give back the digest string and naive UTC datetimes, including aware input."""
+        TestSessionLocal, test_engine = test_db
+        db = TestSessionLocal()
+        created = datetime(2026, 1, 2, 4, 4, 5, 678901, tzinfo=timezone(timedelta(hours=1)))
+
+        stored = upsert_diun_update(db, DiunUpdateData(
+            hostname="server1", status="new", provider="docker", image_name="nginx", image_tag="latest",
+            digest=self.SHA256, image_created_at=created,
+        ))
+        upsert_diun_update(db, DiunUpdateData(
+            hostname="server2", status="new", provider="docker", image_name="nginx", image_tag="latest",
+            digest="sha256:abcd1234",
+        ))
+        loaded = db.query(DiunUpdate).order_by(DiunUpdate.id).all()
+
+        assert stored.image_created_at == loaded[0].image_created_at == datetime(2026, 1, 2, 3, 4, 5, 678901)
+        assert stored.created_at == loaded[0].created_at
+        assert loaded[0].created_at.tzinfo is None
+        assert [u.digest for u in loaded] == [self.SHA256, "sha256:abcd1234"]
+        db.close()
+
 
 class TestDeleteDiunUpdate:
     """Test the delete_diun_update database function."""
@@ -429,4 +558,26 @@ class TestDeleteAllDiunUpdates:
         final_count = db.query(DiunUpdate).count()
         assert final_count == 0
         
-        db.close()
\ No newline at end of file
+        db.close()
+
+    def test_delete_all_in_batches(self, test_db):
+        """Test that rows are removed in bounded rowid-range batches without a COUNT scan."""
+        TestSessionLocal, test_engine = test_db
+        db = TestSessionLocal()
+        upsert_diun_updates(db, [
+            DiunUpdateData(hostname=f"server{i}", status="new", provider="docker",
+                           image_name="nginx", image_tag="alpine", digest="sha256:test")
+            for i in range(5)
+        ])
+        statements = []
+        event.listen(test_engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+
+        assert delete_all_diun_updates(db, batch_size=2) == 5
+
+        deletes = [statement for statement in statements if statement.startswith("DELETE")]
+        assert len(deletes) == 3
+        assert not any("count(" in statement.lower() for statement in statements)
+        assert db.query(DiunUpdate).count() == 0
+
+        db.close()
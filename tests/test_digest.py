@@ -0,0 +1,61 @@
+import pytest
+from hypothesis import given, strategies as st
+
+from src.digest import decode_digest, encode_digest, short_digest
+
+SHA256 = "sha256:216e3ae7de4ca8b553eb11ef7abda00651e79e537e85c46108284e5e91673e01"
+
+# (digest, encoded size)
+CORPUS = [
+    (SHA256, 33),
+    ("sha384:" + "ab" * 48, 49),
+    ("sha512:" + "0f" * 64, 65),
+    # Not a well-formed digest of a known algorithm: kept as text
+    ("sha256:abcd1234", 16),
+    ("sha256:" + "AB" * 32, 72),
+    ("sha256:" + "g" * 64, 72),
+    ("md5:" + "ab" * 16, 37),
+    ("no-algorithm", 13),
+    ("", 1),
+]
+
+
+class TestDigestEncoding:
+    """Test the binary digest encoding."""
+
+    @pytest.mark.parametrize("digest, size", CORPUS)
+    def test_corpus(self, digest, size):
+        """Test that known digests are packed, anything else is kept, and both round-trip."""
+        encoded = encode_digest(digest)
+
+        assert len(encoded) == size
+        assert decode_digest(encoded) == digest
+
+    @given(st.text())
+    def test_any_string_round_trips(self, digest):
+        """Test that arbitrary strings survive encoding unchanged."""
+        assert decode_digest(encode_digest(digest)) == digest
+
+    @given(st.sampled_from(["sha256", "sha384", "sha512"]), st.data())
+    def test_generated_digests_are_packed(self, algorithm, data):
+        """Test that every well-formed digest takes one byte more than its hash."""
+        size = {"sha256": 32, "sha384": 48, "sha512": 64}[algorithm]
+        digest = f"{algorithm}:{data.draw(st.binary(min_size=size, max_size=size)).hex()}"
+
+        assert encode_digest(digest) == bytes([encode_digest(digest)[0]]) + bytes.fromhex(digest.split(":")[1])
+        assert decode_digest(encode_digest(digest)) == digest
+
+
+class TestShortDigest:
+    """Test the dashboard's short digest."""
+
+    @pytest.mark.parametrize("digest, expected", [
+        (SHA256, "216e3ae7de4c"),
+        ("sha256:abcd", "abcd"),
+        ("no-algorithm", ""),
+        ("", ""),
+        (None, ""),
+    ])
+    def test_short_digest(self, digest, expected):
+        """Test that the hash is cut to twelve digits, and values without an algorithm show nothing."""
+        assert short_digest(digest) == expected
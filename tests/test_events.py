@@ -0,0 +1,216 @@
+import asyncio
+import json
+
+from src.database import (
+    async_upsert_diun_update, async_upsert_diun_updates, async_delete_diun_update,
+    async_delete_all_diun_updates, get_data_version, upsert_diun_updates,
+)
+from src.events import EventBroker
+
+
+def parse(chunk: bytes) -> dict:
+    fields = dict(line.split(": ", 1) for line in chunk.decode().strip().splitlines())
+    fields["data"] = json.loads(fields["data"])
+    return fields
+
+
+async def next_event(stream) -> dict:
+    """Next real event from a broker stream, skipping retry and keep-alive lines."""
+    while True:
+        chunk = await asyncio.wait_for(anext(stream), timeout=1)
+        if chunk.startswith(b"id: "):
+            return parse(chunk)
+
+
+class TestEventBroker:
+    """Test event buffering, delivery and resumption."""
+
+    async def test_delivers_published_events(self):
+        """Test that a connected client receives events published after it subscribed."""
+        broker = EventBroker()
+        stream = broker.stream()
+        assert await anext(stream) == b"retry: 3000\n\n"
+
+        broker.publish("delete", {"id": 7})
+
+        event = await next_event(stream)
+        assert event["event"] == "delete"
+        assert event["data"] == {"id": 7}
+        assert event["id"] == broker.last_event_id
+        await stream.aclose()
+
+    async def test_resumes_from_last_event_id(self):
+        """Test that reconnecting with Last-Event-ID replays only the missed events."""
+        broker = EventBroker()
+        broker.publish("delete", {"id": 1})
+        seen = broker.last_event_id
+        broker.publish("delete", {"id": 2})
+        broker.publish("delete", {"id": 3})
+
+        stream = broker.stream(seen)
+        events = [await next_event(stream), await next_event(stream)]
+
+        assert [event["data"]["id"] for event in events] == [2, 3]
+        await stream.aclose()
+
+    async def test_resets_when_events_were_dropped(self):
+        """Test that a client behind the ring buffer is told to reload."""
+        broker = EventBroker(buffer_size=2)
+        broker.publish("delete", {"id": 1})
+        seen = broker.last_event_id
+        for update_id in range(2, 6):
+            broker.publish("delete", {"id": update_id})
+
+        stream = broker.stream(seen)
+
+        assert (await next_event(stream))["event"] == "reset"
+        assert broker.stats()["resets"] == 1
+        await stream.aclose()
+
+    async def test_resets_on_id_from_another_process(self):
+        """Test that an id from a previous broker forces a reload."""
+        stream = EventBroker().stream("0-5")
+
+        assert (await next_event(stream))["event"] == "reset"
+        await stream.aclose()
+
+    async def test_keepalive_on_idle_stream(self):
+        """Test that idle streams send comment lines."""
+        broker = EventBroker(keepalive=0.01)
+        stream = broker.stream()
+        await anext(stream)
+
+        assert await asyncio.wait_for(anext(stream), timeout=1) == b": keepalive\n\n"
+        await stream.aclose()
+
+    async def test_many_idle_clients(self):
+        """Test that one publish reaches hundreds of waiting clients."""
+        broker = EventBroker(keepalive=60)
+        streams = [broker.stream() for _ in range(300)]
+        for stream in streams:
+            await anext(stream)
+        waiting = [asyncio.create_task(next_event(stream)) for stream in streams]
+        await asyncio.sleep(0)
+        assert broker.stats()["clients"] == 300
+
+        broker.publish("delete", {"ids": []})
+
+        events = await asyncio.gather(*waiting)
+        assert {event["event"] for event in events} == {"delete"}
+        for stream in streams:
+            await stream.aclose()
+        assert broker.stats()["clients"] == 0
+
+    async def test_publish_from_another_thread(self):
+        """Test that publishing off the event loop still wakes clients."""
+        broker = EventBroker(keepalive=60)
+        stream = broker.stream()
+        await anext(stream)
+        waiting = asyncio.create_task(next_event(stream))
+        await asyncio.sleep(0)
+
+        await asyncio.to_thread(broker.publish, "delete", {"id": 1})
+
+        assert (await waiting)["data"] == {"id": 1}
+        await stream.aclose()
+
+
+    async def test_version_check(self):
+        """Test that only a data version left unexplained across two checks resets clients."""
+        broker = EventBroker()
+        assert broker.check_version(5) is False
+
+        # A local commit whose listener has not run yet
+        assert broker.check_version(6) is False
+        broker.record_deletes([1], 6)
+        assert broker.check_version(6) is False
+
+        stream = broker.stream()
+        await anext(stream)
+        assert broker.check_version(8) is False
+        assert broker.check_version(8) is True
+        assert (await next_event(stream))["event"] == "reset"
+        assert broker.check_version(8) is False
+        assert broker.stats()["foreign_changes"] == 1
+        await stream.aclose()
+
+
+class TestWriteEvents:
+    """Test that database writes through the pools publish deltas."""
+
+    async def test_writes_publish_deltas(self, test_session_pools, test_event_broker, make_update):
+        """Test upsert, batch upsert, delete and Fix All events."""
+        test_writer, test_reader = test_session_pools
+        stream = test_event_broker.stream()
+        await anext(stream)
+
+        async with test_writer.session() as db:
+            update = await async_upsert_diun_update(db, make_update("a"))
+            await async_upsert_diun_updates(db, [make_update("b"), make_update("a")])
+            await async_delete_diun_update(db, update.id)
+            await async_delete_all_diun_updates(db)
+
+        events = [await next_event(stream) for _ in range(5)]
+        assert [event["event"] for event in events] == ["upsert", "upsert", "upsert", "delete", "delete"]
+        assert events[0]["data"]["hostname"] == "a"
+        assert events[0]["data"]["short_digest"] == "abcd1234"
+        assert events[0]["data"]["id"] == update.id
+        assert {events[1]["data"]["hostname"], events[2]["data"]["hostname"]} == {"a", "b"}
+        b_id = next(e["data"]["id"] for e in events[1:3] if e["data"]["hostname"] == "b")
+        assert events[3]["data"] == {"ids": [update.id]}
+        assert events[4]["data"] == {"ids": [b_id]}
+        await stream.aclose()
+
+
+    async def test_detects_writes_from_other_processes(self, test_db, test_session_pools, test_event_broker, make_update):
+        """Test that writes through the pools are accounted for and other writes are not."""
+        TestSessionLocal, test_engine = test_db
+        test_writer, test_reader = test_session_pools
+        db = TestSessionLocal()
+
+        test_event_broker.check_version(get_data_version(db)[0])
+        async with test_writer.session() as session:
+            await async_upsert_diun_updates(session, [make_update("a"), make_update("b")])
+        for _ in range(2):
+            assert test_event_broker.check_version(get_data_version(db)[0]) is False
+
+        # Written without the pools' listeners, as another worker would
+        upsert_diun_updates(db, [make_update("c")])
+        assert test_event_broker.check_version(get_data_version(db)[0]) is False
+        assert test_event_broker.check_version(get_data_version(db)[0]) is True
+        db.close()
+
+
+class TestEventsEndpoint:
+    """Test the /events endpoint and dashboard wiring."""
+
+    def test_replays_after_last_event_id(self, test_client, test_event_broker, sample_diun_webhook, set_webhook_token):
+        """Test the SSE response for a client resuming after a webhook."""
+        seen = test_event_broker.last_event_id
+        test_client.post("/webhook", json=sample_diun_webhook, headers={"Authorization": set_webhook_token})
+        test_event_broker.close()
+
+        response = test_client.get("/events", headers={"Last-Event-ID": seen})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert "event: upsert" in response.text
+        assert '"hostname":"myserver"' in response.text
+
+    def test_dashboard_carries_last_event_id(self, test_client, test_event_broker):
+        """Test that the page tells the script where to resume live updates."""
+        response = test_client.get("/")
+
+        assert f'data-last-event-id="{test_event_broker.last_event_id}"' in response.text
+
+    def test_resumes_page_from_another_worker(self, test_client, test_event_broker):
+        """Test that a page rendered elsewhere only needs a reset if the data changed since."""
+        test_event_broker.close()
+        foreign = {"last_event_id": "0-1"}
+
+        assert "event: reset" in test_client.get("/events", params=foreign).text
+        page = test_client.get("/")
+        data_version = page.text.split('data-data-version="')[1].split('"')[0]
+        assert "event: reset" not in test_client.get("/events", params={**foreign, "data_version": data_version}).text
+        stale = {**foreign, "data_version": int(data_version) - 1}
+        assert "event: reset" in test_client.get("/events", params=stale).text
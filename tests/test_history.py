@@ -0,0 +1,264 @@
+import asyncio
+from datetime import datetime, timedelta, UTC
+
+import pytest
+from sqlalchemy import event, func, select, text, update
+from sqlalchemy.exc import OperationalError
+
+from src.database import (
+    DiunUpdateHistory, delete_all_diun_updates, delete_diun_update, delete_diun_updates,
+    delete_history_batch, get_history_page, history_compaction_bound, upsert_diun_update,
+)
+from src.history import HistoryCompactor
+
+
+@pytest.fixture
+def db(test_db):
+    TestSessionLocal, test_engine = test_db
+    db = TestSessionLocal()
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def archive(make_update):
+    """Upsert and fix one record per hostname, in order."""
+    def archive(db, *hostnames):
+        for hostname in hostnames:
+            delete_diun_update(db, upsert_diun_update(db, make_update(hostname)).id)
+    return archive
+
+
+def archived_hosts(db) -> list[str]:
+    return list(db.scalars(select(DiunUpdateHistory.hostname).order_by(DiunUpdateHistory.id)))
+
+
+class TestArchiveOnDelete:
+    """Test that fixing records moves them into diun_update_history."""
+
+    def test_single_delete(self, db, make_update):
+        """Test that a fixed record is copied with its original id and a fix time."""
+        update = upsert_diun_update(db, make_update("web-1", hub_link="https://hub.docker.com/_/nginx"))
+
+        assert delete_diun_update(db, update.id)
+
+        entry = db.scalars(select(DiunUpdateHistory)).one()
+        assert entry.update_id == update.id
+        assert (entry.hostname, entry.image_name, entry.hub_link) == ("web-1", "nginx", "https://hub.docker.com/_/nginx")
+        assert entry.created_at == update.created_at
+        assert entry.fixed_at >= update.created_at
+
+    def test_bulk_and_fix_all(self, db, make_update):
+        """Test that bulk deletes and batched Fix All archive every removed row."""
+        for hostname in ("a", "b", "c", "d", "e"):
+            upsert_diun_update(db, make_update(hostname))
+
+        delete_diun_updates(db, hostname="a")
+        assert delete_all_diun_updates(db, batch_size=2) == 4
+
+        assert sorted(archived_hosts(db)) == ["a", "b", "c", "d", "e"]
+
+    def test_rolled_back_with_delete(self, db, make_update):
+        """Test that a failed archive insert leaves the live row in place."""
+        update = upsert_diun_update(db, make_update("web-1"))
+        db.execute(text("DROP TABLE diun_update_history"))
+        db.commit()
+
+        with pytest.raises(Exception):
+            delete_diun_update(db, update.id)
+        db.rollback()
+
+        assert db.execute(text("SELECT count(*) FROM diun_updates")).scalar() == 1
+
+
+class TestHistoryPage:
+    """Test get_history_page."""
+
+    def test_pages_newest_first(self, db, archive):
+        """Test that cursor pages walk the archive in fix order, newest first."""
+        archive(db, "a", "b", "c", "d", "e")
+
+        first, cursor = get_history_page(db, limit=2)
+        second, cursor = get_history_page(db, cursor, limit=2)
+        third, cursor = get_history_page(db, cursor, limit=2)
+
+        assert [row.hostname for row in first + second + third] == ["e", "d", "c", "b", "a"]
+        assert cursor is None
+
+    def test_filters(self, db, archive):
+        """Test filtering by host and fix time."""
+        archive(db, "a", "b", "a")
+        db.execute(update(DiunUpdateHistory).where(DiunUpdateHistory.id == 1).values(fixed_at=datetime(2020, 6, 1, 12)))
+        db.commit()
+
+        rows, _ = get_history_page(db, hostname="a")
+        assert [row.id for row in rows] == [3, 1]
+
+        rows, _ = get_history_page(db, fixed_after=datetime(2021, 1, 1, tzinfo=UTC))
+        assert [row.id for row in rows] == [3, 2]
+
+        rows, _ = get_history_page(db, hostname="a", fixed_before=datetime(2021, 1, 1))
+        assert [row.id for row in rows] == [1]
+
+    def test_invalid_cursor(self, db):
+        """Test that a dashboard cursor is not accepted for the history."""
+        with pytest.raises(ValueError):
+            get_history_page(db, "bm90LWEtY3Vyc29y")
+
+    @pytest.mark.parametrize("filters, index", [
+        ({}, "ix_diun_update_history_fixed_at_id"),
+        ({"hostname": "a"}, "ix_diun_update_history_hostname_fixed_at_id"),
+        ({"hostname": "a", "fixed_after": datetime(2021, 1, 1)}, "ix_diun_update_history_hostname_fixed_at_id"),
+    ])
+    def test_uses_index(self, db, filters, index):
+        """Test that history pages are index range scans without a sort step."""
+        plans = []
+
+        @event.listens_for(db.get_bind(), "before_cursor_execute", retval=True)
+        def explain(conn, cursor, statement, parameters, context, executemany):
+            plans.extend(row[-1] for row in cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters))
+            return statement, parameters
+
+        get_history_page(db, **filters)
+        event.remove(db.get_bind(), "before_cursor_execute", explain)
+
+        assert any(index in plan for plan in plans)
+        assert not any("TEMP B-TREE" in plan for plan in plans)
+
+
+class TestCompaction:
+    """Test history compaction."""
+
+    def test_bound_by_size(self, db, archive):
+        """Test that everything but the newest max_rows rows is out of bounds."""
+        archive(db, "a", "b", "c", "d")
+
+        assert history_compaction_bound(db, max_rows=10) is None
+        assert history_compaction_bound(db, max_rows=3) == 1
+        assert history_compaction_bound(db, max_rows=1) == 3
+
+    def test_bound_is_index_seeks(self, db, archive):
+        """Test that finding the bound never walks the archive."""
+        archive(db, "a", "b", "c")
+        plans = []
+
+        @event.listens_for(db.get_bind(), "before_cursor_execute", retval=True)
+        def explain(conn, cursor, statement, parameters, context, executemany):
+            plans.extend(row[-1] for row in cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters))
+            return statement, parameters
+
+        history_compaction_bound(db, max_age=timedelta(days=30), max_rows=1)
+        event.remove(db.get_bind(), "before_cursor_execute", explain)
+
+        assert plans == [
+            "SEARCH diun_update_history USING COVERING INDEX ix_diun_update_history_fixed_at_id (fixed_at<?)",
+            "SEARCH diun_update_history",
+        ]
+
+    def test_bound_by_age(self, db, archive):
+        """Test that rows fixed before the age limit are out of bounds."""
+        archive(db, "a", "b", "c")
+        db.execute(update(DiunUpdateHistory).where(DiunUpdateHistory.id <= 2).values(fixed_at=datetime(2020, 1, 1)))
+        db.commit()
+
+        assert history_compaction_bound(db, max_age=timedelta(days=30)) == 2
+        assert history_compaction_bound(db, max_age=timedelta(days=30), max_rows=1) == 2
+        assert history_compaction_bound(db, max_age=timedelta(days=30), max_rows=0) == 3
+
+    def test_batches(self, db, archive):
+        """Test that each batch removes the oldest rows up to the bound."""
+        archive(db, "a", "b", "c", "d", "e")
+
+        assert delete_history_batch(db, up_to_id=4, batch_size=3) == 3
+        assert archived_hosts(db) == ["d", "e"]
+        assert delete_history_batch(db, up_to_id=4, batch_size=3) == 1
+        assert archived_hosts(db) == ["e"]
+
+    async def test_compactor_run(self, test_db, test_session_pools, archive):
+        """Test that a compactor run enforces both limits in several transactions."""
+        TestSessionLocal, test_engine = test_db
+        test_writer, test_reader = test_session_pools
+        db = TestSessionLocal()
+        archive(db, *"abcdefg")
+        db.execute(update(DiunUpdateHistory).where(DiunUpdateHistory.id == 1).values(fixed_at=datetime(2020, 1, 1)))
+        db.commit()
+
+        compactor = HistoryCompactor(test_writer.session, max_age_days=30, max_rows=3, batch_size=2)
+        assert await compactor.run_once() == 4
+        assert await compactor.run_once() == 0
+
+        assert archived_hosts(db) == ["e", "f", "g"]
+        assert compactor.stats()["runs"] == 2
+        assert compactor.stats()["rows_deleted"] == 4
+        assert test_writer.stats()["acquisitions"] >= 4
+        db.close()
+
+    async def test_disabled_limits(self, test_db, test_session_pools, archive):
+        """Test that limits of 0 are not enforced."""
+        TestSessionLocal, test_engine = test_db
+        test_writer, test_reader = test_session_pools
+        db = TestSessionLocal()
+        archive(db, "a", "b")
+
+        compactor = HistoryCompactor(test_writer.session, max_age_days=0, max_rows=0)
+        assert await compactor.run_once() == 0
+        assert db.scalar(select(func.count()).select_from(DiunUpdateHistory)) == 2
+        db.close()
+
+    async def test_failed_runs_keep_schedule(self):
+        """Test that a failing run is counted and the job keeps running until stopped."""
+        def session_factory():
+            raise OperationalError("SELECT", {}, Exception("database is locked"))
+
+        compactor = HistoryCompactor(session_factory, interval=0.01)
+        await compactor.start()
+        await asyncio.sleep(0.1)
+        await compactor.stop()
+
+        assert compactor.stats()["run_errors"] >= 2
+        assert compactor.stats()["runs"] == 0
+
+
+class TestHistoryEndpoints:
+    """Test the /history page and /debug/history."""
+
+    def test_page(self, test_client, test_db, archive):
+        """Test that fixed updates show up on the history page with paging links."""
+        TestSessionLocal, test_engine = test_db
+        db = TestSessionLocal()
+        archive(db, "web-1", "web-2")
+        db.close()
+
+        response = test_client.get("/history")
+
+        assert response.status_code == 200
+        assert response.text.index("web-2") < response.text.index("web-1")
+
+    def test_filters(self, test_client, test_db, archive):
+        """Test host and inclusive day filters, with empty form fields ignored."""
+        TestSessionLocal, test_engine = test_db
+        db = TestSessionLocal()
+        archive(db, "web-1", "web-2")
+        db.execute(update(DiunUpdateHistory).where(DiunUpdateHistory.hostname == "web-1")
+                   .values(fixed_at=datetime(2024, 5, 1, 23, 59)))
+        db.commit()
+        db.close()
+
+        response = test_client.get("/history?hostname=&fixed_from=2024-05-01&fixed_until=2024-05-01")
+        assert "web-1" in response.text
+        assert "web-2" not in response.text
+
+        response = test_client.get("/history?hostname=web-2&fixed_from=&fixed_until=")
+        assert "web-2" in response.text
+        assert "<td>web-1</td>" not in response.text
+
+    def test_invalid_date(self, test_client):
+        """Test that malformed days are rejected."""
+        assert test_client.get("/history?fixed_from=yesterday").status_code == 400
+
+    def test_compactor_stats(self, test_client):
+        """Test that the compactor's counters are exposed."""
+        response = test_client.get("/debug/history")
+
+        assert response.status_code == 200
+        assert {"enabled"} <= set(response.json())
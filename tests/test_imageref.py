@@ -0,0 +1,123 @@
+import pytest
+from hypothesis import given, strategies as st
+
+from src.imageref import ImageReference, parse_image_reference
+
+# (reference, registry, repository, tag, digest)
+CORPUS = [
+    ("nginx", "docker.io", "library/nginx", None, None),
+    ("nginx:1.27-alpine", "docker.io", "library/nginx", "1.27-alpine", None),
+    ("crazymax/diun:latest", "docker.io", "crazymax/diun", "latest", None),
+    ("docker.io/crazymax/diun:4", "docker.io", "crazymax/diun", "4", None),
+    ("index.docker.io/library/redis", "docker.io", "library/redis", None, None),
+    ("ghcr.io/org/team/app:v1.2.3", "ghcr.io", "org/team/app", "v1.2.3", None),
+    ("registry.local:5000/app", "registry.local:5000", "app", None, None),
+    ("registry.local:5000/app:5000", "registry.local:5000", "app", "5000", None),
+    ("localhost/app:dev", "localhost", "app", "dev", None),
+    ("localhost:5000/a/b", "localhost:5000", "a/b", None, None),
+    ("[::1]:5000/app", "[::1]:5000", "app", None, None),
+    ("Registry/app", "Registry", "app", None, None),
+    ("my_org/my__app.v2-x:tag_1.0", "docker.io", "my_org/my__app.v2-x", "tag_1.0", None),
+    ("valkey/valkey:9@sha256:" + "fb" * 32, "docker.io", "valkey/valkey", "9", "sha256:" + "fb" * 32),
+    ("quay.io/app@sha512:" + "0a" * 64, "quay.io", "app", None, "sha512:" + "0a" * 64),
+]
+
+INVALID = [
+    "", ":", "nginx:", "nginx@", "/nginx", "nginx/", "a//b", "UPPER", "team/App", "app:tag:extra",
+    "app:-tag", "app:" + "t" * 129, "app@sha256:abc", "app@sha256:" + "g" * 64, "host:port/app",
+    "-registry.io/app", "a" * 256, "app tag", "ns/app.", "ns/app_",
+    # Tags are ASCII only, though \w would match these letters and digits
+    "app:ünïcode", "app:١٢٣", "app:v1.0-ß",
+]
+
+LOWER_ALNUM = "abcdefghijklmnopqrstuvwxyz0123456789"
+
+alnum = st.text(LOWER_ALNUM, min_size=1, max_size=8)
+
+
+def components(separators: list[str]) -> st.SearchStrategy[str]:
+    return st.builds(lambda first, rest: first + "".join(separator + part for separator, part in rest),
+                     alnum, st.lists(st.tuples(st.sampled_from(separators), alnum), max_size=2))
+
+
+path_component = components([".", "_", "__", "-", "--"])
+# Without a registry the first component must not look like a host
+namespace = components(["_", "__", "-", "--"]).filter(lambda c: c != "localhost")
+repository = st.builds(lambda first, rest: "/".join([first, *rest]), namespace, st.lists(path_component, max_size=2))
+registry = st.one_of(
+    st.just("docker.io"),
+    st.just("localhost"),
+    st.builds(lambda host, tld, port: f"{host}.{tld}" + (f":{port}" if port is not None else ""),
+              alnum, st.text("abcdefghijklmnopqrstuvwxyz", min_size=2, max_size=5),
+              st.one_of(st.none(), st.integers(1, 65535))),
+)
+tag = st.builds(lambda first, rest: first + rest,
+                st.sampled_from("abcXYZ019_"), st.text(LOWER_ALNUM + "ABCXYZ_.-", max_size=20))
+digest = st.one_of(
+    st.builds(lambda hex_: f"sha256:{hex_}", st.text("0123456789abcdef", min_size=64, max_size=64)),
+    st.builds(lambda hex_: f"sha512:{hex_}", st.text("0123456789abcdef", min_size=128, max_size=128)),
+)
+
+
+def compose(registry: str | None, repository: str, tag: str | None, digest: str | None) -> str:
+    return (f"{registry}/" if registry else "") + repository + (f":{tag}" if tag else "") + (f"@{digest}" if digest else "")
+
+
+class TestParseImageReference:
+    """Test the reference parser against a fixed corpus and generated references."""
+
+    @pytest.mark.parametrize("reference, registry, repository, tag, digest", CORPUS)
+    def test_corpus(self, reference, registry, repository, tag, digest):
+        """Test known references split into the expected parts."""
+        assert parse_image_reference(reference) == ImageReference(registry, repository, tag, digest)
+
+    @pytest.mark.parametrize("reference", INVALID)
+    def test_invalid(self, reference):
+        """Test that malformed references are rejected."""
+        with pytest.raises(ValueError):
+            parse_image_reference(reference)
+
+    def test_names(self):
+        """Test the fully qualified and familiar names."""
+        assert parse_image_reference("nginx").name == "docker.io/library/nginx"
+        assert parse_image_reference("docker.io/library/nginx").familiar_name == "nginx"
+        assert parse_image_reference("docker.io/crazymax/diun").familiar_name == "crazymax/diun"
+        assert parse_image_reference("ghcr.io/library/app").familiar_name == "ghcr.io/library/app"
+        assert str(parse_image_reference("nginx:1@sha256:" + "a" * 64)) == "docker.io/library/nginx:1@sha256:" + "a" * 64
+
+    def test_memoized(self):
+        """Test that repeated references are answered from the cache."""
+        parse_image_reference("ghcr.io/cache/probe:1")
+        hits = parse_image_reference.cache_info().hits
+
+        parse_image_reference("ghcr.io/cache/probe:1")
+
+        assert parse_image_reference.cache_info().hits == hits + 1
+
+    @given(st.one_of(st.none(), registry), repository, st.one_of(st.none(), tag), st.one_of(st.none(), digest))
+    def test_generated_parts(self, registry, repository, tag, digest):
+        """Test that a composed reference parses back into its parts, normalized."""
+        reference = parse_image_reference(compose(registry, repository, tag, digest))
+
+        expected_registry = registry or "docker.io"
+        expected_repository = repository
+        if expected_registry == "docker.io" and "/" not in repository:
+            expected_repository = f"library/{repository}"
+        assert reference == ImageReference(expected_registry, expected_repository, tag, digest)
+
+    @given(st.one_of(st.none(), registry), repository, st.one_of(st.none(), tag), st.one_of(st.none(), digest))
+    def test_normalization_is_stable(self, registry, repository, tag, digest):
+        """Test that normalized and familiar forms parse to the same reference."""
+        reference = parse_image_reference(compose(registry, repository, tag, digest))
+
+        assert parse_image_reference(str(reference)) == reference
+        assert parse_image_reference(compose(None, reference.familiar_name, tag, digest)) == reference
+
+    @given(st.text(max_size=60))
+    def test_arbitrary_text(self, text):
+        """Test that any input either parses or raises ValueError."""
+        try:
+            reference = parse_image_reference(text)
+        except ValueError:
+            return
+        assert parse_image_reference(str(reference)) == reference
@@ -0,0 +1,165 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from src.database import DiunUpdate
+from src.ingest import IngestQueue
+from src.main import app, get_ingest_queue
+
+
+class TestIngestQueue:
+    """Test the write-behind IngestQueue."""
+
+    async def test_stop_drains_queue(self, test_db, test_session_pools, make_update):
+        """Test that stopping the writer flushes every queued update."""
+        TestSessionLocal, test_engine = test_db
+        test_writer, test_reader = test_session_pools
+        queue = IngestQueue(test_writer.session, max_latency=10)
+        await queue.start()
+
+        for i in range(5):
+            assert queue.submit(make_update(hostname=f"server{i}"))
+        await queue.stop()
+
+        db = TestSessionLocal()
+        assert db.query(DiunUpdate).count() == 5
+        db.close()
+        assert queue.stats()["queue_depth"] == 0
+        assert queue.stats()["rows_flushed"] == 5
+
+    async def test_coalesces_repeated_keys(self, test_db, test_session_pools, make_update):
+        """Test that only the latest payload per hostname and image survives."""
+        TestSessionLocal, test_engine = test_db
+        test_writer, test_reader = test_session_pools
+        queue = IngestQueue(test_writer.session, max_latency=10)
+
+        queue.submit(make_update(image_tag="1.0"))
+        queue.submit(make_update(image_tag="2.0"))
+        queue.submit(make_update(image_tag="3.0"))
+        await queue.start()
+        await queue.stop()
+
+        db = TestSessionLocal()
+        records = db.query(DiunUpdate).all()
+        assert len(records) == 1
+        assert records[0].image_tag == "3.0"
+        db.close()
+        assert queue.stats()["coalesced"] == 2
+        assert queue.stats()["last_flush_size"] == 1
+
+    async def test_flushes_in_batches(self, test_db, test_session_pools, make_update):
+        """Test that batches are capped at max_batch_size."""
+        TestSessionLocal, test_engine = test_db
+        test_writer, test_reader = test_session_pools
+        queue = IngestQueue(test_writer.session, max_batch_size=2, max_latency=10)
+
+        for i in range(5):
+            queue.submit(make_update(hostname=f"server{i}"))
+        await queue.start()
+        await queue.stop()
+
+        assert queue.stats()["flushes"] == 3
+        assert queue.stats()["rows_flushed"] == 5
+
+    async def test_retries_failed_flush(self, test_db, test_session_pools, make_update):
+        """Test that a batch whose flush fails once is retried and still written."""
+        TestSessionLocal, test_engine = test_db
+        test_writer, test_reader = test_session_pools
+        failures = [OperationalError("INSERT", {}, Exception("database is locked"))]
+
+        def session_factory():
+            if failures:
+                raise failures.pop()
+            return test_writer.session()
+
+        queue = IngestQueue(session_factory, max_latency=10, retry_delay=0)
+        for i in range(3):
+            queue.submit(make_update(hostname=f"server{i}"))
+        await queue.start()
+        await queue.stop()
+
+        db = TestSessionLocal()
+        assert db.query(DiunUpdate).count() == 3
+        db.close()
+        assert queue.stats()["flush_errors"] == 1
+        assert queue.stats()["rows_dropped"] == 0
+        assert queue.stats()["rows_flushed"] == 3
+
+    async def test_drops_batch_after_retries(self, test_db, test_session_pools, make_update):
+        """Test that a batch is only dropped once every retry has failed."""
+        def session_factory():
+            raise OperationalError("INSERT", {}, Exception("database is locked"))
+
+        queue = IngestQueue(session_factory, max_latency=10, max_retries=2, retry_delay=0)
+        queue.submit(make_update())
+        await queue.start()
+        await queue.stop()
+
+        assert queue.stats()["flush_errors"] == 3
+        assert queue.stats()["rows_dropped"] == 1
+        assert queue.stats()["rows_flushed"] == 0
+
+    def test_rejects_when_full(self, test_db, test_session_pools, make_update):
+        """Test that submit refuses new work once the queue is full."""
+        TestSessionLocal, test_engine = test_db
+        test_writer, test_reader = test_session_pools
+        queue = IngestQueue(test_writer.session, max_size=1)
+
+        assert queue.submit(make_update(hostname="server1"))
+        assert not queue.submit(make_update(hostname="server2"))
+        assert queue.stats()["rejected"] == 1
+
+
+class TestQueuedWebhookEndpoint:
+    """Test /webhook when queued ingestion is enabled."""
+
+    @pytest.fixture
+    def ingest_queue(self, test_session_pools, test_client):
+        test_writer, test_reader = test_session_pools
+        queue = IngestQueue(test_writer.session, max_size=1)
+        app.dependency_overrides[get_ingest_queue] = lambda: queue
+        return queue
+
+    def test_webhook_returns_202(self, test_client, ingest_queue, set_webhook_token, sample_diun_webhook):
+        """Test that queued webhooks are acknowledged before they are written."""
+        response = test_client.post(
+            "/webhook",
+            json=sample_diun_webhook,
+            headers={"Authorization": "test-webhook-token"}
+        )
+
+        assert response.status_code == 202
+        assert ingest_queue.stats()["queue_depth"] == 1
+
+    def test_webhook_does_not_take_writer(self, test_client, test_session_pools, ingest_queue,
+                                          set_webhook_token, sample_diun_webhook):
+        """Test that queued and invalid webhooks never wait for the serialized writer session."""
+        test_writer, test_reader = test_session_pools
+        headers = {"Authorization": "test-webhook-token"}
+
+        assert test_client.post("/webhook", json=sample_diun_webhook, headers=headers).status_code == 202
+        assert test_client.post("/webhook", json={"hostname": "x"}, headers=headers).status_code == 400
+
+        assert test_writer.stats()["acquisitions"] == 0
+
+    def test_webhook_returns_503_when_full(self, test_client, ingest_queue, set_webhook_token, sample_diun_webhook):
+        """Test that a full queue answers 503 so Diun retries later."""
+        headers = {"Authorization": "test-webhook-token"}
+        assert test_client.post("/webhook", json=sample_diun_webhook, headers=headers).status_code == 202
+
+        response = test_client.post("/webhook", json=sample_diun_webhook, headers=headers)
+
+        assert response.status_code == 503
+
+    def test_stats_endpoint(self, test_client, ingest_queue):
+        """Test that queue stats are exposed."""
+        response = test_client.get("/debug/ingest")
+
+        assert response.status_code == 200
+        assert response.json()["mode"] == "queue"
+        assert response.json()["queue_depth"] == 0
+
+    def test_stats_endpoint_sync_mode(self, test_client):
+        """Test that the stats endpoint reports sync mode by default."""
+        response = test_client.get("/debug/ingest")
+
+        assert response.json() == {"mode": "sync"}
@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+
+from src.jobs import PeriodicJob
+
+
+class CountingJob(PeriodicJob):
+    def __init__(self, interval: float, fail: bool = False):
+        super().__init__(interval)
+        self.fail = fail
+        self.runs = 0
+
+    async def run_once(self):
+        self.runs += 1
+        if self.fail:
+            raise RuntimeError("run failed")
+
+
+class TestPeriodicJob:
+    """Test the shared periodic job loop."""
+
+    def test_run_once_is_abstract(self):
+        """Test that a job without run_once cannot be created."""
+        with pytest.raises(TypeError):
+            PeriodicJob(1.0)
+
+    async def test_failed_runs_keep_schedule(self):
+        """Test that failing runs are counted and the loop keeps going until stopped."""
+        job = CountingJob(0.01, fail=True)
+        await job.start()
+        await asyncio.sleep(0.1)
+        await job.stop()
+
+        assert job.runs >= 2
+        assert job.run_errors == job.runs
+
+    async def test_first_run_delayed(self):
+        """Test that a delayed job waits one interval before its first run."""
+        job = CountingJob(60)
+        job.first_run_delayed = True
+        await job.start()
+        await asyncio.sleep(0.05)
+        await job.stop()
+
+        assert job.runs == 0
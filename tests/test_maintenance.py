@@ -0,0 +1,167 @@
+import sqlite3
+import time
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.pool import NullPool
+
+from src.database import (
+    SQLITE_PRAGMAS, checkpoint_wal, create_session_pools, get_storage_stats, incremental_vacuum,
+    optimize_database, upsert_diun_updates,
+)
+from src.maintenance import DatabaseMaintenance
+from src.models import DiunUpdateData
+
+
+@pytest.fixture
+def churned_db(test_db):
+    """The test database switched to incremental auto_vacuum, with free pages left by a large delete."""
+    TestSessionLocal, test_engine = test_db
+    with test_engine.connect() as connection:
+        connection.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+        connection.exec_driver_sql("VACUUM")
+    db = TestSessionLocal()
+    upsert_diun_updates(db, [
+        DiunUpdateData(hostname=f"server{i}", status="new", provider="docker",
+                       image_name="registry.example.com/team/" + "x" * 200, image_tag="latest",
+                       digest="sha256:" + "a" * 64)
+        for i in range(4000)
+    ])
+    db.execute(text("DELETE FROM diun_updates"))
+    db.commit()
+    yield db
+    db.close()
+
+
+class TestMaintenanceFunctions:
+    """Test the SQLite maintenance helpers."""
+
+    def test_incremental_vacuum(self, churned_db):
+        """Test that free pages are released up to the limit and the file shrinks."""
+        before = get_storage_stats(churned_db)
+        assert before["auto_vacuum"] == "incremental"
+        assert before["freelist_count"] > 100
+
+        assert incremental_vacuum(churned_db, 100) == 100
+        after = get_storage_stats(churned_db)
+        assert after["freelist_count"] == before["freelist_count"] - 100
+        assert after["page_count"] == before["page_count"] - 100
+
+        incremental_vacuum(churned_db, 1_000_000)
+        assert get_storage_stats(churned_db)["freelist_count"] == 0
+
+    def test_without_auto_vacuum(self, test_db):
+        """Test that vacuuming a database without incremental auto_vacuum is a no-op."""
+        TestSessionLocal, test_engine = test_db
+        db = TestSessionLocal()
+
+        assert incremental_vacuum(db, 100) == 0
+        optimize_database(db)
+        db.close()
+
+    def test_checkpoint(self, test_db):
+        """Test passive and truncating checkpoints, and that unknown modes are rejected."""
+        TestSessionLocal, test_engine = test_db
+        db = TestSessionLocal()
+
+        assert checkpoint_wal(db)["busy"] is False
+        assert set(checkpoint_wal(db, "TRUNCATE")) == {"busy", "log_frames", "checkpointed_frames"}
+        with pytest.raises(ValueError):
+            checkpoint_wal(db, "EVERYTHING")
+        db.close()
+
+    def test_storage_stats(self, test_db):
+        """Test that page counts and per-table and per-index sizes are reported."""
+        TestSessionLocal, test_engine = test_db
+        db = TestSessionLocal()
+
+        stats = get_storage_stats(db)
+
+        assert stats["file_bytes"] == stats["page_size"] * stats["page_count"]
+        assert stats["wal_bytes"] >= 0
+        objects = {entry["name"]: entry for entry in stats["objects"]}
+        assert objects["diun_updates"]["type"] == "table"
+        assert objects["ix_diun_updates_created_at_id"]["type"] == "index"
+        assert objects["ix_diun_updates_created_at_id"]["table"] == "diun_updates"
+        db.close()
+
+
+class TestDatabaseMaintenance:
+    """Test maintenance passes through the writer pool."""
+
+    @pytest.fixture
+    def pools(self, test_db, churned_db):
+        TestSessionLocal, test_engine = test_db
+        return create_session_pools(test_engine.url.database, SQLITE_PRAGMAS, poolclass=NullPool)
+
+    async def test_busy_pass_only_checkpoints(self, pools, churned_db):
+        """Test that a pass right after a write skips the vacuum."""
+        test_writer, test_reader = pools
+        maintenance = DatabaseMaintenance(test_writer.session, test_reader.session, idle_after=60)
+
+        result = await maintenance.run_once()
+
+        assert result["idle"] is False
+        assert result["pages_vacuumed"] == 0
+        assert get_storage_stats(churned_db)["freelist_count"] > 0
+
+    async def test_idle_pass(self, pools, churned_db):
+        """Test that an idle pass vacuums, optimizes and truncates the WAL."""
+        test_writer, test_reader = pools
+        maintenance = DatabaseMaintenance(test_writer.session, test_reader.session, idle_after=0, vacuum_pages=1_000_000)
+
+        result = await maintenance.run_once()
+
+        assert result["idle"] is True
+        assert result["pages_vacuumed"] > 0
+        assert result["optimized"] is True
+        stats = get_storage_stats(churned_db)
+        assert stats["freelist_count"] == 0
+        assert stats["wal_bytes"] == 0
+        assert maintenance.stats()["pages_vacuumed"] == result["pages_vacuumed"]
+
+    async def test_idle_check_skips_writer(self, pools, churned_db):
+        """Test that judging idleness reads through the reader pool."""
+        test_writer, test_reader = pools
+        maintenance = DatabaseMaintenance(test_writer.session, test_reader.session, idle_after=60)
+
+        assert await maintenance.is_idle() is False
+        assert test_writer.stats()["acquisitions"] == 0
+
+    async def test_truncate_falls_back_to_passive(self, pools, churned_db, test_db):
+        """Test that a reader holding the WAL makes an idle pass settle for a passive checkpoint."""
+        TestSessionLocal, test_engine = test_db
+        test_writer, test_reader = pools
+        maintenance = DatabaseMaintenance(test_writer.session, test_reader.session, idle_after=0,
+                                          vacuum_pages=0, checkpoint_timeout=0.05)
+        churned_db.execute(text("PRAGMA journal_mode = WAL"))
+        reader = sqlite3.connect(test_engine.url.database, isolation_level=None)
+        reader.execute("BEGIN")
+        reader.execute("SELECT count(*) FROM diun_updates").fetchone()
+        # A write after the reader's snapshot, which TRUNCATE must wait for it to release
+        upsert_diun_updates(churned_db, [
+            DiunUpdateData(hostname="server1", status="new", provider="docker",
+                           image_name="nginx", image_tag="latest", digest="sha256:" + "a" * 64)
+        ])
+
+        start = time.monotonic()
+        result = await maintenance.run_once()
+
+        assert time.monotonic() - start < 2
+        assert result["checkpoint"]["busy"] is False
+        assert maintenance.stats()["truncate_fallbacks"] == 1
+        assert get_storage_stats(churned_db)["wal_bytes"] > 0
+        reader.close()
+
+
+class TestStorageEndpoint:
+    """Test the /debug/storage endpoint."""
+
+    def test_reports_storage(self, test_client):
+        """Test that storage figures are exposed."""
+        response = test_client.get("/debug/storage")
+
+        assert response.status_code == 200
+        body = response.json()
+        assert {"page_count", "freelist_count", "wal_bytes", "objects", "maintenance"} <= set(body)
+        assert "diun_updates" in {entry["name"] for entry in body["objects"]}
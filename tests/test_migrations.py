@@ -0,0 +1,268 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect, text
+
+from src.database import SCHEMA_HEAD, Base, get_schema_revision
+from src.main import run_migrations
+
+
+def alembic_config(db_path):
+    config = Config("src/alembic.ini")
+    config.set_main_option("sqlalchemy.url", f"sqlite:///{db_path}")
+    return config
+
+
+class TestMigrations:
+    """Test the Alembic migration chain against the SQLAlchemy models."""
+
+    def test_upgrade_matches_models(self, tmp_path):
+        """Test that a database migrated to head has the tables and indexes the models declare."""
+        db_path = tmp_path / "migrated.db"
+        command.upgrade(alembic_config(db_path), "head")
+
+        engine = create_engine(f"sqlite:///{db_path}")
+        with engine.connect() as connection:
+            diffs = compare_metadata(MigrationContext.configure(connection), Base.metadata)
+        engine.dispose()
+
+        # image_created_at intentionally keeps its original VARCHAR declaration
+        # (see b2c3d4e5f6a7), so only index and table differences are checked.
+        flat = [d for group in diffs for d in (group if isinstance(group, list) else [group])]
+        assert [d for d in flat if d[0] != "modify_type"] == []
+
+    def test_listing_indexes(self, tmp_path):
+        """Test that the composite listing indexes replace the redundant single-column ones."""
+        db_path = tmp_path / "migrated.db"
+        command.upgrade(alembic_config(db_path), "head")
+
+        engine = create_engine(f"sqlite:///{db_path}")
+        indexes = {index["name"] for index in inspect(engine).get_indexes("diun_updates")}
+        engine.dispose()
+
+        assert {
+            "ix_diun_updates_created_at_id",
+            "ix_diun_updates_host_id_created_at_id",
+            "ix_diun_updates_status_created_at_id",
+        } <= indexes
+        assert not {"ix_diun_updates_id", "ix_diun_updates_hostname", "ix_diun_updates_status"} & indexes
+
+    def test_data_version_triggers(self, tmp_path):
+        """Test that the triggers bumping diun_meta on every write are dropped at head, and restored on downgrade."""
+        db_path = tmp_path / "migrated.db"
+        config = alembic_config(db_path)
+
+        def write_and_read_version():
+            engine = create_engine(f"sqlite:///{db_path}")
+            with engine.begin() as connection:
+                connection.execute(text("INSERT INTO diun_updates (host_id, image_id) VALUES (1, 1)"))
+                connection.execute(text("UPDATE diun_updates SET status = 'new'"))
+                connection.execute(text("DELETE FROM diun_updates"))
+                version = connection.execute(text("SELECT data_version FROM diun_meta WHERE id = 1")).scalar()
+            engine.dispose()
+            return version
+
+        command.upgrade(config, "c9d0e1f2a3b4")
+        assert write_and_read_version() == 3
+        command.upgrade(config, "head")
+        assert write_and_read_version() == 3
+        command.downgrade(config, "c9d0e1f2a3b4")
+        assert write_and_read_version() == 6
+
+    def test_incremental_auto_vacuum(self, tmp_path):
+        """Test that the migrated database uses incremental auto_vacuum."""
+        db_path = tmp_path / "migrated.db"
+        command.upgrade(alembic_config(db_path), "head")
+
+        engine = create_engine(f"sqlite:///{db_path}")
+        with engine.connect() as connection:
+            auto_vacuum = connection.exec_driver_sql("PRAGMA auto_vacuum").scalar()
+        engine.dispose()
+
+        assert auto_vacuum == 2
+
+    def test_normalize_image_references(self, tmp_path):
+        """Test that stored names are normalized and rows naming the same image are merged."""
+        config = alembic_config(tmp_path / "migrated.db")
+        command.upgrade(config, "f6a7b8c9d0e1")
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+        with engine.begin() as connection:
+            connection.execute(text(
+                "INSERT INTO diun_updates (hostname, image_name, image_tag, created_at) VALUES "
+                "('a', 'docker.io/library/nginx', 'latest', '2026-01-01'), "
+                "('a', 'nginx', '1.27', '2026-01-02'), "
+                "('a', 'registry', '5000/app', '2026-01-01'), "
+                "('b', 'index.docker.io/crazymax/diun', '4', '2026-01-01'), "
+                "('b', 'Not A Reference', 'latest', '2026-01-01')"
+            ))
+            connection.execute(text(
+                "INSERT INTO diun_update_history (hostname, image_name, image_tag, fixed_at) "
+                "VALUES ('a', 'docker.io/nginx', 'latest', '2026-01-01')"
+            ))
+        command.upgrade(config, "a7b8c9d0e1f2")
+        with engine.connect() as connection:
+            rows = connection.execute(text(
+                "SELECT hostname, image_name, image_tag FROM diun_updates ORDER BY hostname, image_name"
+            )).all()
+            history = connection.execute(text("SELECT image_name, image_tag FROM diun_update_history")).all()
+        engine.dispose()
+
+        assert [tuple(row) for row in rows] == [
+            ("a", "nginx", "1.27"),
+            ("a", "registry:5000/app", "latest"),
+            ("b", "Not A Reference", "latest"),
+            ("b", "crazymax/diun", "4"),
+        ]
+        assert [tuple(row) for row in history] == [("nginx", "latest")]
+
+    def test_hosts_and_images(self, tmp_path):
+        """Test that names move into hosts and images, keeping each image's newest link, and back."""
+        config = alembic_config(tmp_path / "migrated.db")
+        command.upgrade(config, "a7b8c9d0e1f2")
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+        with engine.begin() as connection:
+            connection.execute(text(
+                "INSERT INTO diun_updates (hostname, image_name, image_tag, hub_link, created_at) VALUES "
+                "('a', 'nginx', '1', 'https://old', '2026-01-01'), "
+                "('b', 'nginx', '2', 'https://new', '2026-01-02'), "
+                "('b', 'redis', '7', NULL, '2026-01-03')"
+            ))
+        command.upgrade(config, "b8c9d0e1f2a3")
+        with engine.connect() as connection:
+            hosts = connection.execute(text("SELECT hostname FROM hosts ORDER BY id")).scalars().all()
+            images = connection.execute(text("SELECT image_name, hub_link FROM images ORDER BY id")).all()
+            rows = connection.execute(text(
+                "SELECT h.hostname, i.image_name, u.image_tag FROM diun_updates AS u "
+                "JOIN hosts AS h ON h.id = u.host_id JOIN images AS i ON i.id = u.image_id ORDER BY u.id"
+            )).all()
+        command.downgrade(config, "a7b8c9d0e1f2")
+        with engine.connect() as connection:
+            restored = connection.execute(text(
+                "SELECT hostname, image_name, image_tag, hub_link FROM diun_updates ORDER BY id"
+            )).all()
+        engine.dispose()
+
+        assert hosts == ["a", "b"]
+        assert [tuple(image) for image in images] == [("nginx", "https://new"), ("redis", None)]
+        assert [tuple(row) for row in rows] == [("a", "nginx", "1"), ("b", "nginx", "2"), ("b", "redis", "7")]
+        assert [tuple(row) for row in restored] == [
+            ("a", "nginx", "1", "https://new"), ("b", "nginx", "2", "https://new"), ("b", "redis", "7", None),
+        ]
+
+    def test_compact_digests_and_timestamps(self, tmp_path):
+        """Test that digests become BLOBs and timestamps epoch microseconds in both tables, and convert back."""
+        config = alembic_config(tmp_path / "migrated.db")
+        command.upgrade(config, "b8c9d0e1f2a3")
+        digest = "sha256:" + "ab" * 32
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+        with engine.begin() as connection:
+            connection.execute(text("INSERT INTO hosts (hostname) VALUES ('a')"))
+            connection.execute(text("INSERT INTO images (image_name) VALUES ('nginx'), ('redis'), ('samba')"))
+            connection.execute(text(
+                "INSERT INTO diun_updates (host_id, image_id, digest, image_created_at, created_at) VALUES "
+                f"(1, 1, '{digest}', '2026-01-02 03:04:05.678901', '2026-01-03 00:00:00.000000'), "
+                "(1, 2, 'sha256:abcd1234', '2026-01-02T04:04:05+01:00', '2026-01-03 00:00:01.000000'), "
+                "(1, 3, NULL, 'not a date', NULL)"
+            ))
+            connection.execute(text(
+                "INSERT INTO diun_update_history (hostname, image_name, digest, created_at, fixed_at) "
+                f"VALUES ('a', 'nginx', '{digest}', '2026-01-03 00:00:00.000000', '2026-01-04 00:00:00.000000')"
+            ))
+        command.upgrade(config, "c9d0e1f2a3b4")
+        with engine.connect() as connection:
+            rows = connection.execute(text(
+                "SELECT typeof(digest), length(digest), image_created_at, created_at FROM diun_updates ORDER BY id"
+            )).all()
+            history = connection.execute(text(
+                "SELECT typeof(digest), length(digest), created_at, fixed_at FROM diun_update_history"
+            )).one()
+            history_indexes = {index["name"] for index in inspect(connection).get_indexes("diun_update_history")}
+        command.downgrade(config, "b8c9d0e1f2a3")
+        with engine.connect() as connection:
+            restored = connection.execute(text(
+                "SELECT digest, image_created_at, created_at FROM diun_updates ORDER BY id"
+            )).all()
+            restored_history = connection.execute(text(
+                "SELECT digest, created_at, fixed_at FROM diun_update_history"
+            )).one()
+        engine.dispose()
+
+        assert [tuple(row) for row in rows] == [
+            ("blob", 33, 1767323045678901, 1767398400000000),
+            ("blob", 16, 1767323045000000, 1767398401000000),
+            ("null", None, None, None),
+        ]
+        assert [tuple(row) for row in restored] == [
+            (digest, "2026-01-02 03:04:05.678901", "2026-01-03 00:00:00.000000"),
+            ("sha256:abcd1234", "2026-01-02 03:04:05.000000", "2026-01-03 00:00:01.000000"),
+            (None, None, None),
+        ]
+        assert tuple(history) == ("blob", 33, 1767398400000000, 1767484800000000)
+        assert history_indexes == {
+            "ix_diun_update_history_fixed_at_id", "ix_diun_update_history_hostname_fixed_at_id",
+        }
+        assert tuple(restored_history) == (digest, "2026-01-03 00:00:00.000000", "2026-01-04 00:00:00.000000")
+
+    def test_downgrade_and_upgrade(self, tmp_path):
+        """Test that the chain can be walked down to the base and back up."""
+        config = alembic_config(tmp_path / "migrated.db")
+
+        command.upgrade(config, "head")
+        command.downgrade(config, "base")
+        command.upgrade(config, "head")
+
+
+class TestSchemaFastPath:
+    """Test the startup check that skips Alembic when the schema is current."""
+
+    def test_schema_head_is_alembic_head(self):
+        """Test that SCHEMA_HEAD was updated along with the newest revision script."""
+        assert ScriptDirectory.from_config(Config("src/alembic.ini")).get_current_head() == SCHEMA_HEAD
+
+    def test_schema_revision(self, tmp_path):
+        """Test reading alembic_version, without creating a missing database."""
+        db_path = tmp_path / "migrated.db"
+        assert get_schema_revision(str(db_path)) is None
+        assert not db_path.exists()
+
+        command.upgrade(alembic_config(db_path), "e5f6a7b8c9d0")
+        assert get_schema_revision(str(db_path)) == "e5f6a7b8c9d0"
+
+    def test_run_migrations_skips_current_schema(self, tmp_path, monkeypatch):
+        """Test that Alembic only runs when the schema is behind."""
+        db_path = str(tmp_path / "data" / "diun.db")
+
+        assert run_migrations(db_path) is True
+        assert get_schema_revision(db_path) == SCHEMA_HEAD
+
+        monkeypatch.setattr(command, "upgrade", lambda *args: pytest.fail("Alembic ran for a current schema"))
+        assert run_migrations(db_path) is False
+
+
+class TestColdStart:
+    """Test what importing the application loads."""
+
+    def test_import_is_lazy(self, tmp_path):
+        """Test that Alembic and Jinja2 are not imported when the schema is current."""
+        for name in ("src", "static", "templates"):
+            (tmp_path / name).symlink_to(Path(name).resolve())
+        check = "import sys, src.main; print(','.join(m for m in ('alembic', 'jinja2') if m in sys.modules))"
+        env = {**os.environ, "DIUN_WEBHOOK_TOKEN": "test"}
+
+        # The first start migrates, the second takes the fast path
+        subprocess.run([sys.executable, "-c", "import src.main"], cwd=tmp_path, env=env, check=True)
+        result = subprocess.run([sys.executable, "-c", check], cwd=tmp_path, env=env,
+                                capture_output=True, text=True, check=True)
+
+        assert result.stdout.strip() == ""
@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from sqlalchemy import update
+
+from src.database import diun_updates_table, get_diun_updates_page, decode_cursor, upsert_diun_update
+from src.models import UpdateParams
+
+
+@pytest.fixture
+def populated_db(test_db):
+    """Insert 7 rows; rows 3 and 4 share a created_at to exercise the id tiebreak."""
+    TestSessionLocal, test_engine = test_db
+    db = TestSessionLocal()
+    base = datetime(2025, 1, 1, 12, 0, 0)
+    offsets = [0, 1, 2, 3, 3, 4, 5]
+    for i, offset in enumerate(offsets):
+        stored = upsert_diun_update(db, UpdateParams(
+            hostname=f"server{i}",
+            status="new",
+            provider="docker",
+            image_name="nginx",
+            image_tag="alpine",
+            digest=f"sha256:{i}",
+        ))
+        db.execute(update(diun_updates_table).where(diun_updates_table.c.id == stored.id)
+                   .values(created_at=base + timedelta(minutes=offset)))
+    db.commit()
+    yield db
+    db.close()
+
+
+class TestGetDiunUpdatesPage:
+    """Test keyset pagination in get_diun_updates_page."""
+
+    def test_walks_all_pages_in_order(self, populated_db):
+        """Test that following next_cursor visits every row exactly once, newest first."""
+        seen = []
+        cursor = None
+        while True:
+            updates, cursor = get_diun_updates_page(populated_db, cursor, limit=2)
+            seen.extend(updates)
+            if cursor is None:
+                break
+
+        assert len(seen) == 7
+        assert len({u.id for u in seen}) == 7
+        keys = [(u.created_at, u.id) for u in seen]
+        assert keys == sorted(keys, reverse=True)
+
+    def test_last_page_has_no_cursor(self, populated_db):
+        """Test that a page holding the remaining rows returns no next cursor."""
+        updates, cursor = get_diun_updates_page(populated_db, None, limit=7)
+
+        assert len(updates) == 7
+        assert cursor is None
+
+    def test_empty_table(self, test_db):
+        """Test pagination over an empty table."""
+        TestSessionLocal, test_engine = test_db
+        db = TestSessionLocal()
+
+        assert get_diun_updates_page(db, None, limit=10) == ([], None)
+
+        db.close()
+
+    def test_cursor_round_trip(self, populated_db):
+        """Test that the cursor encodes the last row of the page."""
+        updates, cursor = get_diun_updates_page(populated_db, None, limit=3)
+
+        assert decode_cursor(cursor) == (updates[-1].created_at, updates[-1].id)
+
+    @pytest.mark.parametrize("cursor", ["not-a-cursor", "", "W10"])
+    def test_invalid_cursor(self, populated_db, cursor):
+        """Test that malformed cursors raise ValueError."""
+        with pytest.raises(ValueError):
+            get_diun_updates_page(populated_db, cursor, limit=2)
+
+
+class TestPaginatedEndpoints:
+    """Test cursor pagination on the dashboard and the JSON listing."""
+
+    def test_api_pages(self, test_client, populated_db):
+        """Test that /api/updates pages through every row."""
+        response = test_client.get("/api/updates", params={"limit": 4})
+        assert response.status_code == 200
+        first = response.json()
+        assert len(first["items"]) == 4
+        assert first["next_cursor"] is not None
+
+        second = test_client.get("/api/updates", params={"limit": 4, "cursor": first["next_cursor"]}).json()
+        assert len(second["items"]) == 3
+        assert second["next_cursor"] is None
+
+        ids = [item["id"] for item in first["items"] + second["items"]]
+        assert len(set(ids)) == 7
+
+    def test_api_invalid_cursor(self, test_client, populated_db):
+        """Test that a malformed cursor is a client error."""
+        response = test_client.get("/api/updates", params={"cursor": "garbage"})
+
+        assert response.status_code == 400
+
+    def test_dashboard_pages(self, test_client, populated_db, monkeypatch):
+        """Test that the dashboard renders one page and links to the next."""
+        monkeypatch.setattr("src.main.DIUN_PAGE_SIZE", 5)
+
+        response = test_client.get("/")
+        assert response.status_code == 200
+        assert response.text.count("data-fix-id") == 5
+        assert "Next page" in response.text
+
+        updates, cursor = get_diun_updates_page(populated_db, None, limit=5)
+        second = test_client.get("/", params={"cursor": cursor})
+        assert second.text.count("data-fix-id") == 2
+        assert "Next page" not in second.text
+        assert "First page" in second.text
+
+    def test_dashboard_invalid_cursor(self, test_client, populated_db):
+        """Test that the dashboard rejects malformed cursors."""
+        response = test_client.get("/", params={"cursor": "garbage"})
+
+        assert response.status_code == 400
@@ -1,7 +1,8 @@
+import json
 import pytest
 from datetime import datetime
 
-from src.models import WebhookData, DiunUpdateData
+from src.models import WebhookData, DiunUpdateData, UpdateParams
 
 
 class TestParseImageData:
@@ -22,7 +23,7 @@ class TestParseImageData:
         result = webhook_data.to_update_data()
         
         assert isinstance(result, DiunUpdateData)
-        assert result.image_name == "docker.io/nginx"
+        assert result.image_name == "nginx"
         assert result.image_tag == "alpine"
         assert result.hostname == "testserver"
         assert result.image_created_at == datetime(2025, 1, 1, 10, 0, 0)
@@ -109,7 +110,7 @@ class TestParseImageData:
         assert result.hub_link == webhook_data.hub_link
         
         # Image should be parsed correctly
-        assert result.image_name == "docker.io/crazymax/diun"
+        assert result.image_name == "crazymax/diun"
         assert result.image_tag == "latest"
 
     def test_parse_with_optional_fields_none(self):
@@ -159,7 +160,7 @@ class TestParseImageData:
 
         result = webhook_data.to_update_data()
 
-        assert result.image_name == "docker.io/valkey/valkey"
+        assert result.image_name == "valkey/valkey"
         assert result.image_tag == "9"
 
     def test_parse_latest_explicit_tag(self):
@@ -176,4 +177,62 @@ class TestParseImageData:
         result = webhook_data.to_update_data()
         
         assert result.image_name == "ubuntu"
-        assert result.image_tag == "latest"
\ No newline at end of file
+        assert result.image_tag == "latest"
+
+    def test_update_params_match_update_data(self, sample_diun_webhook):
+        """Test that the raw-body fast path yields the same values as to_update_data."""
+        webhook_data = WebhookData.model_validate_json(json.dumps(sample_diun_webhook))
+
+        params = webhook_data.to_update_params()
+
+        assert isinstance(params, UpdateParams)
+        assert params._asdict() == webhook_data.to_update_data().model_dump()
+
+    def test_parse_registry_port_without_tag(self):
+        """Test that a registry port is not mistaken for a tag."""
+        webhook_data = WebhookData(
+            hostname="testserver",
+            status="new",
+            provider="docker",
+            image="registry.local:5000/team/app",
+            digest="sha256:port123",
+            created="2025-01-01T10:00:00Z"
+        )
+
+        result = webhook_data.to_update_data()
+
+        assert result.image_name == "registry.local:5000/team/app"
+        assert result.image_tag == "latest"
+
+    @pytest.mark.parametrize("image", [
+        "nginx", "nginx:latest", "library/nginx", "docker.io/nginx", "docker.io/library/nginx:latest",
+        "index.docker.io/library/nginx",
+    ])
+    def test_default_registry_is_normalized(self, image):
+        """Test that every spelling of an official Docker Hub image is stored under one name."""
+        webhook_data = WebhookData(
+            hostname="testserver", status="new", provider="docker",
+            image=image, digest="sha256:abc", created="2025-01-01T10:00:00Z"
+        )
+
+        params = webhook_data.to_update_params()
+
+        assert (params.image_name, params.image_tag) == ("nginx", "latest")
+
+    @pytest.mark.parametrize("image, image_name, image_tag", [
+        ("nginx:", "nginx", ""),
+        ("Team/App", "Team/App", "latest"),
+        ("app:bad tag", "app", "bad tag"),
+        ("nginx@sha256:short", "nginx", "latest"),
+        ("Weird Image!!", "Weird Image!!", "latest"),
+    ])
+    def test_invalid_reference_stored_as_received(self, image, image_name, image_tag):
+        """Test that a reference the parser rejects is accepted and split on its last ":"."""
+        webhook_data = WebhookData(
+            hostname="testserver", status="new", provider="docker",
+            image=image, digest="sha256:abc", created="2025-01-01T10:00:00Z"
+        )
+
+        params = webhook_data.to_update_params()
+
+        assert (params.image_name, params.image_tag) == (image_name, image_tag)
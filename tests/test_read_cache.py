@@ -0,0 +1,156 @@
+import pytest
+from sqlalchemy.pool import NullPool
+
+from src.database import (
+    SQLITE_PRAGMAS, ReadCache, create_session_pools, upsert_diun_update,
+    async_upsert_diun_update, async_upsert_diun_updates, async_delete_diun_update,
+    async_delete_all_diun_updates, async_get_diun_updates_page, async_warm_read_cache,
+)
+
+
+@pytest.fixture
+def cached_pools(test_db):
+    """Writer and reader pools sharing a three-row ReadCache."""
+    TestSessionLocal, test_engine = test_db
+    cache = ReadCache(max_rows=3)
+    test_writer, test_reader = create_session_pools(
+        test_engine.url.database, SQLITE_PRAGMAS, read_cache=cache, poolclass=NullPool
+    )
+    return test_writer, test_reader, cache
+
+
+@pytest.fixture
+def write(make_update):
+    """Upsert one record per hostname through the given pool."""
+    async def write(pool, *hostnames):
+        async with pool.session() as db:
+            for hostname in hostnames:
+                await async_upsert_diun_update(db, make_update(hostname))
+    return write
+
+
+async def read_page(pool, cursor=None, limit=2):
+    async with pool.session() as db:
+        updates, next_cursor = await async_get_diun_updates_page(db, cursor, limit)
+    return [u.hostname for u in updates], next_cursor
+
+
+class TestReadCache:
+    """Test the in-process dashboard cache."""
+
+    async def test_repeated_reads_hit(self, cached_pools, write):
+        """Test that unchanged data is loaded once and then served from memory."""
+        test_writer, test_reader, cache = cached_pools
+        await write(test_writer, "a", "b")
+
+        first = await read_page(test_reader)
+        second = await read_page(test_reader)
+
+        assert first == second == (["b", "a"], None)
+        stats = cache.stats()
+        assert stats["loads"] == 1
+        assert stats["hits"] == 1
+
+    async def test_writes_patch_without_reload(self, cached_pools, write):
+        """Test that upserts and deletes through the pools update the cache in place."""
+        test_writer, test_reader, cache = cached_pools
+        await write(test_writer, "a", "b")
+        await read_page(test_reader)
+
+        await write(test_writer, "a")
+        assert await read_page(test_reader) == (["a", "b"], None)
+
+        async with test_reader.session() as db:
+            page, _ = await async_get_diun_updates_page(db)
+        async with test_writer.session() as db:
+            assert await async_delete_diun_update(db, page[0].id)
+        assert await read_page(test_reader) == (["b"], None)
+
+        async with test_writer.session() as db:
+            await async_delete_all_diun_updates(db)
+        assert await read_page(test_reader) == ([], None)
+
+        assert cache.stats()["loads"] == 1
+
+    async def test_detects_writes_from_other_sessions(self, test_db, cached_pools, make_update, write):
+        """Test that a write bypassing the cache, as from another worker, forces a reload."""
+        TestSessionLocal, test_engine = test_db
+        test_writer, test_reader, cache = cached_pools
+        await write(test_writer, "a")
+        await read_page(test_reader)
+
+        db = TestSessionLocal()
+        try:
+            upsert_diun_update(db, make_update("other"))
+        finally:
+            db.close()
+
+        assert await read_page(test_reader) == (["other", "a"], None)
+        assert cache.stats()["loads"] == 2
+
+    async def test_batch_upsert_patches(self, cached_pools, make_update, write):
+        """Test that multi-row upserts are applied to the snapshot from their RETURNING rows."""
+        test_writer, test_reader, cache = cached_pools
+        await write(test_writer, "a", "b")
+        await read_page(test_reader)
+
+        async with test_writer.session() as db:
+            await async_upsert_diun_updates(db, [make_update("c"), make_update("a")])
+
+        first, cursor = await read_page(test_reader)
+        second, _ = await read_page(test_reader, cursor)
+        assert first + second == ["c", "a", "b"]
+        assert cache.stats()["loads"] == 1
+
+    async def test_hub_link_patched_for_every_host(self, cached_pools, make_update, write):
+        """Test that a new link for an image reaches the cached rows of other hosts."""
+        test_writer, test_reader, cache = cached_pools
+        await write(test_writer, "a", "b")
+        await read_page(test_reader)
+
+        async with test_writer.session() as db:
+            await async_upsert_diun_update(db, make_update("c").model_copy(update={"hub_link": "https://new"}))
+
+        async with test_reader.session() as db:
+            updates, _ = await async_get_diun_updates_page(db, None, 3)
+        assert [(u.hostname, u.hub_link) for u in updates] == [("c", "https://new"), ("b", "https://new"), ("a", "https://new")]
+        assert cache.stats()["loads"] == 1
+
+    async def test_pages_beyond_bound_read_from_database(self, cached_pools, write):
+        """Test that only max_rows rows are held and later pages fall back to SQLite."""
+        test_writer, test_reader, cache = cached_pools
+        await write(test_writer, "a", "b", "c", "d", "e")
+
+        first, cursor = await read_page(test_reader)
+        second, cursor = await read_page(test_reader, cursor)
+        third, cursor = await read_page(test_reader, cursor)
+
+        assert first + second + third == ["e", "d", "c", "b", "a"]
+        assert cursor is None
+        stats = cache.stats()
+        assert stats["rows"] == 3
+        assert stats["complete"] is False
+        assert stats["misses"] >= 2
+
+    async def test_warm_up(self, cached_pools, write):
+        """Test that warming loads the snapshot before the first request."""
+        test_writer, test_reader, cache = cached_pools
+        await write(test_writer, "a")
+
+        async with test_reader.session() as db:
+            await async_warm_read_cache(db)
+
+        assert cache.stats()["rows"] == 1
+        await read_page(test_reader)
+        assert cache.stats()["hits"] == 1
+
+
+class TestCacheEndpoint:
+    """Test the /debug/cache endpoint."""
+
+    def test_reports_counters(self, test_client):
+        """Test that cache counters are exposed."""
+        response = test_client.get("/debug/cache")
+
+        assert response.status_code == 200
+        assert {"hits", "misses", "max_rows"} <= set(response.json())
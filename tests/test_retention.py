@@ -0,0 +1,170 @@
+from datetime import datetime, timedelta, UTC
+
+import pytest
+from sqlalchemy import event, select, update
+
+from src.database import (
+    DiunUpdate, DiunUpdateHistory, delete_expired_diun_updates_batch, diun_updates_table, upsert_diun_updates,
+)
+from src.models import DiunUpdateData
+from src.retention import RetentionSweeper, parse_age, parse_retention_policy, retention_selections
+
+NOW = datetime(2026, 1, 1, tzinfo=UTC)
+
+# (hostname, image_name, status, days old)
+FLEET = [
+    ("web-1", "nginx", "new", 100),
+    ("web-1", "redis", "unchanged", 10),
+    ("web-2", "nginx", "unchanged", 10),
+    ("web-2", "redis", "new", 1),
+    ("old-nas", "samba", "new", 3),
+]
+
+
+@pytest.fixture
+def db(test_db):
+    """A session over FLEET, with created_at set relative to the real clock."""
+    TestSessionLocal, test_engine = test_db
+    db = TestSessionLocal()
+    upsert_diun_updates(db, [
+        DiunUpdateData(hostname=hostname, status=status, provider="docker",
+                       image_name=image_name, image_tag="latest", digest="sha256:abcd")
+        for hostname, image_name, status, _ in FLEET
+    ])
+    ids = {(u.hostname, u.image_name): u.id for u in db.scalars(select(DiunUpdate))}
+    for hostname, image_name, _, days in FLEET:
+        db.execute(
+            update(diun_updates_table)
+            .where(diun_updates_table.c.id == ids[hostname, image_name])
+            .values(created_at=datetime.now(UTC) - timedelta(days=days))
+        )
+    db.commit()
+    yield db
+    db.close()
+
+
+def remaining(db) -> set[str]:
+    return {f"{u.hostname}/{u.image_name}" for u in db.scalars(select(DiunUpdate))}
+
+
+class TestPolicy:
+    """Test DIUN_RETENTION parsing and rule precedence."""
+
+    def test_parse(self):
+        """Test default, status and hostname entries with day and hour ages."""
+        policy = parse_retention_policy("90d, status:unchanged=7, hostname:old-nas=12h")
+
+        assert policy == {
+            "default": timedelta(days=90),
+            "status": {"unchanged": timedelta(days=7)},
+            "hostname": {"old-nas": timedelta(hours=12)},
+        }
+        assert parse_retention_policy("") == {"default": None, "status": {}, "hostname": {}}
+
+    @pytest.mark.parametrize("spec", ["forever", "status=7d", "image:nginx=7d", "hostname:=1d", "status:new=-1d"])
+    def test_invalid(self, spec):
+        """Test that malformed specs are rejected."""
+        with pytest.raises(ValueError):
+            parse_retention_policy(spec)
+
+    def test_parse_age(self):
+        """Test fractional days and case-insensitive units."""
+        assert parse_age("1.5d") == timedelta(days=1.5)
+        assert parse_age("48H") == timedelta(hours=48)
+
+    def test_selections_are_disjoint(self):
+        """Test that hostname rules beat status rules, which beat the default."""
+        policy = parse_retention_policy("30d,status:unchanged=7d,hostname:old-nas=1d")
+
+        selections = dict(retention_selections(policy, NOW))
+
+        assert selections["hostname:old-nas"] == {"older_than": NOW - timedelta(days=1), "hostname": "old-nas"}
+        assert selections["status:unchanged"]["exclude_hostnames"] == ("old-nas",)
+        assert selections["default"]["exclude_hostnames"] == ("old-nas",)
+        assert selections["default"]["exclude_statuses"] == ("unchanged",)
+
+
+class TestExpiredDelete:
+    """Test delete_expired_diun_updates_batch."""
+
+    def test_older_than(self, db):
+        """Test that only records received before the cutoff are deleted, and not archived."""
+        deleted = delete_expired_diun_updates_batch(db, datetime.now(UTC) - timedelta(days=30))
+
+        assert len(deleted) == 1
+        assert "web-1/nginx" not in remaining(db)
+        assert db.scalars(select(DiunUpdateHistory)).all() == []
+
+    def test_selection(self, db):
+        """Test hostname, status and exclusion filters."""
+        cutoff = datetime.now(UTC) - timedelta(days=2)
+
+        assert delete_expired_diun_updates_batch(db, cutoff, status="unchanged", exclude_hostnames=("web-2",))
+        assert remaining(db) == {"web-1/nginx", "web-2/nginx", "web-2/redis", "old-nas/samba"}
+
+        delete_expired_diun_updates_batch(db, cutoff, exclude_hostnames=("old-nas",), exclude_statuses=("new",))
+        assert remaining(db) == {"web-1/nginx", "web-2/redis", "old-nas/samba"}
+
+        delete_expired_diun_updates_batch(db, cutoff, hostname="old-nas")
+        assert remaining(db) == {"web-1/nginx", "web-2/redis"}
+
+    def test_oldest_first_in_batches(self, db):
+        """Test that each batch takes the oldest expired records."""
+        cutoff = datetime.now(UTC)
+
+        delete_expired_diun_updates_batch(db, cutoff, batch_size=2)
+        assert remaining(db) == {"web-2/nginx", "web-2/redis", "old-nas/samba"}
+
+        delete_expired_diun_updates_batch(db, cutoff, batch_size=2)
+        assert remaining(db) == {"web-2/redis"}
+
+    @pytest.mark.parametrize("selection, index", [
+        ({}, "ix_diun_updates_created_at_id"),
+        ({"exclude_statuses": ("new",)}, "ix_diun_updates_created_at_id"),
+        ({"hostname": "web-1"}, "ix_diun_updates_host_id_created_at_id"),
+        ({"status": "new", "exclude_hostnames": ("web-1",)}, "ix_diun_updates_status_created_at_id"),
+    ])
+    def test_uses_created_at_index(self, db, selection, index):
+        """Test that batches are chosen from a created_at index, not a table scan."""
+        plans = []
+
+        @event.listens_for(db.get_bind(), "before_cursor_execute", retval=True)
+        def explain(conn, cursor, statement, parameters, context, executemany):
+            plans.extend(row[-1] for row in cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters))
+            return statement, parameters
+
+        delete_expired_diun_updates_batch(db, datetime(2000, 1, 1), **selection)
+        event.remove(db.get_bind(), "before_cursor_execute", explain)
+
+        assert any(index in plan for plan in plans)
+        assert not any("TEMP B-TREE" in plan for plan in plans)
+
+
+class TestSweeper:
+    """Test RetentionSweeper runs."""
+
+    async def test_run(self, db, test_session_pools, test_event_broker):
+        """Test that a sweep applies every rule in batches and records the run."""
+        test_writer, test_reader = test_session_pools
+        policy = parse_retention_policy("30d,status:unchanged=5d,hostname:old-nas=2d")
+        sweeper = RetentionSweeper(test_writer.session, policy, batch_size=1)
+
+        assert await sweeper.run_once() == 4
+        assert remaining(db) == {"web-2/redis"}
+
+        run = sweeper.stats()["recent_runs"][-1]
+        assert run["pruned"] == 4
+        assert run["pruned_by_rule"] == {"hostname:old-nas": 1, "status:unchanged": 2, "default": 1}
+        assert run["batches"] == 7
+        assert run["duration_ms"] > 0
+        assert test_event_broker.stats()["published"] == 4
+
+        assert await sweeper.run_once() == 0
+        assert sweeper.stats()["rows_pruned"] == 4
+
+    def test_endpoint(self, test_client):
+        """Test that /debug/retention reports whether the sweeper runs."""
+        response = test_client.get("/debug/retention")
+
+        assert response.status_code == 200
+        assert "enabled" in response.json()
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from src.database import async_upsert_diun_update, async_get_all_diun_updates
+
+
+class TestSessionPools:
+    """Test the separate writer and read-only reader pools."""
+
+    async def test_reader_is_read_only(self, test_session_pools):
+        """Test that reader sessions cannot modify the database."""
+        test_writer, test_reader = test_session_pools
+
+        async with test_reader.session() as db:
+            with pytest.raises(OperationalError):
+                await db.execute(text("DELETE FROM diun_updates"))
+
+    async def test_reader_sees_committed_writes(self, test_session_pools, make_update):
+        """Test that reads observe rows committed through the writer."""
+        test_writer, test_reader = test_session_pools
+
+        async with test_writer.session() as db:
+            await async_upsert_diun_update(db, make_update())
+        async with test_reader.session() as db:
+            updates = await async_get_all_diun_updates(db)
+
+        assert [u.hostname for u in updates] == ["server1"]
+
+    async def test_read_not_blocked_by_open_write(self, test_session_pools):
+        """Test that a read completes while a write transaction is still open."""
+        test_writer, test_reader = test_session_pools
+
+        async with test_writer.session() as write_db:
+            await write_db.execute(text("INSERT INTO hosts (id, hostname) VALUES (1, 'pending')"))
+            await write_db.execute(text("INSERT INTO images (id, image_name) VALUES (1, 'nginx')"))
+            await write_db.execute(text("INSERT INTO diun_updates (host_id, image_id) VALUES (1, 1)"))
+            async with test_reader.session() as read_db:
+                rows = await asyncio.wait_for(async_get_all_diun_updates(read_db), timeout=1)
+            assert rows == []
+            await write_db.commit()
+
+    async def test_writer_serializes_sessions(self, test_session_pools):
+        """Test that writer sessions are handed out one at a time and waits are recorded."""
+        test_writer, test_reader = test_session_pools
+        order = []
+
+        async def write(name):
+            async with test_writer.session() as db:
+                order.append(f"{name}-start")
+                await asyncio.sleep(0.05)
+                order.append(f"{name}-end")
+
+        await asyncio.gather(write("a"), write("b"))
+
+        assert order == ["a-start", "a-end", "b-start", "b-end"]
+        stats = test_writer.stats()
+        assert stats["acquisitions"] == 2
+        assert stats["max_wait_ms"] >= 40
+
+
+class TestDbStatsEndpoint:
+    """Test the /debug/db endpoint."""
+
+    def test_reports_both_pools(self, test_client):
+        """Test that lock-wait stats are reported per pool."""
+        response = test_client.get("/debug/db")
+
+        assert response.status_code == 200
+        assert set(response.json()) == {"writer", "reader"}
+        assert "max_wait_ms" in response.json()["writer"]
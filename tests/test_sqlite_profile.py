@@ -0,0 +1,85 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import create_engine
+
+from src.database import SQLITE_PROFILES, apply_sqlite_pragmas, read_sqlite_pragmas, sqlite_pragmas_from_env
+
+
+class TestSqlitePragmasFromEnv:
+    """Test resolving the SQLite PRAGMA profile from environment variables."""
+
+    def test_default_profile(self):
+        """Test that the balanced profile is used when nothing is configured."""
+        pragmas = sqlite_pragmas_from_env({})
+
+        assert pragmas == SQLITE_PROFILES["balanced"]
+        assert pragmas["journal_mode"] == "WAL"
+        assert pragmas["synchronous"] == "NORMAL"
+
+    @pytest.mark.parametrize("profile", ["durable", "balanced", "fast"])
+    def test_named_profiles(self, profile):
+        """Test that each named preset can be selected."""
+        assert sqlite_pragmas_from_env({"DIUN_SQLITE_PROFILE": profile.upper()}) == SQLITE_PROFILES[profile]
+
+    def test_overrides(self):
+        """Test that individual settings override the profile."""
+        pragmas = sqlite_pragmas_from_env({
+            "DIUN_SQLITE_PROFILE": "durable",
+            "DIUN_SQLITE_SYNCHRONOUS": "normal",
+            "DIUN_SQLITE_MMAP_SIZE": "1048576",
+            "DIUN_SQLITE_WAL_AUTOCHECKPOINT": "500",
+        })
+
+        assert pragmas["synchronous"] == "NORMAL"
+        assert pragmas["mmap_size"] == 1048576
+        assert pragmas["wal_autocheckpoint"] == 500
+        assert pragmas["busy_timeout"] == SQLITE_PROFILES["durable"]["busy_timeout"]
+
+    def test_unknown_profile(self):
+        """Test that an unknown profile is rejected."""
+        with pytest.raises(ValueError, match="DIUN_SQLITE_PROFILE"):
+            sqlite_pragmas_from_env({"DIUN_SQLITE_PROFILE": "reckless"})
+
+    @pytest.mark.parametrize("name,value", [
+        ("DIUN_SQLITE_SYNCHRONOUS", "SOMETIMES"),
+        ("DIUN_SQLITE_JOURNAL_MODE", "WAL; DROP TABLE diun_updates"),
+        ("DIUN_SQLITE_CACHE_SIZE", "lots"),
+    ])
+    def test_invalid_override(self, name, value):
+        """Test that invalid override values are rejected before reaching SQL."""
+        with pytest.raises(ValueError, match=name):
+            sqlite_pragmas_from_env({name: value})
+
+    def test_invalid_setting_stops_startup(self):
+        """Test that a bad setting stops the application with a logged message instead of a traceback."""
+        env = {**os.environ, "DIUN_WEBHOOK_TOKEN": "test", "DIUN_SQLITE_CACHE_SIZE": "lots"}
+
+        result = subprocess.run([sys.executable, "-c", "import src.database"], env=env,
+                                capture_output=True, text=True)
+
+        assert result.returncode == 1
+        assert "DIUN_SQLITE_CACHE_SIZE must be an integer" in result.stderr
+        assert "Traceback" not in result.stderr
+
+
+class TestApplySqlitePragmas:
+    """Test applying a PRAGMA profile to an engine."""
+
+    def test_pragmas_applied_on_connect(self, tmp_path):
+        """Test that every new connection gets the configured settings."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+        pragmas = sqlite_pragmas_from_env({"DIUN_SQLITE_WAL_AUTOCHECKPOINT": "2000"})
+        apply_sqlite_pragmas(engine, pragmas)
+
+        effective = read_sqlite_pragmas(engine, pragmas)
+
+        assert effective["journal_mode"] == "wal"
+        assert effective["synchronous"] == 1  # NORMAL
+        assert effective["busy_timeout"] == 5000
+        assert effective["cache_size"] == pragmas["cache_size"]
+        assert effective["temp_store"] == 2  # MEMORY
+        assert effective["wal_autocheckpoint"] == 2000
+        engine.dispose()
@@ -60,6 +60,18 @@ class TestWebhookWorkflow:
         assert response.status_code == 400
         assert "Invalid webhook data" in response.json()["detail"]
 
+    @pytest.mark.parametrize("body", [b'{"hostname": "testserver",', b"[]", b""])
+    def test_webhook_malformed_body(self, test_client, set_webhook_token, body):
+        """Test that a body that is not a JSON object is rejected as invalid data."""
+        response = test_client.post(
+            "/webhook",
+            content=body,
+            headers={"Authorization": "test-webhook-token", "Content-Type": "application/json"}
+        )
+
+        assert response.status_code == 400
+        assert "Invalid webhook data" in response.json()["detail"]
+
     def test_webhook_data_stored_correctly(self, test_client, test_db, set_webhook_token, sample_diun_webhook):
         """Test that webhook data is stored correctly in database."""
         TestSessionLocal, test_engine = test_db
@@ -86,7 +98,7 @@ class TestWebhookWorkflow:
         assert record.hostname == "myserver"
         assert record.status == "new"
         assert record.provider == "file"
-        assert record.image_name == "docker.io/crazymax/diun"
+        assert record.image_name == "crazymax/diun"
         assert record.image_tag == "latest" 
         assert record.digest == "sha256:216e3ae7de4ca8b553eb11ef7abda00651e79e537e85c46108284e5e91673e01"
         assert record.image_created_at == datetime(2020, 3, 26, 12, 23, 56)
@@ -130,6 +142,26 @@ class TestWebhookWorkflow:
         
         db.close()
 
+    def test_webhook_unparsed_image_reference(self, test_client, test_db, set_webhook_token):
+        """Test that an image the reference parser rejects is still stored."""
+        TestSessionLocal, test_engine = test_db
+        db = TestSessionLocal()
+
+        response = test_client.post(
+            "/webhook",
+            json={
+                "hostname": "odd-server", "status": "new", "provider": "file",
+                "image": "Weird Image!!", "digest": "sha256:odd123", "created": "2025-01-01T10:00:00Z",
+            },
+            headers={"Authorization": "test-webhook-token"}
+        )
+
+        assert response.status_code == 200
+        record = db.query(DiunUpdate).one()
+        assert (record.image_name, record.image_tag) == ("Weird Image!!", "latest")
+
+        db.close()
+
     def test_webhook_replaces_existing_record_same_server(self, test_client, test_db, set_webhook_token):
         """Test that new webhook replaces existing record for same hostname and image."""
         TestSessionLocal, test_engine = test_db
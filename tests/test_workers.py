@@ -0,0 +1,76 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from src.database import SCHEMA_HEAD, get_schema_revision
+from src.workers import ChangeWatcher, LeaderLock
+from src.events import EventBroker
+
+
+class TestLocks:
+    """Test the locks coordinating worker processes."""
+
+    def test_leader_lock(self, tmp_path):
+        """Test that one holder at a time gets the lock and another can take over after release."""
+        path = str(tmp_path / "jobs.lock")
+        first, second = LeaderLock(path), LeaderLock(path)
+
+        assert first.acquire() is True
+        assert first.acquire() is True
+        assert second.acquire() is False
+
+        first.release()
+        assert first.held is False
+        assert second.acquire() is True
+        second.release()
+
+    def test_concurrent_migrations(self, tmp_path):
+        """Test that workers starting together on a new database migrate it once, without errors."""
+        for name in ("src", "static", "templates"):
+            (tmp_path / name).symlink_to(Path(name).resolve())
+        env = {**os.environ, "DIUN_WEBHOOK_TOKEN": "test"}
+
+        workers = [
+            subprocess.Popen([sys.executable, "-c", "import src.main"], cwd=tmp_path, env=env,
+                             stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+            for _ in range(3)
+        ]
+        outputs = [worker.communicate(timeout=120)[0] for worker in workers]
+
+        assert [worker.returncode for worker in workers] == [0, 0, 0], outputs
+        assert get_schema_revision(str(tmp_path / "data" / "diun.db")) == SCHEMA_HEAD
+
+
+class TestChangeWatcher:
+    """Test the data version poller."""
+
+    async def test_run_once(self, test_db, test_session_pools):
+        """Test that a write made outside the pools resets the broker on the second check."""
+        TestSessionLocal, test_engine = test_db
+        test_writer, test_reader = test_session_pools
+        broker = EventBroker()
+        watcher = ChangeWatcher(test_reader.session, broker)
+
+        assert await watcher.run_once() is False
+        with test_engine.begin() as connection:
+            connection.exec_driver_sql("INSERT INTO hosts (hostname) VALUES ('other')")
+            connection.exec_driver_sql("INSERT INTO images (image_name) VALUES ('nginx')")
+            connection.exec_driver_sql(
+                "INSERT INTO diun_updates (host_id, image_id, status, provider, image_tag, digest, created_at) "
+                "VALUES (1, 1, 'new', 'docker', 'latest', 'sha256:abcd', datetime('now'))"
+            )
+            # Another worker counts its write the way _commit_write does
+            connection.exec_driver_sql("UPDATE diun_meta SET data_version = data_version + 1 WHERE id = 1")
+        assert await watcher.run_once() is False
+        assert await watcher.run_once() is True
+        assert watcher.stats()["resets"] == 1
+
+    def test_endpoint(self, test_client):
+        """Test that /debug/workers reports this worker's role."""
+        response = test_client.get("/debug/workers")
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["pid"] == os.getpid()
+        assert "jobs_leader" in body